@@ -1,6 +1,9 @@
 from __future__ import absolute_import, unicode_literals
 import os
+import logging
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
+from kombu import Queue
 
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
@@ -17,15 +20,32 @@ from myapp.constants import (
     CELERY_TASK_TIME_LIMIT,
     CELERY_TASK_SOFT_TIME_LIMIT,
     CELERY_BEAT_CLEAN_INTERVAL,
+    MAPDL_POOL_PREWARM,
+    SIMULATION_QUEUES,
+    RENDER_QUEUE,
+    RENDER_WORKER_CONCURRENCY,
 )
+from myapp.services.queue_router import QueueRouter
 
 app.conf.update(
     worker_max_tasks_per_child=CELERY_WORKER_MAX_TASKS,
     task_time_limit=CELERY_TASK_TIME_LIMIT,
     task_soft_time_limit=CELERY_TASK_SOFT_TIME_LIMIT,
     task_acks_late=True,
+    # Simulations are routed per job by SimulationService, maintenance stays on the default queue
+    task_default_queue='celery',
+    task_queues=[Queue('celery')] + [Queue(name) for name in SIMULATION_QUEUES] + [Queue(RENDER_QUEUE)],
+    # One long job must not hold back prefetched short ones
+    worker_prefetch_multiplier=1,
 )
 
+# Dedicated simulation workers take their concurrency from the queue table
+worker_queue = QueueRouter.get_worker_queue()
+if worker_queue:
+    app.conf.worker_concurrency = QueueRouter.get_queue_config(worker_queue)['concurrency']
+elif QueueRouter.is_render_worker():
+    app.conf.worker_concurrency = RENDER_WORKER_CONCURRENCY
+
 app.conf.beat_schedule = {
     'clean-old-simulations': {
         'task': 'myapp.tasks.maintenance_tasks.clean_old_simulations',
@@ -33,6 +53,26 @@ app.conf.beat_schedule = {
     },
 }
 
+
+@worker_process_init.connect
+def start_mapdl_pool(**kwargs):
+    """Launch warm MAPDL sessions as soon as a worker process starts"""
+    if not MAPDL_POOL_PREWARM or QueueRouter.is_render_worker():
+        return
+    from myapp.services.mapdl_handler import MAPDLHandler
+    try:
+        MAPDLHandler().get_pool().start()
+    except Exception as e:
+        # Sessions are launched lazily on the first job instead
+        logging.getLogger(__name__).error(f"Failed to prewarm MAPDL pool: {e}")
+
+
+@worker_process_shutdown.connect
+def stop_mapdl_pool(**kwargs):
+    from myapp.services.mapdl_handler import MAPDLHandler
+    MAPDLHandler().close_mapdl()
+
+
 @app.task(bind=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')
\ No newline at end of file
@@ -88,6 +88,8 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Wait for a competing writer instead of failing with "database is locked"
+        'OPTIONS': {'timeout': 20},
     }
 }
 
@@ -0,0 +1,110 @@
+import os
+import re
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from django.views.static import was_modified_since
+
+from myapp.constants import DOWNLOAD_CHUNK_SIZE
+
+BYTE_RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parse_byte_range(header, size):
+    """
+    ``(start, stop)`` of a single-range ``Range: bytes=`` header, stop exclusive
+
+    Returns None for headers to ignore (malformed or several ranges), in which
+    case the whole file is sent. ``start >= stop`` means not satisfiable.
+    """
+    match = BYTE_RANGE_PATTERN.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last N bytes
+        return max(size - int(last), 0), size
+    start = int(first)
+    if not last:
+        return start, size
+    if int(last) < start:
+        return None
+    return start, min(int(last) + 1, size)
+
+
+def read_chunks(path, start, stop, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """Bytes ``start`` to ``stop`` of a file, one chunk at a time"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = stop - start
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def file_response(request, path, content_type, filename, encoding=None):
+    """
+    Stream a file with conditional GET and byte range support
+
+    Answers 304 when If-None-Match or If-Modified-Since show the client's
+    copy is current, 206 with the requested part for a single byte range
+    (honoring If-Range), 416 for ranges past the end and 200 otherwise.
+    ``encoding`` is the Content-Encoding of the file itself (e.g. 'gzip');
+    ranges then count bytes of the encoded file.
+    """
+    stat = os.stat(path)
+    size = stat.st_size
+    etag = quote_etag(f'{stat.st_mtime_ns:x}-{size:x}' + (f'-{encoding}' if encoding else ''))
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Accept-Ranges': 'bytes',
+        'Vary': 'Accept-Encoding',
+    }
+
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        # Weak comparison, as for GET requests
+        client_etags = [tag.removeprefix('W/') for tag in parse_etags(if_none_match)]
+        not_modified = '*' in client_etags or etag in client_etags
+    else:
+        not_modified = not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), int(stat.st_mtime))
+    if not_modified:
+        response = HttpResponseNotModified()
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    start, stop = 0, size
+    byte_range = None
+    if 'HTTP_RANGE' in request.META:
+        if_range = request.META.get('HTTP_IF_RANGE')
+        # A stale If-Range validator asks for the whole new file instead of a part of it
+        range_valid = (
+            not if_range
+            or if_range == etag
+            or parse_http_date_safe(if_range) == int(stat.st_mtime)
+        )
+        if range_valid:
+            byte_range = parse_byte_range(request.META['HTTP_RANGE'], size)
+
+    if byte_range is not None:
+        start, stop = byte_range
+        if start >= stop:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        response = StreamingHttpResponse(read_chunks(path, start, stop), status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{stop - 1}/{size}'
+    else:
+        response = StreamingHttpResponse(read_chunks(path, start, stop), content_type=content_type)
+
+    for name, value in headers.items():
+        response[name] = value
+    response['Content-Length'] = str(stop - start)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    if encoding:
+        response['Content-Encoding'] = encoding
+    return response
@@ -0,0 +1,124 @@
+import json
+import time
+import logging
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from myapp.constants import SSE_KEEPALIVE_SECONDS, SSE_MAX_STREAM_SECONDS
+from myapp.models import Simulation
+from myapp.services.event_service import SimulationEventService, is_final_payload
+from myapp.services.status_cache_service import StatusCacheService
+from myapp.utils.redis_client import get_async_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+def format_event(event_type, data):
+    """Encode one Server-Sent Event"""
+    return f"event: {event_type}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def authenticate_stream(request):
+    """
+    User of an event stream request, None for anonymous requests
+
+    EventSource cannot send headers, so the access token may also be passed
+    as ``?token=<access_token>``.
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is None:
+        raw_token = request.GET.get('token')
+    if not raw_token:
+        return None
+    validated_token = authentication.get_validated_token(raw_token)
+    return authentication.get_user(validated_token)
+
+
+async def get_initial_payload(simulation_id):
+    """Current status payload, from the status cache or the database"""
+    cached = await get_async_redis_client().get(StatusCacheService.get_key(simulation_id))
+    if cached:
+        try:
+            return json.loads(cached)
+        except ValueError:
+            pass
+
+    def load():
+        simulation = Simulation.objects.select_related('result').filter(pk=simulation_id).first()
+        if simulation is None:
+            return None
+        return StatusCacheService.publish(simulation) or StatusCacheService.build_payload(simulation)
+
+    return await sync_to_async(load)()
+
+
+async def event_stream(pubsub, simulation_id, payload):
+    """Yield the current status, then every published event until the final one"""
+    channel = SimulationEventService.get_channel(simulation_id)
+    deadline = time.monotonic() + SSE_MAX_STREAM_SECONDS
+    try:
+        yield format_event('status', StatusCacheService.public_payload(payload))
+        if is_final_payload(payload):
+            return
+
+        while time.monotonic() < deadline:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=SSE_KEEPALIVE_SECONDS)
+            if message is None:
+                yield ": keepalive\n\n"
+                continue
+
+            event = json.loads(message['data'])
+            yield format_event(event['type'], event['data'])
+            if event['type'] == 'status' and is_final_payload(event['data']):
+                return
+    finally:
+        await pubsub.unsubscribe(channel)
+        await pubsub.aclose()
+
+
+async def simulation_events(request, pk):
+    """
+    Server-Sent Events stream of one simulation
+
+    Pushes status transitions (with the summary once completed) and solver
+    progress from the simulation's Redis pub/sub channel, replacing polling of
+    the status endpoint. The stream ends after FAILED, or after COMPLETED
+    once the images rendered on the render queue are stored.
+    """
+    try:
+        user = await sync_to_async(authenticate_stream)(request)
+    except (InvalidToken, TokenError):
+        return JsonResponse({'detail': 'Given token not valid.'}, status=401)
+
+    owner = await Simulation.objects.filter(pk=pk).values_list('user_id', flat=True).afirst()
+    exists = owner is not None or await Simulation.objects.filter(pk=pk).aexists()
+    if not exists:
+        return JsonResponse({'detail': 'Simulation not found.'}, status=404)
+    if user is not None:
+        if owner != user.id:
+            return JsonResponse({'detail': 'Simulation not found.'}, status=404)
+    else:
+        session_simulation_id = await request.session.aget('last_simulation_id')
+        if owner is not None or str(pk) != str(session_simulation_id):
+            return JsonResponse({'detail': 'Access denied'}, status=403)
+
+    # Subscribe before reading the current status so no transition is missed in between
+    pubsub = get_async_redis_client().pubsub()
+    await pubsub.subscribe(SimulationEventService.get_channel(pk))
+    try:
+        payload = await get_initial_payload(pk)
+    except Exception:
+        await pubsub.aclose()
+        raise
+    if payload is None:
+        await pubsub.aclose()
+        return JsonResponse({'detail': 'Simulation not found.'}, status=404)
+
+    response = StreamingHttpResponse(event_stream(pubsub, pk, payload), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Disable proxy buffering
+    return response
@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from myapp.models import Simulation , SimulationResult
 from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from myapp.constants import SWEEP_MAX_CASES, MODEL_TYPES
+from myapp.utils.image_variants import build_srcset
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -29,14 +32,18 @@ class SimulationSerializer(serializers.ModelSerializer):
     status = serializers.CharField(read_only=True)
     has_result = serializers.SerializerMethodField()
     result_summary = serializers.SerializerMethodField()
+    result_timings = serializers.SerializerMethodField()
     mesh_image_url = serializers.SerializerMethodField()
     stress_image_url = serializers.SerializerMethodField()
     deformation_image_url = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = Simulation
-        fields = ['id', 'title', 'user', 'parameters', 'status', 'created_at', 'completed_at',
-                  'has_result', 'result_summary', 'mesh_image_url', 'stress_image_url', 'deformation_image_url']
+        fields = ['id', 'title', 'user', 'parameters', 'status', 'created_at', 'queued_at', 'started_at',
+                  'completed_at', 'cost_estimate', 'queue', 'has_result', 'result_summary', 'result_timings',
+                  'mesh_image_url', 'stress_image_url', 'deformation_image_url', 'image_srcset']
+        read_only_fields = ['queued_at', 'started_at', 'completed_at', 'cost_estimate', 'queue']
 
     def validate_parameters(self, value):
         """Validate simulation parameters with detailed error messages"""
@@ -80,6 +87,9 @@ class SimulationSerializer(serializers.ModelSerializer):
         if value['element_size'] <= 0:
             errors.append(f"Element size must be positive. Current: {value['element_size']}")
 
+        if 'model_type' in value and value['model_type'] not in MODEL_TYPES:
+            errors.append(f"Model type must be one of {', '.join(MODEL_TYPES)}. Current: {value['model_type']}")
+
         # Additional validation: radius shouldn't be too large
         if value['radius'] > value['width'] / 2:
             errors.append(f"Radius ({value['radius']}m) is too large for beam width ({value['width']}m)")
@@ -97,6 +107,11 @@ class SimulationSerializer(serializers.ModelSerializer):
             return obj.result.summary
         return None
 
+    def get_result_timings(self, obj):
+        if hasattr(obj, 'result'):
+            return obj.result.timings
+        return None
+
     def get_mesh_image_url(self, obj):
         if hasattr(obj, 'result') and obj.result.mesh_image:
             request = self.context.get('request')
@@ -119,11 +134,45 @@ class SimulationSerializer(serializers.ModelSerializer):
             return obj.result.deformation_image.url
         return None
 
+    def get_image_srcset(self, obj):
+        """Thumbnail, medium and full size URLs of each image per format, as HTML srcset strings"""
+        if not hasattr(obj, 'result'):
+            return None
+        request = self.context.get('request')
+
+        def to_url(name):
+            url = default_storage.url(name)
+            return request.build_absolute_uri(url) if request else url
+
+        return build_srcset(obj.result.image_variants, to_url)
+
+
+class SimulationSweepSerializer(serializers.Serializer):
+    """
+    Serializer for a pressure sweep request
+
+    Accepts a base parameter set and a list of pressures; every pressure
+    becomes its own Simulation that shares geometry, mesh and material.
+    """
+    title = serializers.CharField(max_length=200, required=False, allow_blank=True)
+    parameters = serializers.JSONField()
+    pressures = serializers.ListField(
+        child=serializers.FloatField(),
+        min_length=1,
+        max_length=SWEEP_MAX_CASES,
+    )
+
+    def validate(self, attrs):
+        # The base set may omit pressure, each case supplies its own
+        parameters = dict(attrs['parameters'], pressure=attrs['pressures'][0])
+        attrs['parameters'] = SimulationSerializer().validate_parameters(parameters)
+        return attrs
+
 
 class SimulationResultSerializer(serializers.ModelSerializer):
     class Meta:
         model = SimulationResult
         fields = ['id', 'simulation', 'result_file', 'mesh_image', 'stress_image','deformation_image',
-                 'summary', 'created_at']
+                 'image_variants', 'summary', 'created_at']
         read_only_fields = ['id', 'created_at']
 
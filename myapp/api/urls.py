@@ -1,17 +1,20 @@
 from django.urls import path
-from myapp.api import views
+from myapp.api import views, events
 
 urlpatterns = [
     # Health check
     path('health/', views.HealthCheckView.as_view(), name='health-check'),
+    path('metrics/', views.MetricsView.as_view(), name='metrics'),
 
     # Simulations
     path('simulations/', views.SimulationListCreateView.as_view(), name='simulation-list-create'),
+    path('simulations/sweep/', views.SimulationSweepCreateView.as_view(), name='simulation-sweep'),
     path('simulations/<int:pk>/', views.SimulationDetailView.as_view(), name='simulation-detail'),
     path('simulations/<int:pk>/resume/', views.SimulationResumeView.as_view(), name='simulation-resume'),
     path('simulations/<int:pk>/download/<str:file_type>/', views.SimulationDownloadView.as_view(),name='simulation-download'),
     path('simulations/<int:pk>/cancel/', views.CancelSimulationView.as_view(), name='simulation-cancel'),
     path('simulations/<int:pk>/status/', views.SimulationStatusView.as_view(), name='simulation-status'),
+    path('simulations/<int:pk>/events/', events.simulation_events, name='simulation-events'),
     path('simulations/<int:pk>/delete/', views.DeleteSimulationView.as_view(), name='simulation-delete'),
 
     # Batch operations
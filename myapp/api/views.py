@@ -4,19 +4,46 @@ import tempfile
 from datetime import timedelta
 from django.db import transaction
 from django.utils import timezone
-from redis import Redis
 from rest_framework import generics, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from django.http import FileResponse
+from django.http import FileResponse, HttpResponse
 from rest_framework.views import APIView
 
 from backend import settings
-from myapp.models import Simulation
-from myapp.api.serializers import SimulationSerializer, UserSerializer
+from myapp.models import Simulation, SimulationResult
+from myapp.api.serializers import SimulationSerializer, SimulationSweepSerializer, UserSerializer
 from myapp.services.simulation_service import SimulationService, logger
+from myapp.services.simulation_cache_service import SimulationCacheService
+from myapp.services.status_cache_service import StatusCacheService, IMAGE_FIELDS
+from myapp.services.cost_estimator import CostEstimator
+from myapp.services.queue_router import QueueRouter
+from myapp.services.metrics_service import MetricsService
+from myapp.api.downloads import file_response
+from myapp.constants import (
+    FIELD_EXPORT_GZIP, MAX_ESTIMATED_ELEMENTS, SCALED_REUSE_ENABLED, TIMING_STATS_SAMPLE_SIZE,
+)
+from myapp.utils.redis_client import get_redis_client
+from myapp.utils.timing import summarize_timings
+from myapp.utils.image_variants import build_srcset
+from myapp.utils.field_export import (
+    FIELD_EXPORT_FORMATS, ExportUnavailable, get_field_export, get_gzip_copy, select_columns,
+)
+from myapp.utils.field_store import SimulationFields, get_result_fields_path
 from rest_framework.pagination import PageNumberPagination
 
+def estimate_simulation_cost(parameters):
+    """Pre-flight cost estimate, rejecting jobs that would tie up a worker for too long"""
+    estimate = CostEstimator.estimate(parameters)
+    if estimate['element_count'] > MAX_ESTIMATED_ELEMENTS:
+        raise ValidationError({'parameters': [
+            f"Estimated mesh of {estimate['element_count']} elements exceeds the limit of "
+            f"{MAX_ESTIMATED_ELEMENTS}. Increase element_size."
+        ]})
+    return estimate
+
+
 class StandardResultsSetPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
@@ -32,44 +59,151 @@ class SimulationListCreateView(generics.ListCreateAPIView):
             return self.request.user.simulations.all()
         return Simulation.objects.filter(user__isnull=True)
 
-    def perform_create(self, serializer):
+    def save_simulation(self, serializer, **kwargs):
         if self.request.user.is_authenticated:
-            simulation = serializer.save(user=self.request.user)
-        else:
-            simulation = serializer.save(user=None, status='PENDING')
-            self.request.session['last_simulation_id'] = simulation.id
-            self.request.session.set_expiry(86400)
+            return serializer.save(user=self.request.user, **kwargs)
+
+        simulation = serializer.save(user=None, status='PENDING', **kwargs)
+        self.request.session['last_simulation_id'] = simulation.id
+        self.request.session.set_expiry(86400)
+        return simulation
+
+    def perform_create(self, serializer):
+        cost_estimate = estimate_simulation_cost(serializer.validated_data['parameters'])
+        queue_name = QueueRouter.select_queue(cost_estimate)
+
+        simulation = self.save_simulation(serializer, cost_estimate=cost_estimate, queue=queue_name)
+        self.submit(simulation, queue_name)
+
+    def submit(self, simulation, queue_name):
+        StatusCacheService.publish(simulation)
 
         # SimulationService.run_simulation(simulation.id)
-        task_id = SimulationService.queue_simulation(simulation.id)
+        task_id, leader_id = SimulationService.submit_simulation(simulation, queue_name)
+        simulation.refresh_from_db(fields=['status', 'queue'])
+        self.task_id = task_id
+        if leader_id != simulation.id:
+            self.coalesced_with = leader_id
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
+        parameters = serializer.validated_data['parameters']
+
+        # Identical parameters already solved: attach that result instead of queuing a run
+        source = SimulationCacheService.find_completed_simulation(parameters)
+        if source is not None:
+            return self.create_from_cache(serializer, source)
+
+        # Only pressure and/or e differ from a stored result: scale it right away, no solver queue involved
+        reference = SimulationCacheService.get_reference_simulation(parameters) if SCALED_REUSE_ENABLED else None
+        if reference is not None:
+            response = self.create_from_reference(serializer, reference)
+            if response is not None:
+                return response
+        else:
+            self.perform_create(serializer)
         headers = self.get_success_headers(serializer.data)
 
         # Add task_id and status to the response
         response_data = serializer.data
-        simulation_id = response_data['id']
-        task_id = None
+        response_data.update({
+            'task_id': self.task_id,
+            'status': serializer.instance.status,
+            'cache_hit': False,
+            'message': 'Simulation queued successfully'
+        })
+        leader_id = getattr(self, 'coalesced_with', None)
+        if leader_id is not None:
+            response_data.update({
+                'coalesced_with': leader_id,
+                'message': f'Identical simulation {leader_id} is already running, its result will be shared'
+            })
 
-        # Get task_id from Redis
+        return Response(response_data, status=status.HTTP_202_ACCEPTED, headers=headers)
+
+    def create_from_reference(self, serializer, reference):
+        """Complete the submission from the scaled reference fields, or queue it when scaling fails (None)"""
+        cost_estimate = estimate_simulation_cost(serializer.validated_data['parameters'])
+        simulation = self.save_simulation(serializer, cost_estimate=cost_estimate)
         try:
-            redis_client = Redis.from_url(settings.CELERY_BROKER_URL)
-            task_id = redis_client.get(f"simulation_task_id:{simulation_id}")
-            if task_id:
-                task_id = task_id.decode('utf-8')
+            completed = SimulationService.complete_from_reference(simulation, reference)
         except Exception as e:
-            logger.error(f"Error getting task_id: {e}")
+            logger.error(f"Scaling simulation {reference.id} for simulation {simulation.id} failed: {e}")
+            completed = None
+        if completed is None:
+            queue_name = QueueRouter.select_queue(cost_estimate)
+            Simulation.objects.filter(id=simulation.id).update(queue=queue_name)
+            self.submit(simulation, queue_name)
+            return None
+        simulation.refresh_from_db()
+
+        response_data = self.get_serializer(simulation).data
+        response_data.update({
+            'task_id': None,
+            'status': 'COMPLETED',
+            'cache_hit': False,
+            'scaled_from': reference.id,
+            'message': f'Result of simulation {reference.id} scaled to the new pressure and e'
+        })
+        return Response(response_data, status=status.HTTP_200_OK)
+
+    def create_from_cache(self, serializer, source):
+        simulation = self.save_simulation(serializer, cost_estimate=source.cost_estimate)
+        SimulationService.copy_simulation_result(source.id, simulation.id)
+        simulation.refresh_from_db()
 
+        response_data = self.get_serializer(simulation).data
         response_data.update({
-            'task_id': task_id,
-            'status': 'PENDING',
-            'message': 'Simulation queued successfully'
+            'task_id': None,
+            'status': 'COMPLETED',
+            'cache_hit': True,
+            'cached_from': source.id,
+            'message': 'Identical simulation found, result reused'
         })
+        return Response(response_data, status=status.HTTP_200_OK)
 
-        return Response(response_data, status=status.HTTP_202_ACCEPTED, headers=headers)
+
+class SimulationSweepCreateView(APIView):
+    """Create one simulation per pressure and solve them as load steps of a single MAPDL run"""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = SimulationSweepSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        base_parameters = serializer.validated_data['parameters']
+        pressures = serializer.validated_data['pressures']
+        title = serializer.validated_data.get('title') or 'Pressure sweep'
+        # Every case shares the mesh, so one estimate covers them all
+        cost_estimate = estimate_simulation_cost(base_parameters)
+        queue_name = QueueRouter.select_queue(cost_estimate, cases=len(pressures))
+
+        with transaction.atomic():
+            simulations = [
+                Simulation.objects.create(
+                    title=f"{title} ({pressure:g} Pa)",
+                    user=request.user,
+                    parameters=dict(base_parameters, pressure=pressure),
+                    cost_estimate=cost_estimate,
+                    queue=queue_name,
+                )
+                for pressure in pressures
+            ]
+        simulation_ids = [simulation.id for simulation in simulations]
+        StatusCacheService.publish_many(simulation_ids)
+
+        task_id = SimulationService.queue_sweep(simulation_ids, queue_name)
+        for simulation in simulations:
+            simulation.refresh_from_db(fields=['status'])
+
+        return Response({
+            'simulation_ids': simulation_ids,
+            'simulations': SimulationSerializer(simulations, many=True, context={'request': request}).data,
+            'task_id': task_id,
+            'status': 'QUEUED',
+            'message': f'Sweep of {len(simulation_ids)} load step(s) queued successfully'
+        }, status=status.HTTP_202_ACCEPTED)
 
 
 class SimulationDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -90,6 +224,10 @@ class SimulationDetailView(generics.RetrieveUpdateDestroyAPIView):
         context['request'] = self.request
         return context
 
+    def perform_update(self, serializer):
+        simulation = serializer.save()
+        StatusCacheService.publish(simulation)
+
 
 class SimulationResumeView(APIView):
     permission_classes = [IsAuthenticated]
@@ -97,12 +235,12 @@ class SimulationResumeView(APIView):
     def post(self, request, pk):
         try:
             simulation = Simulation.objects.get(pk=pk, user=request.user)
-            # if simulation.status not in ['FAILED', 'COMPLETED']:
-            #     return Response({'detail': 'Simulation cannot be resumed.'}, status=status.HTTP_400_BAD_REQUEST)
-            simulation.status = 'PENDING'
-            simulation.save()
+            # Only finished simulations can be run again, PENDING is reachable from COMPLETED and FAILED
+            if not simulation.transition_to('PENDING', completed_at=None):
+                return Response({'detail': 'Simulation cannot be resumed.'}, status=status.HTTP_400_BAD_REQUEST)
+            StatusCacheService.publish(simulation)
             # Queue async task instead of synchronous execution
-            SimulationService.queue_simulation(simulation.id)
+            SimulationService.submit_simulation(simulation)
             return Response({'detail': 'Simulation resumed.'}, status=status.HTTP_200_OK)
         except Simulation.DoesNotExist:
             return Response({'detail': 'Simulation not found.'}, status=status.HTTP_404_NOT_FOUND)
@@ -128,6 +266,9 @@ class SimulationDownloadView(APIView):
             if not hasattr(simulation, 'result'):
                 return Response({'detail': 'No results found for this simulation.'}, status=status.HTTP_404_NOT_FOUND)
 
+            if file_type in FIELD_EXPORT_FORMATS:
+                return self.get_field_export(request, simulation, file_type)
+
             try:
                 if file_type == 'result':
                     file_path = simulation.result.result_file.path
@@ -178,6 +319,31 @@ class SimulationDownloadView(APIView):
         except Simulation.DoesNotExist:
             return Response({'detail': 'Simulation not found.'}, status=status.HTTP_404_NOT_FOUND)
 
+    def get_field_export(self, request, simulation, export_format):
+        """Nodal fields as npz, arrow or vtu, limited to the ``?fields=`` columns"""
+        fields_path = get_result_fields_path(simulation.result)
+        if not os.path.exists(fields_path):
+            return Response({'detail': 'No field data stored for this simulation.'}, status=status.HTTP_404_NOT_FOUND)
+
+        names = [name for name in request.query_params.get('fields', '').split(',') if name.strip()]
+        try:
+            columns = select_columns(names)
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            path = get_field_export(fields_path, export_format, columns, lambda: SimulationFields.load(fields_path))
+        except ExportUnavailable as e:
+            return Response({'detail': str(e)}, status=status.HTTP_501_NOT_IMPLEMENTED)
+
+        extension, content_type, _ = FIELD_EXPORT_FORMATS[export_format]
+        filename = f'simulation_{simulation.pk}_fields.{extension}'
+        encoding = None
+        if FIELD_EXPORT_GZIP and 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+            path = get_gzip_copy(path)
+            encoding = 'gzip'
+        return file_response(request, path, content_type, filename, encoding=encoding)
+
 
 class DeleteSimulationView(generics.DestroyAPIView):
     permission_classes = [IsAuthenticated]
@@ -187,62 +353,44 @@ class DeleteSimulationView(generics.DestroyAPIView):
 
     def perform_destroy(self, instance):
         if hasattr(instance, 'result'):
-            if instance.result.mesh_image:
-                if os.path.exists(instance.result.mesh_image.path):
-                    os.remove(instance.result.mesh_image.path)
-            if instance.result.stress_image:
-                if os.path.exists(instance.result.stress_image.path):
-                    os.remove(instance.result.stress_image.path)
-            if instance.result.deformation_image:
-                if os.path.exists(instance.result.deformation_image.path):
-                    os.remove(instance.result.deformation_image.path)
-            instance.result.delete()
+            SimulationService.delete_result_files(instance.result)
+        StatusCacheService.invalidate(instance.id)
+        # Simulation.delete() removes the result row
         instance.delete()
 
 class SimulationStatusView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, pk):
-        try:
-            if request.user.is_authenticated:
-                simulation = Simulation.objects.get(pk=pk, user=request.user)
-            else:
-                session_simulation_id = request.session.get('last_simulation_id')
-                if session_simulation_id and str(pk) == str(session_simulation_id):
-                    simulation = Simulation.objects.get(pk=pk, user__isnull=True)
-                else:
-                    return Response({'detail': 'Access denied'},
-                                    status=status.HTTP_403_FORBIDDEN)
-
-            data = {
-                'id': simulation.id,
-                'title': simulation.title,
-                'status': simulation.status,
-                'created_at': simulation.created_at,
-                'completed_at': simulation.completed_at,
-                'parameters': simulation.parameters,
-            }
-
-            if simulation.status == 'COMPLETED' and hasattr(simulation, 'result'):
-                # Add result information to the response
-                data['result_summary'] = simulation.result.summary
-                data['has_mesh_image'] = bool(simulation.result.mesh_image)
-                data['has_stress_image'] = bool(simulation.result.stress_image)
-                data['has_deformation_image'] = bool(simulation.result.deformation_image)
-
-                if simulation.result.mesh_image:
-                    data['mesh_image_url'] = request.build_absolute_uri(
-                        simulation.result.mesh_image.url)
-                if simulation.result.stress_image:
-                    data['stress_image_url'] = request.build_absolute_uri(
-                        simulation.result.stress_image.url)
-                if simulation.result.deformation_image:
-                    data['deformation_image_url'] = request.build_absolute_uri(
-                        simulation.result.deformation_image.url)
-            return Response(data)
-        except Simulation.DoesNotExist:
+        # Access is checked first, with the session alone or an indexed owner lookup
+        if not request.user.is_authenticated:
+            session_simulation_id = request.session.get('last_simulation_id')
+            if not session_simulation_id or str(pk) != str(session_simulation_id):
+                return Response({'detail': 'Access denied'},
+                                status=status.HTTP_403_FORBIDDEN)
+        owners = list(Simulation.objects.filter(pk=pk).values_list('user_id', flat=True))
+        if owners != [request.user.id if request.user.is_authenticated else None]:
             return Response({'detail': 'Simulation not found.'}, status=status.HTTP_404_NOT_FOUND)
 
+        # The payload is served from the Redis status cache, the simulation is only loaded on a miss
+        data = StatusCacheService.get(pk)
+        if data is None:
+            simulation = Simulation.objects.select_related('result').filter(pk=pk).first()
+            if simulation is None:
+                return Response({'detail': 'Simulation not found.'}, status=status.HTTP_404_NOT_FOUND)
+            data = StatusCacheService.publish(simulation) or StatusCacheService.build_payload(simulation)
+        data.pop('user_id', None)
+
+        if 'result_summary' in data:
+            base_url = request.build_absolute_uri('/').rstrip('/')
+            for field_name in IMAGE_FIELDS:
+                url = data.pop(f'{field_name}_url', None)
+                data[f'has_{field_name}'] = bool(url)
+                if url:
+                    data[f'{field_name}_url'] = base_url + url
+            data['image_srcset'] = build_srcset(data.pop('image_variants', None), lambda url: base_url + url)
+        return Response(data)
+
 class CancelSimulationView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -253,27 +401,45 @@ class CancelSimulationView(APIView):
             return Response({'detail': 'Simulation not found.'},
                           status=status.HTTP_404_NOT_FOUND)
 
-        if simulation.status not in ['PENDING', 'RUNNING']:
-            return Response({'detail': 'Only pending or running simulations can be canceled.'},
+        if simulation.status not in Simulation.ACTIVE_STATUSES:
+            return Response({'detail': 'Only pending, queued or running simulations can be canceled.'},
                           status=status.HTTP_400_BAD_REQUEST)
 
+        # A follower has no task of its own, it only stops waiting for its leader
+        if SimulationCacheService.leave_inflight(simulation.parameters, simulation.id):
+            if simulation.transition_to('FAILED'):
+                StatusCacheService.publish(simulation)
+            return Response({'detail': 'Simulation canceled.'}, status=status.HTTP_200_OK)
+
         # Get task_id from Redis
         try:
-            redis_client = Redis.from_url(settings.CELERY_BROKER_URL)
-            task_id = redis_client.get(f"simulation_task_id:{pk}")
+            task_id = get_redis_client().get(f"simulation_task_id:{pk}")
 
             if task_id:
                 task_id = task_id.decode('utf-8')
-                # Cancel the Celery task
-                from celery import current_app
-                current_app.control.revoke(task_id, terminate=True, signal='SIGKILL')
-                logger.info(f"Cancelled Celery task {task_id} for simulation {pk}")
+                # A sweep task keeps running while other cases still need it, it skips the FAILED case
+                sweep_ids = SimulationService.get_sweep_ids(task_id)
+                still_needed = Simulation.objects.filter(
+                    id__in=sweep_ids, status__in=Simulation.ACTIVE_STATUSES).exclude(id=pk).exists()
+                if still_needed:
+                    logger.info(f"Leaving sweep task {task_id} running for the other cases of simulation {pk}")
+                else:
+                    # Cancel the Celery task
+                    from celery import current_app
+                    current_app.control.revoke(task_id, terminate=True, signal='SIGKILL')
+                    logger.info(f"Cancelled Celery task {task_id} for simulation {pk}")
         except Exception as e:
             logger.error(f"Error cancelling task: {e}")
 
-        simulation.status = 'FAILED'
-        simulation.save()
+        if not simulation.transition_to('FAILED'):
+            return Response({'detail': f'Simulation already finished as {simulation.status}.'},
+                          status=status.HTTP_400_BAD_REQUEST)
+        StatusCacheService.publish(simulation)
 
+        # The killed task never releases its followers, hand them a new leader
+        follower_ids = SimulationCacheService.release_inflight(simulation.parameters, simulation.id)
+        if follower_ids:
+            SimulationService.resubmit_followers(follower_ids)
 
         return Response({'detail': 'Simulation canceled.'}, status=status.HTTP_200_OK)
 
@@ -298,8 +464,7 @@ class HealthCheckView(APIView):
 
         # Check Redis connection
         try:
-            redis_client = Redis.from_url(settings.CELERY_BROKER_URL)
-            redis_client.ping()
+            get_redis_client().ping()
             redis_status = "healthy"
         except Exception as e:
             redis_status = f"unhealthy: {str(e)}"
@@ -315,6 +480,14 @@ class HealthCheckView(APIView):
         }, status=status_code)
 
 
+class MetricsView(APIView):
+    """Queue, worker, cache and disk metrics in the Prometheus text format"""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        return HttpResponse(MetricsService.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 class SimulationStatisticsView(APIView):
     """Get user's simulation statistics"""
     permission_classes = [IsAuthenticated]
@@ -346,11 +519,20 @@ class SimulationStatisticsView(APIView):
         seven_days_ago = timezone.now() - timedelta(days=7)
         recent_count = user_simulations.filter(created_at__gte=seven_days_ago).count()
 
+        # Where the time goes, per job stage over the most recent timed results
+        timings = (
+            SimulationResult.objects
+            .filter(simulation__user=request.user, timings__isnull=False)
+            .order_by('-created_at')
+            .values_list('timings', flat=True)[:TIMING_STATS_SAMPLE_SIZE]
+        )
+
         return Response({
             'total_simulations': total,
             'by_status': {item['status']: item['count'] for item in by_status},
             'average_completion_time_seconds': avg_time,
             'recent_simulations_7_days': recent_count,
+            'stage_timings_seconds': summarize_timings(timings),
         })
 
 
@@ -385,18 +567,10 @@ class BatchDeleteSimulationsView(APIView):
         with transaction.atomic():
             for simulation in simulations:
                 if hasattr(simulation, 'result'):
-                    # Delete files
-                    for field_name in ['mesh_image', 'stress_image', 'deformation_image', 'result_file']:
-                        file_field = getattr(simulation.result, field_name, None)
-                        if file_field and hasattr(file_field, 'path'):
-                            try:
-                                if os.path.exists(file_field.path):
-                                    os.remove(file_field.path)
-                            except OSError as e:
-                                logger.error(f"Failed to delete file {file_field.path}: {e}")
-
-                    simulation.result.delete()
+                    # Delete files not shared with cached copies
+                    SimulationService.delete_result_files(simulation.result)
                 simulation.delete()
+        StatusCacheService.invalidate(*[simulation_id for simulation_id in simulation_ids])
 
         return Response({
             'detail': f'Successfully deleted {deleted_count} simulation(s)',
@@ -14,6 +14,28 @@ OLD_SIMULATION_THRESHOLD_DAYS = 30  # Delete simulations older than this
 REDIS_KEY_EXPIRY = 86400  # 24 hours - Redis key expiration
 CELERY_BEAT_CLEAN_INTERVAL = 172800  # 2 days - cleanup task interval
 
+# ============================================================================
+# Redis connection pool (one per process, shared by web and worker code)
+# ============================================================================
+REDIS_MAX_CONNECTIONS = 20  # Connections per process, callers wait when all are busy
+REDIS_POOL_TIMEOUT = 5  # Seconds to wait for a free connection
+REDIS_SOCKET_TIMEOUT = 5  # Seconds per command
+REDIS_SOCKET_CONNECT_TIMEOUT = 5  # Seconds to establish a connection
+REDIS_HEALTH_CHECK_INTERVAL = 30  # PING idle connections older than this before reuse
+REDIS_MAX_STREAM_CONNECTIONS = 1000  # Async pool of the ASGI process, one per open event stream
+
+# ============================================================================
+# Solver progress
+# ============================================================================
+SOLVER_OUTPUT_POLL_INTERVAL = 0.5  # Seconds between reads of the solver output file
+SOLVER_PROGRESS_PUBLISH_INTERVAL = 2.0  # Minimum seconds between progress updates in Redis
+
+# ============================================================================
+# Event streams (Server-Sent Events)
+# ============================================================================
+SSE_KEEPALIVE_SECONDS = 15  # Comment line sent when no event arrived
+SSE_MAX_STREAM_SECONDS = 3600  # 1 hour - close the stream, EventSource reconnects
+
 # ============================================================================
 # Celery configuration
 # ============================================================================
@@ -21,6 +43,133 @@ CELERY_WORKER_MAX_TASKS = 100  # Restart worker after this many tasks
 CELERY_TASK_TIME_LIMIT = 3600  # 1 hour - hard time limit for tasks
 CELERY_TASK_SOFT_TIME_LIMIT = 3000  # 50 minutes - soft time limit
 
+# ============================================================================
+# Solver model
+# ============================================================================
+MODEL_TYPE_3D_SOLID = '3d_solid'  # SOLID186 tetrahedral mesh of the full beam
+MODEL_TYPE_PLANE_STRESS = 'plane_stress'  # PLANE183 with thickness = depth
+MODEL_TYPES = (MODEL_TYPE_3D_SOLID, MODEL_TYPE_PLANE_STRESS)
+DEFAULT_MODEL_TYPE = MODEL_TYPE_3D_SOLID
+SYMMETRY_MODEL_ENABLED = True  # Solve half the beam about y = width / 2 and mirror the fields
+
+# ============================================================================
+# MAPDL session pool
+# ============================================================================
+MAPDL_POOL_SIZE = 1  # Warm MAPDL sessions kept per worker process
+MAPDL_SESSION_MAX_JOBS = 50  # Recycle a session after this many jobs
+MAPDL_POOL_ACQUIRE_TIMEOUT = 600  # 10 minutes - wait for a free session
+MAPDL_POOL_PREWARM = True  # Launch sessions when the worker process starts
+
+# ============================================================================
+# Mesh cache
+# ============================================================================
+MESH_CACHE_MAX_BYTES = 2 * 1024 ** 3  # 2 GB - disk budget for archived meshed models
+
+# ============================================================================
+# Parameter hashing
+# ============================================================================
+PARAMETER_HASH_VERSION = 1  # Bump when the canonical form changes, old hashes stop matching
+PARAMETER_HASH_SIGNIFICANT_DIGITS = 10  # Relative precision parameters are quantized to
+PARAMETER_HASH_DIGITS = {}  # Per-parameter overrides, e.g. {'pressure': 6}
+
+# ============================================================================
+# Result reuse
+# ============================================================================
+SCALED_REUSE_ENABLED = True  # Scale stored linear-elastic fields instead of re-solving
+SCALED_REUSE_LOOKUP_LIMIT = 20  # Candidate simulations checked in the DB fallback
+
+# ============================================================================
+# Parametric sweeps
+# ============================================================================
+SWEEP_MAX_CASES = 50  # Maximum load steps solved in one sweep
+
+# ============================================================================
+# Cost model (pre-flight estimate of mesh size, memory and runtime)
+# ============================================================================
+COST_TETS_PER_CUBE = 6.0  # SOLID186 tetrahedra per element_size^3 cube
+COST_NODES_PER_TET = 1.5  # Nodes per quadratic tetrahedron in a free mesh
+COST_NODES_PER_QUAD = 3.0  # Nodes per 8-node PLANE183 quadrilateral
+COST_MEMORY_BASE_MB = 512  # MAPDL baseline memory
+COST_MEMORY_MB_PER_KDOF = 10.0  # Sparse direct solver memory per 1000 DOFs
+COST_SOLVE_BASE_SECONDS = 20.0  # Fixed per-job overhead (setup, post-processing)
+COST_SOLVE_SECONDS_PER_KDOF = 0.05  # Solve time coefficient per 1000 DOFs
+COST_SOLVE_EXPONENT = 1.3  # Solve time growth with problem size
+COST_MODEL_MIN_SAMPLES = 10  # Completed runs needed before regression is used
+COST_MODEL_SAMPLE_SIZE = 500  # Most recent completed runs used for regression
+COST_MODEL_REFRESH_SECONDS = 600  # 10 minutes - refit interval
+MAX_ESTIMATED_ELEMENTS = 2000000  # Reject submissions predicted to exceed this
+
+# ============================================================================
+# Simulation queues (routed by estimated wall time)
+# ============================================================================
+# Checked in order, a job goes to the first queue whose max_wall_time it fits.
+# concurrency and nproc apply to workers started with SIMULATION_WORKER_QUEUE=<name>.
+SIMULATION_QUEUES = {
+    'interactive': {
+        'max_wall_time': 60,  # 1 minute
+        'concurrency': 4,  # Worker processes
+        'nproc': 1,  # MAPDL cores per session
+        'soft_time_limit': 300,  # 5 minutes
+        'time_limit': 420,  # 7 minutes
+    },
+    'standard': {
+        'max_wall_time': 900,  # 15 minutes
+        'concurrency': 2,
+        'nproc': 2,
+        'soft_time_limit': CELERY_TASK_SOFT_TIME_LIMIT,
+        'time_limit': CELERY_TASK_TIME_LIMIT,
+    },
+    'heavy': {
+        'max_wall_time': None,  # Everything else
+        'concurrency': 1,
+        'nproc': 4,
+        'soft_time_limit': 14400,  # 4 hours
+        'time_limit': 15000,  # 4 hours 10 minutes
+    },
+}
+DEFAULT_SIMULATION_QUEUE = 'standard'  # Used when no cost estimate is available
+
+# ============================================================================
+# Stage timing
+# ============================================================================
+TIMING_PERCENTILES = (50, 90, 99)  # Percentiles reported per stage by the statistics endpoint
+TIMING_STATS_SAMPLE_SIZE = 500  # Most recent completed results aggregated
+
+# ============================================================================
+# Metrics endpoint
+# ============================================================================
+METRICS_DURATION_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 900, 1800, 3600, 14400)  # Histogram bounds (s)
+METRICS_DISK_USAGE_CACHE_SECONDS = 60  # Result directory is walked at most this often per process
+METRICS_POOL_REPORT_SECONDS = 60  # Worker processes refresh their MAPDL pool occupancy this often
+METRICS_POOL_STALE_SECONDS = 300  # Pool entries not refreshed for this long belong to dead workers
+
+# ============================================================================
+# Result summary statistics
+# ============================================================================
+SUMMARY_PERCENTILES = (50, 90, 95, 99)  # Percentiles of nodal stress and displacement in the summary
+SUMMARY_HISTOGRAM_BINS = 20  # Equal-width bins between the field minimum and maximum
+
+# ============================================================================
+# Stored nodal fields
+# ============================================================================
+FIELD_STORE_FLOAT_DTYPE = 'float32'  # Displacement and stress precision on disk, 'float64' keeps it exact
+FIELD_STORE_COMPRESSED = False  # Deflate the container; compressed fields are read into memory, not mapped
+FIELD_EXPORT_GROUPS = {  # ?fields= names of the field download, node_id is always included
+    'points': ('x', 'y', 'z'),
+    'displacement': ('ux', 'uy', 'uz'),
+    'usum': ('usum',),
+    'principal': ('s1', 's2', 's3', 'sint'),
+    'seqv': ('seqv',),
+}
+FIELD_EXPORT_GZIP = True  # Serve a gzip-encoded copy to clients sending Accept-Encoding: gzip
+DOWNLOAD_CHUNK_SIZE = 64 * 1024  # Bytes per chunk of streamed downloads
+
+# ============================================================================
+# Offline benchmark
+# ============================================================================
+BENCHMARK_ELEMENT_SIZES = (0.25, 0.125, 0.0625)  # Default element sizes (m), coarse to fine
+BENCHMARK_REPEAT = 3  # Runs per element size
+
 # ============================================================================
 # API Pagination
 # ============================================================================
@@ -31,4 +180,15 @@ MAX_PAGE_SIZE = 100  # Maximum items per page
 # Image generation settings
 # ============================================================================
 IMAGE_WINDOW_SIZE = [1920, 1080]  # Resolution for generated images [width, height]
+IMAGE_RENDERERS = ('matplotlib', 'pyvista')  # 2D contour maps of the beam face / off-screen VTK of the 3D grid
+IMAGE_RENDERER = 'matplotlib'  # Backend of images drawn from stored fields, one of IMAGE_RENDERERS
+IMAGE_CONTOUR_LEVELS = 20  # Filled contour bands of the matplotlib renderer
+IMAGE_VARIANT_WIDTHS = {'thumbnail': 320, 'medium': 960}  # Downscaled copies of every image, the full size is IMAGE_WINDOW_SIZE
+IMAGE_FORMATS = ('webp', 'png')  # Formats of every image size, listed in srcset maps in this order
+IMAGE_WEBP_QUALITY = 80  # Lossy WebP quality (0-100)
+ASYNC_RENDERING_ENABLED = True  # Render images on RENDER_QUEUE after COMPLETED instead of in the solver task
+RENDER_QUEUE = 'render'  # Celery queue of the render stage, consumed with SIMULATION_WORKER_QUEUE=render
+RENDER_WORKER_CONCURRENCY = 2  # Worker processes of a render worker
+RENDER_TASK_SOFT_TIME_LIMIT = 600  # 10 minutes
+RENDER_TASK_TIME_LIMIT = 660  # 11 minutes
 
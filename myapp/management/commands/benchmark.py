@@ -0,0 +1,189 @@
+import os
+import json
+import time
+import shutil
+import resource
+import tempfile
+import subprocess
+from contextlib import ExitStack, contextmanager
+from unittest.mock import patch
+from django.conf import settings
+from django.db import transaction
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from myapp.constants import BENCHMARK_ELEMENT_SIZES, BENCHMARK_REPEAT, DEFAULT_MODEL_TYPE, MODEL_TYPES
+from myapp.models import Simulation
+from myapp.services.event_service import SimulationEventService
+from myapp.services.mapdl_handler import MAPDLHandler
+from myapp.services.mapdl_pool import MAPDLSessionPool
+from myapp.services.mesh_cache_service import MeshCacheService
+from myapp.services.metrics_service import MetricsService
+from myapp.services.progress_service import SolverProgressReporter
+from myapp.services.simulation_service import SimulationService
+from myapp.services.status_cache_service import StatusCacheService
+from myapp.utils.fake_mapdl import FakeMapdl
+from myapp.utils.timing import summarize_timings
+
+# Geometry and load of every benchmark case, only element_size varies
+BENCHMARK_PARAMETERS = {
+    'length': 5, 'width': 2.5, 'depth': 0.1, 'radius': 0.5, 'num': 3,
+    'e': 2e11, 'nu': 0.27, 'pressure': 1000,
+}
+
+
+# Calls that write to the shared Redis: Prometheus series, status keys, progress and event channels,
+# mesh cache counters
+ISOLATED_CALLS = {
+    MetricsService: ('increment', 'observe', 'observe_timings', 'report_pool', 'remove_pool'),
+    StatusCacheService: ('publish', 'publish_many'),
+    SolverProgressReporter: ('publish',),
+    SimulationEventService: ('publish', 'publish_many'),
+    MeshCacheService: ('record',),
+}
+
+
+def skip_call(*args, **kwargs):
+    return None
+
+
+@contextmanager
+def isolated_from_deployment():
+    """Turn the metrics, status and event writes of the pipeline into no-ops"""
+    with ExitStack() as stack:
+        for service, names in ISOLATED_CALLS.items():
+            for name in names:
+                stack.enter_context(patch.object(service, name, skip_call))
+        yield
+
+
+def get_peak_rss_mb():
+    """Peak resident set size of this process in MB (ru_maxrss is in KB on Linux)"""
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def get_git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(element_sizes=BENCHMARK_ELEMENT_SIZES, repeat=BENCHMARK_REPEAT,
+                  model_type=DEFAULT_MODEL_TYPE, keep=False):
+    """
+    Run simulations end to end on the stand-in MAPDL engine and report their cost
+
+    Every run goes through ``SimulationService.run_simulation`` with the real
+    result processing, image rendering and database writes; only the MAPDL
+    session is replaced by ``FakeMapdl``. The runs never reach a live
+    deployment: metrics, status cache and event writes are skipped, and the
+    benchmark rows are rolled back at the end unless ``keep`` is set.
+    Returns the report dict.
+    """
+    with isolated_from_deployment(), transaction.atomic():
+        runs, elapsed = _run_jobs(element_sizes, repeat, model_type, keep)
+        if not keep:
+            transaction.set_rollback(True)
+
+    return {
+        'commit': get_git_commit(),
+        'model_type': model_type,
+        'jobs': len(runs),
+        'elapsed_seconds': round(elapsed, 4),
+        'throughput_jobs_per_minute': round(len(runs) * 60 / elapsed, 2) if elapsed else None,
+        'stage_timings_seconds': summarize_timings(run['timings'] for run in runs),
+        'peak_rss_mb': get_peak_rss_mb(),
+        'runs': runs,
+    }
+
+
+def _run_jobs(element_sizes, repeat, model_type, keep):
+    """Per-run details and the elapsed time of the benchmark jobs"""
+    handler = MAPDLHandler()
+    previous_pool = handler._pool
+    handler._pool = MAPDLSessionPool(size=1, launcher=FakeMapdl)
+
+    runs = []
+    created = []
+    started = time.perf_counter()
+    try:
+        for element_size in element_sizes:
+            for index in range(repeat):
+                # A distinct nu per run keeps the scaled-reuse and result caches out of the measurement
+                parameters = dict(BENCHMARK_PARAMETERS, element_size=element_size, model_type=model_type,
+                                  nu=round(BENCHMARK_PARAMETERS['nu'] + 0.001 * len(created), 6))
+                simulation = Simulation.objects.create(title='Benchmark', parameters=parameters, status='QUEUED')
+                created.append(simulation.id)
+
+                run_started = time.perf_counter()
+                # Images are rendered in-process so the render stage is part of the measurement
+                result = SimulationService.run_simulation(simulation.id, render_async=False)
+                wall_time = time.perf_counter() - run_started
+
+                summary = result.summary or {}
+                runs.append({
+                    'element_size': element_size,
+                    'repeat': index,
+                    'wall_time': round(wall_time, 4),
+                    'nodes': summary.get('node_count'),
+                    'elements': summary.get('element_count'),
+                    'timings': result.timings,
+                    'peak_rss_mb': get_peak_rss_mb(),
+                })
+    finally:
+        handler._pool.shutdown()
+        handler._pool = previous_pool
+        if not keep:
+            # The rows are rolled back, the files have to be removed by hand
+            for simulation_id in created:
+                shutil.rmtree(os.path.join(settings.MEDIA_ROOT, 'simulation_results', str(simulation_id)),
+                              ignore_errors=True)
+
+    return runs, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the simulation pipeline on a stand-in MAPDL engine, without a license. '
+        'Safe to run next to a live deployment: metrics, status cache and event writes to Redis are skipped, '
+        'the benchmark simulations are created in a transaction that is rolled back (kept with --keep) '
+        'and result files go to a temporary MEDIA_ROOT.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=float, nargs='+', default=list(BENCHMARK_ELEMENT_SIZES),
+                            help='Element sizes to run, smaller sizes give larger meshes')
+        parser.add_argument('--repeat', type=int, default=BENCHMARK_REPEAT, help='Runs per element size')
+        parser.add_argument('--model-type', choices=MODEL_TYPES, default=DEFAULT_MODEL_TYPE)
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+        parser.add_argument('--media-root', help='Directory for result files, a temporary one by default')
+        parser.add_argument('--keep', action='store_true', help='Commit the simulations to the database and keep their files')
+
+    def handle(self, *args, **options):
+        media_root = options['media_root'] or tempfile.mkdtemp(prefix='benchmark_')
+        try:
+            # The mesh cache lives under MEDIA_ROOT too, stand-in archives must not reach real sessions
+            with override_settings(MEDIA_ROOT=media_root):
+                report = run_benchmark(
+                    element_sizes=options['sizes'],
+                    repeat=options['repeat'],
+                    model_type=options['model_type'],
+                    keep=options['keep'],
+                )
+        finally:
+            if not options['media_root'] and not options['keep']:
+                shutil.rmtree(media_root, ignore_errors=True)
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output)
+            self.stdout.write(self.style.SUCCESS(
+                f"{report['jobs']} job(s), {report['throughput_jobs_per_minute']} jobs/min, "
+                f"report written to {options['output']}"))
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from myapp.models import Simulation
+from myapp.utils.parameter_hash import hash_parameters, hash_scaling_key
+
+HASH_FIELDS = ['parameters_hash', 'scaling_key']
+
+
+def rehash_simulations(queryset, batch_size=500, dry_run=False):
+    """Recompute ``parameters_hash`` and ``scaling_key`` of every simulation in ``queryset``, returns the number changed"""
+    changed = []
+    updated = 0
+    for simulation in queryset.only('id', 'parameters', *HASH_FIELDS).iterator(chunk_size=batch_size):
+        parameters_hash = hash_parameters(simulation.parameters) if simulation.parameters else None
+        scaling_key = hash_scaling_key(simulation.parameters) if simulation.parameters else None
+        if (parameters_hash, scaling_key) != (simulation.parameters_hash, simulation.scaling_key):
+            simulation.parameters_hash = parameters_hash
+            simulation.scaling_key = scaling_key
+            changed.append(simulation)
+        if len(changed) >= batch_size:
+            if not dry_run:
+                queryset.model.objects.bulk_update(changed, HASH_FIELDS)
+            updated += len(changed)
+            changed = []
+
+    if changed and not dry_run:
+        queryset.model.objects.bulk_update(changed, HASH_FIELDS)
+    return updated + len(changed)
+
+
+class Command(BaseCommand):
+    help = 'Recompute parameter hashes and scaling keys with the current canonical hashing scheme'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help='Only count outdated hashes')
+
+    def handle(self, *args, **options):
+        count = rehash_simulations(
+            Simulation.objects.all(),
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+        )
+        verb = 'would be updated' if options['dry_run'] else 'updated'
+        self.stdout.write(self.style.SUCCESS(f"{count} simulation hash(es) {verb}"))
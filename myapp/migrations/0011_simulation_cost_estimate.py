@@ -0,0 +1,53 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0010_simulation_parameters_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='simulation',
+            name='cost_estimate',
+            field=models.JSONField(blank=True, help_text='Predicted node/element count, memory and wall time', null=True),
+        ),
+        migrations.AddField(
+            model_name='simulation',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='simulation',
+            name='parameters_hash',
+            field=models.CharField(blank=True, db_index=True, help_text='SHA-256 hash of parameters for caching', max_length=128, null=True),
+        ),
+        migrations.AlterField(
+            model_name='simulationresult',
+            name='deformation_image',
+            field=models.ImageField(help_text='Deformation visualization image', null=True, upload_to='simulation_results/'),
+        ),
+        migrations.AlterField(
+            model_name='simulationresult',
+            name='mesh_image',
+            field=models.ImageField(help_text='Mesh visualization image', null=True, upload_to='simulation_results/'),
+        ),
+        migrations.AlterField(
+            model_name='simulationresult',
+            name='result_file',
+            field=models.FileField(help_text='Text file with complete simulation results', null=True, upload_to='simulation_results/'),
+        ),
+        migrations.AlterField(
+            model_name='simulationresult',
+            name='stress_image',
+            field=models.ImageField(help_text='Stress distribution (von Mises) image', null=True, upload_to='simulation_results/'),
+        ),
+        migrations.AlterField(
+            model_name='simulationresult',
+            name='summary',
+            field=models.JSONField(default=dict, help_text='Summary statistics (max/min/avg stress and displacement)'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0011_simulation_cost_estimate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='simulation',
+            name='queue',
+            field=models.CharField(blank=True, default='', help_text='Celery queue the simulation was routed to', max_length=32),
+        ),
+    ]
@@ -0,0 +1,68 @@
+import hashlib
+import json
+
+from django.db import migrations, models
+
+# Version 1 of the canonical parameter hash, frozen here so later changes to
+# myapp.utils.parameter_hash do not alter what this migration writes
+HASH_VERSION = 1
+SIGNIFICANT_DIGITS = 10
+PARAMETER_SCHEMA = {
+    'e': (float, 2e11),
+    'nu': (float, 0.27),
+    'length': (float, 5.0),
+    'width': (float, 2.5),
+    'depth': (float, 0.1),
+    'radius': (float, 0.5),
+    'num': (int, 3),
+    'element_size': (float, None),  # length / 40
+    'pressure': (float, 1000.0),
+    'model_type': (str, '3d_solid'),
+}
+
+
+def hash_parameters(parameters):
+    canonical = {}
+    for key, (kind, default) in PARAMETER_SCHEMA.items():
+        value = parameters.get(key, default)
+        try:
+            if value is None and key == 'element_size':
+                value = float(parameters.get('length', PARAMETER_SCHEMA['length'][1])) / 40
+            if kind is float:
+                value = float(f"{float(value):.{SIGNIFICANT_DIGITS}g}") + 0.0
+            elif kind is int:
+                value = int(round(float(value)))
+            else:
+                value = str(value)
+        except (TypeError, ValueError):
+            pass
+        canonical[key] = value
+    encoded = json.dumps(canonical, sort_keys=True, separators=(',', ':'))
+    return f"v{HASH_VERSION}:{hashlib.sha256(encoded.encode()).hexdigest()}"
+
+
+def rehash(apps, schema_editor):
+    Simulation = apps.get_model('myapp', 'Simulation')
+    changed = []
+    for simulation in Simulation.objects.only('id', 'parameters', 'parameters_hash').iterator(chunk_size=500):
+        parameters_hash = hash_parameters(simulation.parameters) if simulation.parameters else None
+        if parameters_hash != simulation.parameters_hash:
+            simulation.parameters_hash = parameters_hash
+            changed.append(simulation)
+    Simulation.objects.bulk_update(changed, ['parameters_hash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0012_simulation_queue'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='simulation',
+            name='parameters_hash',
+            field=models.CharField(blank=True, db_index=True, help_text='Versioned SHA-256 hash of the canonical parameters for caching', max_length=128, null=True),
+        ),
+        migrations.RunPython(rehash, migrations.RunPython.noop),
+    ]
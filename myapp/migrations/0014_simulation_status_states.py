@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0013_rehash_parameters'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='simulation',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('QUEUED', 'Queued'), ('RUNNING', 'Running'), ('POSTPROCESSING', 'Post-processing'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='PENDING', max_length=20),
+        ),
+    ]
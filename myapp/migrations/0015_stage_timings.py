@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0014_simulation_status_states'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='simulation',
+            name='queued_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='simulationresult',
+            name='timings',
+            field=models.JSONField(blank=True, help_text='Seconds spent per job stage (queue wait, solve, renders, ...)', null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 06:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0015_stage_timings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='simulationresult',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, help_text='Resized copies of each image: {image field: {size: {width, webp, png}}}'),
+        ),
+    ]
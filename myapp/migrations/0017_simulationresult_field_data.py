@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 06:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0016_simulationresult_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='simulationresult',
+            name='field_data',
+            field=models.FileField(blank=True, help_text='Nodal coordinates, connectivity, displacement and stresses (.npz)', null=True, upload_to='simulation_results/'),
+        ),
+    ]
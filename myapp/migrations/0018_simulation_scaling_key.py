@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 06:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0017_simulationresult_field_data'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='simulation',
+            name='scaling_key',
+            field=models.CharField(blank=True, db_index=True, help_text='Hash of the parameters except pressure and e, for scaled reuse', max_length=128, null=True),
+        ),
+    ]
@@ -1,9 +1,8 @@
 from datetime import timedelta
 from django.utils import timezone
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
-import hashlib
-import json
+from .utils.parameter_hash import hash_parameters, hash_scaling_key
 
 
 class Simulation(models.Model):
@@ -15,10 +14,22 @@ class Simulation(models.Model):
     """
     STATUS_CHOICES = [
         ('PENDING', 'Pending'),
+        ('QUEUED', 'Queued'),
         ('RUNNING', 'Running'),
+        ('POSTPROCESSING', 'Post-processing'),
         ('COMPLETED', 'Completed'),
         ('FAILED', 'Failed')
     ]
+    # Allowed status changes; PENDING -> COMPLETED is a result shared from another run
+    STATUS_TRANSITIONS = {
+        'PENDING': ('QUEUED', 'RUNNING', 'COMPLETED', 'FAILED'),
+        'QUEUED': ('RUNNING', 'FAILED'),
+        'RUNNING': ('POSTPROCESSING', 'FAILED'),
+        'POSTPROCESSING': ('COMPLETED', 'FAILED'),
+        'COMPLETED': ('PENDING',),
+        'FAILED': ('PENDING',),
+    }
+    ACTIVE_STATUSES = ('PENDING', 'QUEUED', 'RUNNING', 'POSTPROCESSING')
     title = models.CharField(max_length=255, null=True, blank=True)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -37,19 +48,79 @@ class Simulation(models.Model):
         db_index=True,
         null=True,
         blank=True,
-        help_text='SHA-256 hash of parameters for caching'
+        help_text='Versioned SHA-256 hash of the canonical parameters for caching'
+    )
+    scaling_key = models.CharField(
+        max_length=128,
+        db_index=True,
+        null=True,
+        blank=True,
+        help_text='Hash of the parameters except pressure and e, for scaled reuse'
+    )
+    cost_estimate = models.JSONField(
+        null=True,
+        blank=True,
+        help_text='Predicted node/element count, memory and wall time'
+    )
+    queue = models.CharField(
+        max_length=32,
+        blank=True,
+        default='',
+        help_text='Celery queue the simulation was routed to'
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    queued_at = models.DateTimeField(null=True, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
 
     def is_active(self):
         return timezone.now() < self.created_at + timedelta(days=2)
 
+    @classmethod
+    def get_source_statuses(cls, status):
+        """Statuses a simulation may move to ``status`` from"""
+        return [source for source, targets in cls.STATUS_TRANSITIONS.items() if status in targets]
+
+    def transition_to(self, status, **fields):
+        """
+        Move the simulation to ``status`` in a short transaction of its own
+
+        The stored status is re-read under a row lock, so a concurrent change
+        such as a cancellation is not overwritten, and only ``status`` and
+        ``fields`` are written. Returns False when the transition is not allowed.
+        """
+        with transaction.atomic():
+            current = (
+                Simulation.objects.select_for_update()
+                .filter(pk=self.pk).values_list('status', flat=True).first()
+            )
+            if current is None or status not in self.STATUS_TRANSITIONS.get(current, ()):
+                if current is not None:
+                    self.status = current
+                return False
+
+            self.status = status
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.save(update_fields=['status', *fields])
+        return True
+
+    @classmethod
+    def transition_many(cls, simulation_ids, status, **fields):
+        """Move every simulation that allows it to ``status`` in one UPDATE, returns the updated ids"""
+        with transaction.atomic():
+            queryset = cls.objects.select_for_update().filter(
+                id__in=simulation_ids, status__in=cls.get_source_statuses(status))
+            ids = list(queryset.values_list('id', flat=True))
+            if ids:
+                cls.objects.filter(id__in=ids).update(status=status, **fields)
+        return ids
+
     def save(self, *args, **kwargs):
-        # Generate parameters hash when saving (SHA-256)
+        # Generate parameters hash when saving (versioned SHA-256 of the canonical form)
         if self.parameters:
-            params_str = json.dumps(self.parameters, sort_keys=True)
-            self.parameters_hash = hashlib.sha256(params_str.encode()).hexdigest()
+            self.parameters_hash = hash_parameters(self.parameters)
+            self.scaling_key = hash_scaling_key(self.parameters)
         super().save(*args, **kwargs)
 
     def delete(self, *args, **kwargs):
@@ -93,10 +164,26 @@ class SimulationResult(models.Model):
         null=True,
         help_text='Deformation visualization image'
     )
+    field_data = models.FileField(
+        upload_to='simulation_results/',
+        null=True,
+        blank=True,
+        help_text='Nodal coordinates, connectivity, displacement and stresses (.npz)'
+    )
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text='Resized copies of each image: {image field: {size: {width, webp, png}}}'
+    )
     summary = models.JSONField(
         default=dict,
         help_text='Summary statistics (max/min/avg stress and displacement)'
     )
+    timings = models.JSONField(
+        null=True,
+        blank=True,
+        help_text='Seconds spent per job stage (queue wait, solve, renders, ...)'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
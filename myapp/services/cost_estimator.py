@@ -0,0 +1,167 @@
+import math
+import time
+import logging
+import threading
+import numpy as np
+from ..constants import (
+    DEFAULT_MODEL_TYPE,
+    MODEL_TYPE_PLANE_STRESS,
+    SYMMETRY_MODEL_ENABLED,
+    COST_TETS_PER_CUBE,
+    COST_NODES_PER_TET,
+    COST_NODES_PER_QUAD,
+    COST_MEMORY_BASE_MB,
+    COST_MEMORY_MB_PER_KDOF,
+    COST_SOLVE_BASE_SECONDS,
+    COST_SOLVE_SECONDS_PER_KDOF,
+    COST_SOLVE_EXPONENT,
+    COST_MODEL_MIN_SAMPLES,
+    COST_MODEL_SAMPLE_SIZE,
+    COST_MODEL_REFRESH_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class CostEstimator:
+    """
+    Predicts mesh size, memory and wall time of a simulation before it is queued
+
+    Starts from a closed-form estimate based on the beam geometry and element
+    size, and refines it with log-log regressions fitted on completed
+    simulations once enough samples exist.
+    """
+    _lock = threading.Lock()
+    _calibration = None
+    _calibrated_at = 0.0
+
+    @staticmethod
+    def closed_form(parameters):
+        """
+        Geometry-based estimate of element and node count of the full model
+
+        ``dof`` counts the degrees of freedom actually solved, which is half of
+        the full model when the symmetric half model is used.
+        """
+        length = float(parameters.get('length', 5))
+        width = float(parameters.get('width', 2.5))
+        depth = float(parameters.get('depth', 0.1))
+        radius = float(parameters.get('radius', 0.5))
+        num = int(parameters.get('num', 3))
+        element_size = float(parameters.get('element_size', length / 40))
+
+        area = max(length * width - num * math.pi * radius ** 2, 0.0)
+        solved_fraction = 0.5 if SYMMETRY_MODEL_ENABLED else 1.0
+
+        cells_in_plane = area / element_size ** 2
+        if parameters.get('model_type', DEFAULT_MODEL_TYPE) == MODEL_TYPE_PLANE_STRESS:
+            element_count = cells_in_plane
+            node_count = element_count * COST_NODES_PER_QUAD
+            dof = node_count * 2 * solved_fraction
+        else:
+            layers = max(1, math.ceil(depth / element_size))
+            element_count = cells_in_plane * layers * COST_TETS_PER_CUBE
+            node_count = element_count * COST_NODES_PER_TET
+            dof = node_count * 3 * solved_fraction
+
+        return {
+            'element_count': max(int(round(element_count)), 1),
+            'node_count': max(int(round(node_count)), 1),
+            'dof': max(int(round(dof)), 1),
+        }
+
+    @staticmethod
+    def _fit(predicted, actual):
+        """Fit log(actual) = a + b * log(predicted), returns (a, b)"""
+        slope, intercept = np.polyfit(np.log(predicted), np.log(actual), 1)
+        return float(intercept), float(slope)
+
+    @classmethod
+    def calibrate(cls):
+        """Fit the regressions on recently completed, actually solved simulations"""
+        from ..models import SimulationResult
+
+        results = (
+            SimulationResult.objects
+            .filter(simulation__status='COMPLETED')
+            .select_related('simulation')
+            .order_by('-created_at')[:COST_MODEL_SAMPLE_SIZE]
+        )
+
+        predicted_elements, actual_elements = [], []
+        predicted_nodes, actual_nodes = [], []
+        solved_dof, wall_times = [], []
+        for result in results:
+            summary = result.summary or {}
+            # Scaled and sweep results carry no meaningful solve time of their own
+            if 'scaled_from' in summary or 'sweep_step' in summary:
+                continue
+            if not summary.get('element_count') or not summary.get('node_count'):
+                continue
+
+            estimate = cls.closed_form(result.simulation.parameters)
+            predicted_elements.append(estimate['element_count'])
+            actual_elements.append(summary['element_count'])
+            predicted_nodes.append(estimate['node_count'])
+            actual_nodes.append(summary['node_count'])
+
+            simulation = result.simulation
+            if simulation.started_at and simulation.completed_at:
+                seconds = (simulation.completed_at - simulation.started_at).total_seconds()
+                if seconds > 0:
+                    dof_per_node = estimate['dof'] / estimate['node_count']
+                    solved_dof.append(summary['node_count'] * dof_per_node)
+                    wall_times.append(seconds)
+
+        calibration = {'samples': len(actual_elements)}
+        if len(actual_elements) >= COST_MODEL_MIN_SAMPLES:
+            calibration['element_count'] = cls._fit(predicted_elements, actual_elements)
+            calibration['node_count'] = cls._fit(predicted_nodes, actual_nodes)
+        if len(wall_times) >= COST_MODEL_MIN_SAMPLES:
+            calibration['wall_time'] = cls._fit(solved_dof, wall_times)
+        return calibration
+
+    @classmethod
+    def get_calibration(cls):
+        """Cached calibration, refitted every COST_MODEL_REFRESH_SECONDS"""
+        now = time.monotonic()
+        if cls._calibration is None or now - cls._calibrated_at > COST_MODEL_REFRESH_SECONDS:
+            with cls._lock:
+                if cls._calibration is None or now - cls._calibrated_at > COST_MODEL_REFRESH_SECONDS:
+                    try:
+                        cls._calibration = cls.calibrate()
+                    except Exception as e:
+                        logger.error(f"Failed to calibrate cost model: {e}")
+                        cls._calibration = {'samples': 0}
+                    cls._calibrated_at = now
+        return cls._calibration
+
+    @classmethod
+    def estimate(cls, parameters):
+        """Predicted node/element count, DOFs, memory (MB) and wall time (s)"""
+        estimate = cls.closed_form(parameters)
+        dof_per_node = estimate['dof'] / estimate['node_count']
+        calibration = cls.get_calibration()
+        method = 'closed_form'
+
+        for key in ('element_count', 'node_count'):
+            if key in calibration:
+                intercept, slope = calibration[key]
+                estimate[key] = max(int(round(math.exp(intercept) * estimate[key] ** slope)), 1)
+                method = 'calibrated'
+        estimate['dof'] = int(round(estimate['node_count'] * dof_per_node))
+
+        kdof = estimate['dof'] / 1000
+        if 'wall_time' in calibration:
+            intercept, slope = calibration['wall_time']
+            wall_time = math.exp(intercept) * estimate['dof'] ** slope
+        else:
+            wall_time = COST_SOLVE_BASE_SECONDS + COST_SOLVE_SECONDS_PER_KDOF * kdof ** COST_SOLVE_EXPONENT
+
+        estimate.update({
+            'memory_mb': round(COST_MEMORY_BASE_MB + COST_MEMORY_MB_PER_KDOF * kdof, 1),
+            'wall_time_seconds': round(wall_time, 1),
+            'method': method,
+            'samples': calibration.get('samples', 0),
+        })
+        return estimate
@@ -0,0 +1,57 @@
+import json
+import logging
+from ..utils.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Statuses after which the status itself no longer changes
+TERMINAL_STATUSES = ('COMPLETED', 'FAILED')
+
+
+def is_final_payload(payload):
+    """Whether no more events follow a status payload: FAILED, or COMPLETED with its images stored"""
+    if payload.get('status') not in TERMINAL_STATUSES:
+        return False
+    return not (payload.get('result_summary') or {}).get('images_pending')
+
+
+class SimulationEventService:
+    """
+    Publishes simulation events on a per-simulation Redis pub/sub channel
+
+    Events are JSON objects ``{"type": ..., "data": ...}``: ``status`` carries
+    the status payload (including the summary once completed), ``progress``
+    carries solver phase and progress information.
+    """
+
+    @staticmethod
+    def get_channel(simulation_id):
+        return f"simulation_events:{simulation_id}"
+
+    @staticmethod
+    def encode(event_type, data):
+        return json.dumps({'type': event_type, 'data': data}, separators=(',', ':'))
+
+    @staticmethod
+    def publish(simulation_id, event_type, data):
+        try:
+            get_redis_client().publish(
+                SimulationEventService.get_channel(simulation_id),
+                SimulationEventService.encode(event_type, data),
+            )
+        except Exception as e:
+            logger.error(f"Error publishing {event_type} event of simulation {simulation_id}: {e}")
+
+    @staticmethod
+    def publish_many(events):
+        """Publish ``(simulation_id, event_type, data)`` events in one round trip"""
+        if not events:
+            return
+        try:
+            pipe = get_redis_client().pipeline(transaction=False)
+            for simulation_id, event_type, data in events:
+                pipe.publish(SimulationEventService.get_channel(simulation_id),
+                             SimulationEventService.encode(event_type, data))
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Error publishing simulation events: {e}")
@@ -1,21 +1,37 @@
-from ansys.mapdl.core import launch_mapdl
 import os
+import shutil
+import threading
 import logging
 import matplotlib
-from django.utils.timezone import override
 
 
-from myapp.utils.image_capture import ImageCapture
+from myapp.services.mapdl_pool import MAPDLSessionPool
+from myapp.services.mesh_cache_service import MeshCacheService
+from myapp.services.progress_service import SolverProgressReporter
+from myapp.constants import (
+    DEFAULT_MODEL_TYPE,
+    MODEL_TYPE_PLANE_STRESS,
+    SYMMETRY_MODEL_ENABLED,
+    SOLVER_OUTPUT_POLL_INTERVAL,
+)
+from myapp.utils.field_store import SimulationFields
+from myapp.utils.solver_progress import SolverOutputMonitor
+from myapp.utils.timing import timed
 matplotlib.use('Agg')  # Установка неинтерактивного бэкенда
 from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
+# File name (without extension) of the meshed-model archive in the MAPDL working directory
+MESH_ARCHIVE_NAME = 'mesh_cache'
+# File name (without extension) the solver output is redirected to while solving
+SOLVER_OUTPUT_NAME = 'solve_progress'
+
 
 class MAPDLHandler:
     _instance = None
     _lock = threading.Lock()
-    _mapdl = None
+    _pool = None
 
     def __new__(cls):
         if cls._instance is None:
@@ -24,96 +40,261 @@ class MAPDLHandler:
                     cls._instance = super().__new__(cls)
         return cls._instance
 
-    def get_mapdl(self):
-        if self._mapdl is None:
-            try:
-                run_location = os.path.join(settings.MEDIA_ROOT, 'mapdl_runs')
-                os.makedirs(run_location, exist_ok=True)
-                self._mapdl = launch_mapdl(run_location=run_location)
-                logger.info("MAPDL session started successfully")
-            except Exception as e:
-                logger.error(f"Failed to start MAPDL: {str(e)}")
-                raise
-        return self._mapdl
+    def get_pool(self):
+        """Return the MAPDL session pool of the current process, creating it on first use"""
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = MAPDLSessionPool()
+        return self._pool
 
     def run_simulation(self, parameters):
         """runs the simulation with given parameters"""
         try:
-            mapdl = self.get_mapdl()
+            # The session is reset and returned to the pool when the block exits
+            with self.get_pool().session() as mapdl:
+                simulation_id = parameters.get('id', 'temp')
+                simulation_dir = os.path.join(settings.MEDIA_ROOT, 'simulation_results', str(simulation_id))
+                os.makedirs(simulation_dir, exist_ok=True)
 
-            simulation_id = parameters.get('id', 'temp')
-            simulation_dir = os.path.join(settings.MEDIA_ROOT, 'simulation_results', str(simulation_id))
-            os.makedirs(simulation_dir, exist_ok=True)
+                solution_output_path = os.path.join(simulation_dir, 'solve_output.txt')
+                reporter = SolverProgressReporter([parameters.get('id')])
 
-            solution_output_path = os.path.join(simulation_dir, 'solve_output.txt')
+                reporter.set_phase('mesh')
+                mapdl.prep7()
+                self.prepare_mesh(mapdl, parameters)
 
-            mapdl.clear()
-            mapdl.prep7()
+                mapdl.mp('EX', 1, parameters.get('e', 2e11))
+                mapdl.mp('NUXY', 1, parameters.get('nu', 0.27))
 
-            mapdl.et(1, 'SOLID186')
-            mapdl.mp('EX', 1, parameters.get('e', 2e11))
-            mapdl.mp('NUXY', 1, parameters.get('nu', 0.27))
+                length = parameters.get('length', 5)
 
-            length = parameters.get('length', 5)
-            width = parameters.get('width', 2.5)
-            depth = parameters.get('depth', 0.1)
-            radius = parameters.get('radius', 0.5)
-            num = parameters.get('num', 3)
+                self.apply_supports(mapdl, parameters)
+                mapdl.nsel('S', 'LOC', 'X', length)
+                mapdl.sf('ALL', 'PRES', parameters.get('pressure', 1000))
+                mapdl.nsel('ALL')
 
-            mapdl.block(0, length, 0, width, 0, depth)
-            for i in range(1, num + 1):
-                mapdl.cyl4(i * length / (num + 1), width / 2, radius, '', '', '', depth)
-            mapdl.vsbv(1, 'ALL')
+                mapdl.finish()
+                mapdl.slashsolu()
 
-            element_size = parameters.get('element_size', length / 40) #
-            mapdl.esize(element_size)
-            mapdl.mshape(1, "3D")
-            mapdl.mshkey(0)
-            mapdl.vmesh('ALL')
+                mapdl.outres('ALL', 'ALL')  # Request all result items
+                # mapdl.outres('NSOL', 'ALL')  # Nodal solution
+                # mapdl.outres('RSOL', 'ALL')  # Reaction solution
+                mapdl.outres("STRS", "ALL") ## Toto by malo pomôcť nech je výstup aj Stress
+
+
+                reporter.set_phase('solve')
+                with timed('solve'):
+                    solve_output = self.solve_with_progress(mapdl, reporter, lambda: mapdl.solve(write_to_file=True))
+
+                with open(solution_output_path, 'w') as f:
+                    f.write(str(solve_output))
+
+                reporter.set_phase('post')
+                with timed('result_extraction'):
+                    mapdl.post1()
+                    mapdl.set(1)
+                    result = mapdl.result
+
+                result._solution_output_path = solution_output_path
+                # Fields are read while the session is held (mirrored for half models);
+                # the render stage draws the images from them after MAPDL is released
+                result._fields = self.extract_fields(result, parameters)
 
-            mapdl.nsel('S', 'LOC', 'X', 0)
-            mapdl.d('ALL', 'ALL', 0)
-            mapdl.nsel('S', 'LOC', 'X', length)
-            mapdl.sf('ALL', 'PRES', parameters.get('pressure', 1000))
-            mapdl.nsel('ALL')
+                return result
 
-            mapdl.finish()
-            mapdl.slashsolu()
+        except Exception as e:
+            logger.error(f"MAPDL simulation failed: {str(e)}", exc_info=True)
+            raise Exception(f"MAPDL simulation failed: {str(e)}")
+
+    def run_sweep(self, parameters, pressures):
+        """
+        Solve one load step per pressure on a single mesh in one MAPDL session
+
+        Result set ``i`` of the returned result belongs to ``pressures[i]``.
+        No images are rendered here, they are drawn from the extracted fields.
+        """
+        try:
+            with self.get_pool().session() as mapdl:
+                simulation_id = parameters.get('id', 'temp')
+                simulation_dir = os.path.join(settings.MEDIA_ROOT, 'simulation_results', str(simulation_id))
+                os.makedirs(simulation_dir, exist_ok=True)
+
+                solution_output_path = os.path.join(simulation_dir, 'solve_output.txt')
+                reporter = SolverProgressReporter(parameters.get('sweep_ids') or [parameters.get('id')])
+
+                reporter.set_phase('mesh')
+                mapdl.prep7()
+                self.prepare_mesh(mapdl, parameters)
 
-            mapdl.outres('ALL', 'ALL')  # Request all result items
-            # mapdl.outres('NSOL', 'ALL')  # Nodal solution
-            # mapdl.outres('RSOL', 'ALL')  # Reaction solution
-            mapdl.outres("STRS", "ALL") ## Toto by malo pomôcť nech je výstup aj Stress
+                mapdl.mp('EX', 1, parameters.get('e', 2e11))
+                mapdl.mp('NUXY', 1, parameters.get('nu', 0.27))
 
+                length = parameters.get('length', 5)
 
-            solve_output = mapdl.solve(write_to_file=True)
+                self.apply_supports(mapdl, parameters)
 
-            with open(solution_output_path, 'w') as f:
-                f.write(str(solve_output))
+                mapdl.finish()
+                mapdl.slashsolu()
 
-            mapdl.post1()
-            mapdl.set(1)
-            result = mapdl.result
+                mapdl.outres('ALL', 'ALL')
+                mapdl.outres("STRS", "ALL")
 
-            result._solution_output_path = solution_output_path
-            image_paths = ImageCapture.save_simulation_images(mapdl, result, simulation_id, simulation_dir)
+                # Each load step replaces the end pressure and is written to Jobname.Snn
+                for step, pressure in enumerate(pressures, start=1):
+                    mapdl.nsel('S', 'LOC', 'X', length)
+                    mapdl.sf('ALL', 'PRES', pressure)
+                    mapdl.nsel('ALL')
+                    mapdl.lswrite(step)
 
-            result._image_paths = image_paths
+                reporter.set_phase('solve')
+                with timed('solve'):
+                    solve_output = self.solve_with_progress(mapdl, reporter, lambda: mapdl.lssolve(1, len(pressures)))
 
-            return result
+                with open(solution_output_path, 'w') as f:
+                    f.write(str(solve_output))
+
+                reporter.set_phase('post')
+                with timed('result_extraction'):
+                    mapdl.post1()
+                    mapdl.set(1)
+                    result = mapdl.result
+
+                result._solution_output_path = solution_output_path
+
+                return result
 
         except Exception as e:
-            logger.error(f"MAPDL simulation failed: {str(e)}", exc_info=True)
-            raise Exception(f"MAPDL simulation failed: {str(e)}")
+            logger.error(f"MAPDL sweep failed: {str(e)}", exc_info=True)
+            raise Exception(f"MAPDL sweep failed: {str(e)}")
 
-    def close_mapdl(self):
-        if self._mapdl is not None:
+    def solve_with_progress(self, mapdl, reporter, solve):
+        """
+        Run ``solve`` with the solver output redirected to a file that is parsed while it grows
+
+        Returns the solver output text, the same text ``solve`` returns without
+        the redirection.
+        """
+        output_path = os.path.join(mapdl.directory, f"{SOLVER_OUTPUT_NAME}.out")
+        if os.path.exists(output_path):
+            os.remove(output_path)
+
+        mapdl.run(f"/OUTPUT,{SOLVER_OUTPUT_NAME},out")
+        try:
+            with SolverOutputMonitor(output_path, reporter.update, poll_interval=SOLVER_OUTPUT_POLL_INTERVAL):
+                response = solve()
+        finally:
+            mapdl.run("/OUTPUT")
+        reporter.publish()
+
+        if os.path.exists(output_path):
+            with open(output_path, 'r', errors='replace') as f:
+                return f.read() + str(response or '')
+        return response
+
+    @staticmethod
+    def uses_symmetry(parameters):
+        """
+        Whether the model can be solved as a half model
+
+        Holes are always centered at width / 2 and the support and end pressure
+        are uniform over the width, so the problem is symmetric about the
+        y = width / 2 plane whenever the feature is enabled.
+        """
+        return SYMMETRY_MODEL_ENABLED
+
+    def extract_fields(self, result, parameters, rnum=0):
+        """Nodal fields of the full model for result set ``rnum``"""
+        with timed('result_extraction'):
+            fields = SimulationFields.from_result(result, rnum=rnum)
+            if self.uses_symmetry(parameters):
+                fields = fields.mirrored(axis=1, plane=parameters.get('width', 2.5) / 2)
+        return fields
+
+    def apply_supports(self, mapdl, parameters):
+        """Fix the beam at x = 0 and, for half models, constrain the symmetry plane"""
+        mapdl.nsel('S', 'LOC', 'X', 0)
+        mapdl.d('ALL', 'ALL', 0)
+        if self.uses_symmetry(parameters):
+            mapdl.nsel('S', 'LOC', 'Y', parameters.get('width', 2.5) / 2)
+            mapdl.d('ALL', 'UY', 0)
+        mapdl.nsel('ALL')
+
+    def prepare_mesh(self, mapdl, parameters):
+        """Resume the meshed geometry from the mesh cache, or build and archive it"""
+        geometry_hash = MeshCacheService.get_geometry_hash(
+            dict(parameters, symmetry=self.uses_symmetry(parameters)))
+        archive_path = MeshCacheService.lookup(geometry_hash)
+
+        if archive_path:
             try:
-                self._mapdl.exit()
-                self._mapdl = None
-                logger.info("MAPDL session closed successfully")
+                with timed('mesh_resume'):
+                    shutil.copyfile(archive_path, os.path.join(mapdl.directory, f"{MESH_ARCHIVE_NAME}.db"))
+                    mapdl.resume(MESH_ARCHIVE_NAME, 'db')
+                    mapdl.prep7()
+                logger.info(f"Reused cached mesh {geometry_hash}")
+                return
             except Exception as e:
-                logger.error(f"Error closing MAPDL: {str(e)}")
+                logger.warning(f"Failed to resume cached mesh {geometry_hash}, meshing again: {str(e)}")
+                mapdl.clear()
+                mapdl.prep7()
+
+        self.build_mesh(mapdl, parameters)
+
+        try:
+            with timed('mesh_archive'):
+                mapdl.save(MESH_ARCHIVE_NAME, 'db')
+                MeshCacheService.store(geometry_hash, os.path.join(mapdl.directory, f"{MESH_ARCHIVE_NAME}.db"))
+        except Exception as e:
+            logger.warning(f"Failed to archive mesh {geometry_hash}: {str(e)}")
+
+    def build_mesh(self, mapdl, parameters):
+        """Create the beam geometry with holes and mesh it"""
+        length = parameters.get('length', 5)
+        width = parameters.get('width', 2.5)
+        depth = parameters.get('depth', 0.1)
+        radius = parameters.get('radius', 0.5)
+        num = parameters.get('num', 3)
+        element_size = parameters.get('element_size', length / 40) #
+
+        # Half models stop at the symmetry plane, the hole cylinders are cut in half by it
+        height = width / 2 if self.uses_symmetry(parameters) else width
 
-    def __del__(self):
-        self.close_mapdl()
+        if parameters.get('model_type', DEFAULT_MODEL_TYPE) == MODEL_TYPE_PLANE_STRESS:
+            # 2D model of the beam face, depth enters as element thickness
+            mapdl.et(1, 'PLANE183')
+            mapdl.keyopt(1, 3, 3)  # Plane stress with thickness
+            mapdl.r(1, depth)
+
+            with timed('geometry'):
+                mapdl.rectng(0, length, 0, height)
+                for i in range(1, num + 1):
+                    mapdl.cyl4(i * length / (num + 1), width / 2, radius)
+                mapdl.asba(1, 'ALL')
+
+            with timed('meshing'):
+                mapdl.esize(element_size)
+                mapdl.mshape(0, "2D")
+                mapdl.mshkey(0)
+                mapdl.amesh('ALL')
+            return
+
+        mapdl.et(1, 'SOLID186')
+
+        with timed('geometry'):
+            mapdl.block(0, length, 0, height, 0, depth)
+            for i in range(1, num + 1):
+                mapdl.cyl4(i * length / (num + 1), width / 2, radius, '', '', '', depth)
+            mapdl.vsbv(1, 'ALL')
+
+        with timed('meshing'):
+            mapdl.esize(element_size)
+            mapdl.mshape(1, "3D")
+            mapdl.mshkey(0)
+            mapdl.vmesh('ALL')
+
+    def close_mapdl(self):
+        """Shut down every warm MAPDL session of this process"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            logger.info("MAPDL session pool closed")
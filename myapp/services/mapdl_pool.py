@@ -0,0 +1,234 @@
+import os
+import time
+import queue
+import threading
+import logging
+from contextlib import contextmanager
+from ansys.mapdl.core import launch_mapdl
+from django.conf import settings
+from ..constants import (
+    MAPDL_POOL_SIZE, MAPDL_SESSION_MAX_JOBS, MAPDL_POOL_ACQUIRE_TIMEOUT, METRICS_POOL_REPORT_SECONDS,
+)
+from .queue_router import QueueRouter
+from .metrics_service import MetricsService
+from ..utils.timing import timed
+
+logger = logging.getLogger(__name__)
+
+
+class PooledSession:
+    """A warm MAPDL instance together with its usage counters"""
+
+    def __init__(self, mapdl, index):
+        self.mapdl = mapdl
+        self.index = index
+        self.jobs = 0
+
+    def is_healthy(self):
+        """Check that the MAPDL process is still alive and responding"""
+        try:
+            if getattr(self.mapdl, 'exited', False):
+                return False
+            return bool(getattr(self.mapdl, 'is_alive', True))
+        except Exception:
+            return False
+
+    def close(self):
+        try:
+            self.mapdl.exit()
+        except Exception as e:
+            logger.error(f"Error closing MAPDL session {self.index}: {str(e)}")
+
+
+class MAPDLSessionPool:
+    """
+    Pool of warm MAPDL sessions owned by a single worker process
+
+    Sessions are launched once (usually when the Celery worker process starts),
+    reset with ``mapdl.clear()`` between jobs and recycled after
+    ``max_jobs`` jobs or as soon as a job fails. A recycled session is only
+    discarded; its replacement is launched by the next ``acquire``, so the
+    finishing job does not pay for the launch. ``launcher`` replaces
+    ``launch_mapdl``, e.g. with the stand-in engine of the benchmark.
+    Occupancy is reported on every change and every
+    ``METRICS_POOL_REPORT_SECONDS``, so idle workers stay visible to the
+    metrics endpoint.
+    """
+
+    def __init__(self, size=MAPDL_POOL_SIZE, max_jobs=MAPDL_SESSION_MAX_JOBS, launcher=None):
+        self.size = size
+        self.max_jobs = max_jobs
+        self.launcher = launcher
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._launching = 0
+        self._next_index = 0
+        self.launched = 0
+        self.recycled = 0
+        self._stopped = threading.Event()
+        self._heartbeat = None
+
+    def _reserve(self):
+        """Index of a claimed slot for a new session, None when the pool is full"""
+        with self._lock:
+            if len(self._sessions) + self._launching >= self.size:
+                return None
+            self._launching += 1
+            index = self._next_index
+            self._next_index += 1
+            return index
+
+    def _launch(self, index):
+        """Launch the session of a slot claimed with ``_reserve``"""
+
+        run_location = os.path.join(settings.MEDIA_ROOT, 'mapdl_runs', f"{os.getpid()}_{index}")
+        os.makedirs(run_location, exist_ok=True)
+        launch_options = {'run_location': run_location}
+        nproc = QueueRouter.get_worker_nproc()
+        if nproc:
+            launch_options['nproc'] = nproc
+        try:
+            with timed('mapdl_launch'):
+                mapdl = (self.launcher or launch_mapdl)(**launch_options)
+        except Exception as e:
+            logger.error(f"Failed to start MAPDL: {str(e)}")
+            self._release_slot()
+            raise
+
+        session = PooledSession(mapdl, index)
+        with self._lock:
+            self._launching -= 1
+            self._sessions[index] = session
+            self.launched += 1
+        logger.info(f"MAPDL session {index} started successfully")
+        return session
+
+    def _release_slot(self):
+        """Give up a slot claimed with ``_reserve`` whose launch failed"""
+        with self._lock:
+            self._launching -= 1
+        # Wake a job waiting for a session, it can launch into the free slot
+        self._idle.put(None)
+
+    def _discard(self, session):
+        with self._lock:
+            self._sessions.pop(session.index, None)
+        session.close()
+        self._idle.put(None)
+
+    def start(self):
+        """Launch sessions until the pool is full"""
+        while True:
+            index = self._reserve()
+            if index is None:
+                break
+            self._idle.put(self._launch(index))
+        self.report()
+
+    def acquire(self, timeout=MAPDL_POOL_ACQUIRE_TIMEOUT):
+        """Take a healthy session out of the pool, launching one if needed"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                # Size check and reservation under one lock, concurrent jobs cannot overfill the pool
+                index = self._reserve()
+                if index is not None:
+                    return self._launch(index)
+                try:
+                    session = self._idle.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    raise TimeoutError(f"No MAPDL session became available within {timeout}s")
+
+            if session is None:
+                # A slot was freed, launch into it on the next pass
+                continue
+            if session.is_healthy():
+                return session
+
+            logger.warning(f"MAPDL session {session.index} failed health check, replacing it")
+            self._discard(session)
+            self.recycled += 1
+
+    def release(self, session, failed=False):
+        """Return a session after a job, resetting or recycling it"""
+        session.jobs += 1
+
+        if not failed and session.jobs < self.max_jobs:
+            try:
+                session.mapdl.clear()
+                self._idle.put(session)
+                return
+            except Exception as e:
+                logger.warning(f"Failed to reset MAPDL session {session.index}: {str(e)}")
+
+        reason = 'job failure' if failed else f"{session.jobs} jobs"
+        logger.info(f"Recycling MAPDL session {session.index} after {reason}")
+        self._discard(session)
+        self.recycled += 1
+
+    @contextmanager
+    def session(self):
+        """Context manager yielding a MAPDL instance for the duration of one job"""
+        with timed('mapdl_acquire'):
+            session = self.acquire()
+        self.report()
+        failed = False
+        try:
+            yield session.mapdl
+        except Exception:
+            failed = True
+            raise
+        finally:
+            with timed('mapdl_release'):
+                self.release(session, failed=failed)
+            self.report()
+
+    def shutdown(self):
+        """Exit every session owned by the pool"""
+        self._stopped.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        while not self._idle.empty():
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        for session in sessions:
+            session.close()
+        MetricsService.remove_pool()
+        if sessions:
+            logger.info(f"Closed {len(sessions)} MAPDL session(s)")
+
+    def report(self):
+        """Publish the occupancy, starting the periodic report on first use"""
+        MetricsService.report_pool(self.stats())
+        with self._lock:
+            if self._heartbeat is not None or self._stopped.is_set():
+                return
+            self._heartbeat = threading.Thread(target=self._report_periodically, name='mapdl-pool-report', daemon=True)
+        self._heartbeat.start()
+
+    def _report_periodically(self):
+        while not self._stopped.wait(METRICS_POOL_REPORT_SECONDS):
+            MetricsService.report_pool(self.stats())
+
+    def stats(self):
+        """Current pool occupancy"""
+        total = len(self._sessions)
+        with self._idle.mutex:
+            # None entries only mark free slots
+            idle = sum(1 for session in self._idle.queue if session is not None)
+        return {
+            'size': self.size,
+            'sessions': total,
+            'idle': idle,
+            'busy': max(total - idle, 0),
+            'launched': self.launched,
+            'recycled': self.recycled,
+        }
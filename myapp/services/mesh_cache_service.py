@@ -0,0 +1,124 @@
+import logging
+import os
+import shutil
+from django.conf import settings
+from ..constants import MESH_CACHE_MAX_BYTES
+from ..utils.parameter_hash import canonicalize_parameters, hash_canonical
+from ..utils.redis_client import get_redis_client, get_many
+
+logger = logging.getLogger(__name__)
+
+# Parameters that fully determine the meshed geometry
+GEOMETRY_PARAMETERS = ('length', 'width', 'depth', 'radius', 'num', 'element_size', 'model_type', 'symmetry')
+
+
+class MeshCacheService:
+    """
+    On-disk cache of meshed MAPDL models keyed by a geometry hash
+
+    Archives are stored under ``MEDIA_ROOT/mesh_cache`` and evicted in
+    least-recently-used order (file modification time is bumped on every hit)
+    once the cache exceeds ``MESH_CACHE_MAX_BYTES``.
+    """
+
+    @staticmethod
+    def get_geometry_hash(parameters):
+        """Generate a hash from the parameters that define geometry and mesh"""
+        geometry = canonicalize_parameters(parameters, keys=GEOMETRY_PARAMETERS)
+        geometry['symmetry'] = bool(parameters.get('symmetry', False))
+        return hash_canonical(geometry)
+
+    @staticmethod
+    def get_cache_dir():
+        cache_dir = os.path.join(settings.MEDIA_ROOT, 'mesh_cache')
+        os.makedirs(cache_dir, exist_ok=True)
+        return cache_dir
+
+    @staticmethod
+    def get_archive_path(geometry_hash):
+        return os.path.join(MeshCacheService.get_cache_dir(), f"{geometry_hash}.db")
+
+    @staticmethod
+    def lookup(geometry_hash):
+        """Return the archive path for a geometry, or None on a miss"""
+        path = MeshCacheService.get_archive_path(geometry_hash)
+        if os.path.exists(path):
+            try:
+                os.utime(path)  # Mark as recently used
+            except OSError:
+                pass
+            MeshCacheService.record('hits')
+            return path
+        MeshCacheService.record('misses')
+        return None
+
+    @staticmethod
+    def store(geometry_hash, source_path):
+        """Copy a freshly written archive into the cache and enforce the disk budget"""
+        path = MeshCacheService.get_archive_path(geometry_hash)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            shutil.copyfile(source_path, temp_path)
+            # Atomic so concurrent workers never see a partial archive
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.error(f"Failed to store mesh archive {geometry_hash}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return None
+
+        MeshCacheService.evict()
+        return path
+
+    @staticmethod
+    def evict(max_bytes=MESH_CACHE_MAX_BYTES):
+        """Remove least recently used archives until the cache fits the budget"""
+        cache_dir = MeshCacheService.get_cache_dir()
+        entries = []
+        for entry in os.scandir(cache_dir):
+            if entry.is_file() and entry.name.endswith('.db'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError as e:
+                logger.error(f"Failed to evict mesh archive {path}: {e}")
+
+        if removed:
+            logger.info(f"Evicted {removed} mesh archive(s), cache size now {total} bytes")
+        return removed
+
+    @staticmethod
+    def record(event):
+        """Increment the shared hit/miss counter"""
+        try:
+            get_redis_client().incr(f"mesh_cache:{event}")
+        except Exception as e:
+            logger.error(f"Error recording mesh cache {event}: {e}")
+
+    @staticmethod
+    def stats():
+        """Hit/miss counters and current disk usage of the cache"""
+        entries = [entry for entry in os.scandir(MeshCacheService.get_cache_dir())
+                   if entry.is_file() and entry.name.endswith('.db')]
+        stats = {
+            'entries': len(entries),
+            'bytes': sum(entry.stat().st_size for entry in entries),
+            'hits': 0,
+            'misses': 0,
+        }
+        try:
+            hits, misses = get_many(['mesh_cache:hits', 'mesh_cache:misses'])
+            stats['hits'] = int(hits or 0)
+            stats['misses'] = int(misses or 0)
+        except Exception as e:
+            logger.error(f"Error reading mesh cache counters: {e}")
+        return stats
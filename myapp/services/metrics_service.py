@@ -0,0 +1,261 @@
+import os
+import json
+import time
+import socket
+import logging
+import threading
+from django.conf import settings
+from django.db.models import Count
+from ..constants import (
+    SIMULATION_QUEUES, RENDER_QUEUE, METRICS_DURATION_BUCKETS, METRICS_DISK_USAGE_CACHE_SECONDS,
+    METRICS_POOL_STALE_SECONDS,
+)
+from ..utils.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+COUNTERS_KEY = 'metrics:counters'
+HISTOGRAMS_KEY = 'metrics:histograms'
+POOL_KEY = 'metrics:mapdl_pool'
+
+# Celery queues whose backlog is reported, simulations are routed to SIMULATION_QUEUES
+CELERY_QUEUES = ('celery',) + tuple(SIMULATION_QUEUES) + (RENDER_QUEUE,)
+# Kombu keeps messages of priority > 0 in separate lists named <queue>\x06\x16<priority>
+KOMBU_PRIORITY_STEPS = (3, 6, 9)
+
+# Counters kept in COUNTERS_KEY, with their help text
+COUNTERS = {
+    'simulation_cache_hits_total': 'Submissions answered with an identical completed result',
+    'simulation_cache_misses_total': 'Submissions without an identical completed result',
+    'scaling_reference_hits_total': 'Runs answered by scaling a reference result',
+    'scaling_reference_misses_total': 'Runs without a scaling reference',
+    'inflight_coalesced_total': 'Submissions attached to an identical in-flight run',
+}
+
+# Histograms kept in HISTOGRAMS_KEY, with their help text
+HISTOGRAMS = {
+    'simulation_queue_wait_seconds': 'Time between queuing and the start of a simulation',
+    'simulation_run_seconds': 'Wall time of a simulation job, excluding the queue wait',
+    'simulation_render_seconds': 'Wall time of rendering the images of a simulation',
+}
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in labels.items()
+    )
+    return '{' + pairs + '}'
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsService:
+    """
+    Prometheus text-format metrics shared by the web and worker processes
+
+    Workers add to counters and histograms kept in Redis hashes so every
+    process reports the same totals; queue depth, job counts and disk usage
+    are read when the metrics are scraped.
+    """
+    _disk_lock = threading.Lock()
+    _disk_usage = None
+    _disk_usage_at = 0.0
+
+    @staticmethod
+    def increment(name, amount=1):
+        try:
+            get_redis_client().hincrbyfloat(COUNTERS_KEY, name, amount)
+        except Exception as e:
+            logger.error(f"Error incrementing metric {name}: {e}")
+
+    @staticmethod
+    def observe(name, value, buckets=METRICS_DURATION_BUCKETS):
+        """Record ``value`` in a cumulative histogram (every bucket with le >= value)"""
+        try:
+            pipe = get_redis_client().pipeline(transaction=False)
+            for bound in buckets:
+                if value <= bound:
+                    pipe.hincrby(HISTOGRAMS_KEY, f"{name}:{bound}", 1)
+            pipe.hincrby(HISTOGRAMS_KEY, f"{name}:+Inf", 1)
+            pipe.hincrbyfloat(HISTOGRAMS_KEY, f"{name}:sum", value)
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Error observing metric {name}: {e}")
+
+    @staticmethod
+    def observe_timings(timings):
+        """Feed the queue-wait and run-time histograms from the stage timings of a job"""
+        if 'queue_wait' in timings:
+            MetricsService.observe('simulation_queue_wait_seconds', timings['queue_wait'])
+        if 'total' in timings:
+            MetricsService.observe('simulation_run_seconds', timings['total'])
+
+    @staticmethod
+    def get_worker_name():
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    @staticmethod
+    def report_pool(stats):
+        """Publish the MAPDL pool occupancy of this worker process"""
+        try:
+            get_redis_client().hset(POOL_KEY, MetricsService.get_worker_name(),
+                                    json.dumps(dict(stats, updated_at=time.time())))
+        except Exception as e:
+            logger.error(f"Error reporting MAPDL pool metrics: {e}")
+
+    @staticmethod
+    def remove_pool():
+        try:
+            get_redis_client().hdel(POOL_KEY, MetricsService.get_worker_name())
+        except Exception as e:
+            logger.error(f"Error removing MAPDL pool metrics: {e}")
+
+    @classmethod
+    def get_disk_usage(cls):
+        """Bytes and file count under MEDIA_ROOT/simulation_results, recomputed at most once a minute"""
+        now = time.monotonic()
+        with cls._disk_lock:
+            if cls._disk_usage is not None and now - cls._disk_usage_at < METRICS_DISK_USAGE_CACHE_SECONDS:
+                return cls._disk_usage
+
+            total_bytes, files = 0, 0
+            for root, _, names in os.walk(os.path.join(settings.MEDIA_ROOT, 'simulation_results')):
+                for name in names:
+                    try:
+                        total_bytes += os.path.getsize(os.path.join(root, name))
+                        files += 1
+                    except OSError:
+                        pass
+            cls._disk_usage = {'bytes': total_bytes, 'files': files}
+            cls._disk_usage_at = now
+            return cls._disk_usage
+
+    @staticmethod
+    def collect_redis(lines):
+        """Queue depth, shared counters, histograms and pool occupancy of live workers"""
+        redis_client = get_redis_client()
+        pipe = redis_client.pipeline(transaction=False)
+        for queue_name in CELERY_QUEUES:
+            pipe.llen(queue_name)
+            for priority in KOMBU_PRIORITY_STEPS:
+                pipe.llen(f"{queue_name}\x06\x16{priority}")
+        pipe.hgetall(COUNTERS_KEY)
+        pipe.hgetall(HISTOGRAMS_KEY)
+        pipe.hgetall(POOL_KEY)
+        pipe.mget(['mesh_cache:hits', 'mesh_cache:misses'])
+        replies = pipe.execute()
+
+        per_queue = len(KOMBU_PRIORITY_STEPS) + 1
+        lines.append('# HELP celery_queue_length Messages waiting in a Celery queue')
+        lines.append('# TYPE celery_queue_length gauge')
+        for index, queue_name in enumerate(CELERY_QUEUES):
+            depth = sum(replies[index * per_queue:(index + 1) * per_queue])
+            lines.append(f"celery_queue_length{format_labels({'queue': queue_name})} {depth}")
+        counters, histograms, pools, mesh_counters = replies[len(CELERY_QUEUES) * per_queue:]
+
+        counters = {key.decode(): float(value) for key, value in counters.items()}
+        mesh_hits, mesh_misses = (int(value or 0) for value in mesh_counters)
+        counters['mesh_cache_hits_total'] = mesh_hits
+        counters['mesh_cache_misses_total'] = mesh_misses
+        help_texts = dict(COUNTERS, mesh_cache_hits_total='Meshes resumed from the mesh cache',
+                          mesh_cache_misses_total='Meshes built because the geometry was not cached')
+        for name, help_text in help_texts.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {format_value(counters.get(name, 0))}")
+
+        histograms = {key.decode(): float(value) for key, value in histograms.items()}
+        for name, help_text in HISTOGRAMS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for bound in list(METRICS_DURATION_BUCKETS) + ['+Inf']:
+                count = int(histograms.get(f"{name}:{bound}", 0))
+                lines.append(f"{name}_bucket{format_labels({'le': bound})} {count}")
+            lines.append(f"{name}_sum {format_value(histograms.get(f'{name}:sum', 0.0))}")
+            lines.append(f"{name}_count {int(histograms.get(f'{name}:+Inf', 0))}")
+
+        pool_metrics = {
+            'mapdl_pool_sessions': ('gauge', 'MAPDL sessions by state per worker process'),
+            'mapdl_pool_size': ('gauge', 'Configured MAPDL sessions per worker process'),
+            'mapdl_pool_launched_total': ('counter', 'MAPDL sessions launched per worker process'),
+            'mapdl_pool_recycled_total': ('counter', 'MAPDL sessions recycled per worker process'),
+        }
+        pools = {worker.decode(): json.loads(stats) for worker, stats in pools.items()}
+        # Workers killed without shutting down their pool stop refreshing their entry
+        stale = [worker for worker, stats in pools.items()
+                 if time.time() - stats.get('updated_at', 0) > METRICS_POOL_STALE_SECONDS]
+        if stale:
+            redis_client.hdel(POOL_KEY, *stale)
+            for worker in stale:
+                del pools[worker]
+        for name, (metric_type, help_text) in pool_metrics.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for worker, stats in sorted(pools.items()):
+                if name == 'mapdl_pool_sessions':
+                    for state in ('idle', 'busy'):
+                        labels = format_labels({'worker': worker, 'state': state})
+                        lines.append(f"{name}{labels} {stats.get(state, 0)}")
+                else:
+                    key = name[len('mapdl_pool_'):].replace('_total', '')
+                    lines.append(f"{name}{format_labels({'worker': worker})} {stats.get(key, 0)}")
+
+    @staticmethod
+    def collect_database(lines):
+        """Simulations per status"""
+        from ..models import Simulation
+
+        counts = dict(Simulation.objects.values_list('status').annotate(count=Count('id')))
+        lines.append('# HELP simulation_jobs Simulations by status')
+        lines.append('# TYPE simulation_jobs gauge')
+        for status, _ in Simulation.STATUS_CHOICES:
+            lines.append(f"simulation_jobs{format_labels({'status': status})} {counts.get(status, 0)}")
+
+    @staticmethod
+    def collect_disk(lines):
+        from .mesh_cache_service import MeshCacheService
+
+        usage = MetricsService.get_disk_usage()
+        mesh_cache_dir = MeshCacheService.get_cache_dir()
+        mesh_cache_bytes = sum(entry.stat().st_size for entry in os.scandir(mesh_cache_dir) if entry.is_file())
+        lines.append('# HELP simulation_results_disk_bytes Bytes stored under MEDIA_ROOT/simulation_results')
+        lines.append('# TYPE simulation_results_disk_bytes gauge')
+        lines.append(f"simulation_results_disk_bytes {usage['bytes']}")
+        lines.append('# HELP simulation_results_files Files stored under MEDIA_ROOT/simulation_results')
+        lines.append('# TYPE simulation_results_files gauge')
+        lines.append(f"simulation_results_files {usage['files']}")
+        lines.append('# HELP mesh_cache_disk_bytes Bytes used by cached mesh archives')
+        lines.append('# TYPE mesh_cache_disk_bytes gauge')
+        lines.append(f"mesh_cache_disk_bytes {mesh_cache_bytes}")
+
+    @staticmethod
+    def render():
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        collectors = {
+            'redis': MetricsService.collect_redis,
+            'database': MetricsService.collect_database,
+            'disk': MetricsService.collect_disk,
+        }
+        up = {}
+        for name, collect in collectors.items():
+            # A failing source must not hide the others
+            collected = []
+            try:
+                collect(collected)
+                lines.extend(collected)
+                up[name] = 1
+            except Exception as e:
+                logger.error(f"Error collecting {name} metrics: {e}")
+                up[name] = 0
+
+        lines.append('# HELP metrics_collector_up Whether a metrics source could be read')
+        lines.append('# TYPE metrics_collector_up gauge')
+        for name, value in up.items():
+            lines.append(f"metrics_collector_up{format_labels({'collector': name})} {value}")
+        return '\n'.join(lines) + '\n'
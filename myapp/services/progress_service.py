@@ -0,0 +1,61 @@
+import json
+import time
+import logging
+import threading
+from ..constants import REDIS_KEY_EXPIRY, SOLVER_PROGRESS_PUBLISH_INTERVAL
+from ..utils.redis_client import set_many
+from .event_service import SimulationEventService
+
+logger = logging.getLogger(__name__)
+
+
+class SolverProgressReporter:
+    """
+    Publishes the progress of running simulations to Redis
+
+    Progress is stored in ``simulation_progress:{id}`` (read by the status
+    endpoint) and pushed as a ``progress`` event. Phase changes are published
+    immediately, parsed solver figures at most every
+    ``SOLVER_PROGRESS_PUBLISH_INTERVAL`` seconds.
+    """
+
+    def __init__(self, simulation_ids, interval=SOLVER_PROGRESS_PUBLISH_INTERVAL):
+        self.simulation_ids = [simulation_id for simulation_id in simulation_ids if simulation_id is not None]
+        self.interval = interval
+        self.progress = {}
+        self._last_publish = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(simulation_id):
+        return f"simulation_progress:{simulation_id}"
+
+    def set_phase(self, phase):
+        """Enter one of the mesh, solve and post phases"""
+        with self._lock:
+            self.progress['phase'] = phase
+            self.progress['phase_started_at'] = time.time()
+        self.publish()
+
+    def update(self, progress):
+        """Merge parsed solver progress, publishing if the throttle interval has passed"""
+        with self._lock:
+            self.progress.update(progress)
+        if time.monotonic() - self._last_publish >= self.interval:
+            self.publish()
+
+    def publish(self):
+        with self._lock:
+            data = dict(self.progress, updated_at=time.time())
+            self._last_publish = time.monotonic()
+        if not self.simulation_ids:
+            return
+        try:
+            encoded = json.dumps(data, separators=(',', ':'))
+            set_many({self.get_key(simulation_id): encoded for simulation_id in self.simulation_ids},
+                     ex=REDIS_KEY_EXPIRY)
+            SimulationEventService.publish_many([
+                (simulation_id, 'progress', data) for simulation_id in self.simulation_ids
+            ])
+        except Exception as e:
+            logger.error(f"Error publishing solver progress of {self.simulation_ids}: {e}")
@@ -0,0 +1,80 @@
+import os
+import logging
+from ..constants import (
+    SIMULATION_QUEUES,
+    DEFAULT_SIMULATION_QUEUE,
+    RENDER_QUEUE,
+    RENDER_TASK_SOFT_TIME_LIMIT,
+    RENDER_TASK_TIME_LIMIT,
+)
+
+logger = logging.getLogger(__name__)
+
+# Environment variable naming the simulation queue a worker consumes
+WORKER_QUEUE_ENV = 'SIMULATION_WORKER_QUEUE'
+
+
+class QueueRouter:
+    """
+    Chooses the Celery queue of a simulation from its cost estimate
+
+    Short jobs go to ``interactive`` workers so they are never stuck behind
+    fine-mesh jobs, which end up on the ``heavy`` workers.
+    """
+
+    @staticmethod
+    def select_queue(cost_estimate, cases=1):
+        """Name of the first queue whose wall time budget fits the estimate"""
+        if not cost_estimate or cost_estimate.get('wall_time_seconds') is None:
+            return DEFAULT_SIMULATION_QUEUE
+
+        wall_time = cost_estimate['wall_time_seconds'] * cases
+        for name, config in SIMULATION_QUEUES.items():
+            if config['max_wall_time'] is None or wall_time <= config['max_wall_time']:
+                return name
+        return list(SIMULATION_QUEUES)[-1]
+
+    @staticmethod
+    def get_queue_config(name):
+        return SIMULATION_QUEUES.get(name) or SIMULATION_QUEUES[DEFAULT_SIMULATION_QUEUE]
+
+    @staticmethod
+    def get_task_options(name):
+        """Keyword arguments for ``apply_async`` routing a task to queue ``name``"""
+        config = QueueRouter.get_queue_config(name)
+        return {
+            'queue': name if name in SIMULATION_QUEUES else DEFAULT_SIMULATION_QUEUE,
+            'soft_time_limit': config['soft_time_limit'],
+            'time_limit': config['time_limit'],
+        }
+
+    @staticmethod
+    def get_render_task_options():
+        """Keyword arguments for ``apply_async`` of the render stage"""
+        return {
+            'queue': RENDER_QUEUE,
+            'soft_time_limit': RENDER_TASK_SOFT_TIME_LIMIT,
+            'time_limit': RENDER_TASK_TIME_LIMIT,
+        }
+
+    @staticmethod
+    def is_render_worker():
+        """Whether this worker only renders images (and needs no MAPDL session)"""
+        return os.environ.get(WORKER_QUEUE_ENV) == RENDER_QUEUE
+
+    @staticmethod
+    def get_worker_queue():
+        """Simulation queue consumed by this worker, None outside dedicated workers"""
+        name = os.environ.get(WORKER_QUEUE_ENV)
+        if name == RENDER_QUEUE:
+            return None
+        if name and name not in SIMULATION_QUEUES:
+            logger.warning(f"Unknown simulation queue {name}, using {DEFAULT_SIMULATION_QUEUE} settings")
+            return DEFAULT_SIMULATION_QUEUE
+        return name
+
+    @staticmethod
+    def get_worker_nproc():
+        """MAPDL cores per session for this worker, None to use the MAPDL default"""
+        name = QueueRouter.get_worker_queue()
+        return QueueRouter.get_queue_config(name)['nproc'] if name else None
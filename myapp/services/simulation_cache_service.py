@@ -1,25 +1,64 @@
-import hashlib
 import json
 import logging
-from redis import Redis
+import os
 from django.utils import timezone
-from django.conf import settings
+from ..constants import SIMULATION_CACHE_TTL, SCALED_REUSE_LOOKUP_LIMIT, REDIS_KEY_EXPIRY
+from ..utils.field_store import get_result_fields_path
+from ..utils.parameter_hash import hash_parameters, hash_scaling_key
+from ..utils.redis_client import get_redis_client
+from .metrics_service import MetricsService
 
 logger = logging.getLogger(__name__)
 
+# KEYS: inflight, waiters; ARGV: simulation id, ttl. Returns the leader id.
+JOIN_INFLIGHT_SCRIPT = """
+local leader = redis.call('GET', KEYS[1])
+if not leader then
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+    return ARGV[1]
+end
+redis.call('SADD', KEYS[2], ARGV[1])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+return leader
+"""
+
+# KEYS: inflight, waiters; ARGV: leader id. Returns the follower ids.
+RELEASE_INFLIGHT_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return {}
+end
+local waiters = redis.call('SMEMBERS', KEYS[2])
+redis.call('DEL', KEYS[1], KEYS[2])
+return waiters
+"""
+
+# KEYS: inflight; ARGV: stale leader id, new leader id, ttl. Waiters carry over.
+TAKE_OVER_INFLIGHT_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+
 class SimulationCacheService:
     @staticmethod
     def get_params_hash(parameters):
         """Generate a hash from simulation parameters"""
-        params_str = json.dumps(parameters, sort_keys=True)
-        return hashlib.sha256(params_str.encode()).hexdigest()
+        return hash_parameters(parameters)
+
+    @staticmethod
+    def get_scaling_key(parameters):
+        """Hash of everything except load and Young's modulus (geometry, mesh and nu)"""
+        return hash_scaling_key(parameters)
 
     @staticmethod
     def get_cached_simulation(parameters):
         """Check if a simulation with these parameters exists in cache"""
         try:
             params_hash = SimulationCacheService.get_params_hash(parameters)
-            redis_client = Redis.from_url(settings.CELERY_BROKER_URL)
+            redis_client = get_redis_client()
             cache_key = f"simulation_cache:{params_hash}"
 
             cached_result = redis_client.get(cache_key)
@@ -30,12 +69,49 @@ class SimulationCacheService:
             logger.error(f"Error checking simulation cache: {e}")
             return None
 
+    @staticmethod
+    def find_completed_simulation(parameters):
+        """
+        Find a completed simulation with identical parameters and a stored result
+
+        Checks the Redis parameter cache first and falls back to
+        ``Simulation.parameters_hash``, re-populating the cache on a DB hit.
+        Returns the Simulation or None.
+        """
+        from ..models import Simulation
+
+        def is_usable(simulation):
+            if simulation is None or simulation.status != 'COMPLETED' or not hasattr(simulation, 'result'):
+                return False
+            result_file = simulation.result.result_file
+            return bool(result_file) and os.path.exists(result_file.path)
+
+        cached = SimulationCacheService.get_cached_simulation(parameters)
+        if cached:
+            simulation = Simulation.objects.select_related('result').filter(id=cached.get('source_id')).first()
+            if is_usable(simulation):
+                MetricsService.increment('simulation_cache_hits_total')
+                return simulation
+
+        params_hash = SimulationCacheService.get_params_hash(parameters)
+        candidates = Simulation.objects.select_related('result').filter(
+            parameters_hash=params_hash, status='COMPLETED', result__isnull=False
+        ).order_by('-completed_at')[:SCALED_REUSE_LOOKUP_LIMIT]
+
+        for simulation in candidates:
+            if is_usable(simulation):
+                SimulationCacheService.cache_simulation(simulation.id, simulation.parameters)
+                MetricsService.increment('simulation_cache_hits_total')
+                return simulation
+        MetricsService.increment('simulation_cache_misses_total')
+        return None
+
     @staticmethod
     def cache_simulation(simulation_id, parameters, ttl=SIMULATION_CACHE_TTL):
         """Cache a simulation for future reuse"""
         try:
             params_hash = SimulationCacheService.get_params_hash(parameters)
-            redis_client = Redis.from_url(settings.CELERY_BROKER_URL)
+            redis_client = get_redis_client()
             cache_key = f"simulation_cache:{params_hash}"
 
             cache_data = {
@@ -46,4 +122,128 @@ class SimulationCacheService:
             return True
         except Exception as e:
             logger.error(f"Error caching simulation: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    @staticmethod
+    def cache_reference(simulation_id, parameters, ttl=SIMULATION_CACHE_TTL):
+        """Register a simulation with stored fields as scaling reference for its geometry"""
+        try:
+            redis_client = get_redis_client()
+            cache_key = f"simulation_reference:{SimulationCacheService.get_scaling_key(parameters)}"
+            redis_client.set(cache_key, json.dumps({'source_id': simulation_id}), ex=ttl)
+            return True
+        except Exception as e:
+            logger.error(f"Error caching scaling reference: {e}")
+            return False
+
+    @staticmethod
+    def get_reference_simulation(parameters, exclude_id=None):
+        """
+        Find a completed simulation that differs only in pressure and/or e
+
+        Looks up the Redis reference index first and falls back to the
+        ``Simulation.scaling_key`` column. Returns the Simulation or None.
+        """
+        from ..models import Simulation
+
+        scaling_key = SimulationCacheService.get_scaling_key(parameters)
+
+        def is_usable(simulation):
+            return (
+                simulation.id != exclude_id
+                and simulation.status == 'COMPLETED'
+                and SimulationCacheService.get_scaling_key(simulation.parameters) == scaling_key
+                and float(simulation.parameters.get('pressure', 1000)) != 0
+                and hasattr(simulation, 'result')
+                and os.path.exists(get_result_fields_path(simulation.result))
+            )
+
+        try:
+            redis_client = get_redis_client()
+            cached = redis_client.get(f"simulation_reference:{scaling_key}")
+            if cached:
+                source_id = json.loads(cached).get('source_id')
+                simulation = Simulation.objects.filter(id=source_id).first()
+                if simulation and is_usable(simulation):
+                    MetricsService.increment('scaling_reference_hits_total')
+                    return simulation
+        except Exception as e:
+            logger.error(f"Error checking scaling reference cache: {e}")
+
+        candidates = Simulation.objects.select_related('result').filter(
+            scaling_key=scaling_key, status='COMPLETED', result__isnull=False
+        ).order_by('-completed_at')[:SCALED_REUSE_LOOKUP_LIMIT]
+
+        for simulation in candidates:
+            if is_usable(simulation):
+                MetricsService.increment('scaling_reference_hits_total')
+                return simulation
+        MetricsService.increment('scaling_reference_misses_total')
+        return None
+
+    @staticmethod
+    def join_inflight(parameters, simulation_id, ttl=REDIS_KEY_EXPIRY):
+        """
+        Register a simulation in the in-flight registry of its parameters
+
+        The first simulation becomes the leader and is queued, later identical
+        ones are added to the waiters set and completed with the leader's
+        result. Returns the leader id (``simulation_id`` itself when leading,
+        also when Redis is unavailable).
+        """
+        from ..models import Simulation
+
+        params_hash = SimulationCacheService.get_params_hash(parameters)
+        inflight_key = f"simulation_inflight:{params_hash}"
+        waiters_key = f"simulation_waiters:{params_hash}"
+        try:
+            redis_client = get_redis_client()
+            join = redis_client.register_script(JOIN_INFLIGHT_SCRIPT)
+            leader_id = int(join(keys=[inflight_key, waiters_key], args=[simulation_id, ttl]))
+            if leader_id == simulation_id:
+                return simulation_id
+
+            # A leader whose worker died never releases its key; take over its waiters
+            leader_active = Simulation.objects.filter(
+                id=leader_id, status__in=Simulation.ACTIVE_STATUSES).exists()
+            if not leader_active:
+                redis_client.srem(waiters_key, simulation_id)
+                take_over = redis_client.register_script(TAKE_OVER_INFLIGHT_SCRIPT)
+                if take_over(keys=[inflight_key], args=[leader_id, simulation_id, ttl]):
+                    logger.warning(f"Simulation {simulation_id} took over stale in-flight run {leader_id}")
+                    return simulation_id
+                return SimulationCacheService.join_inflight(parameters, simulation_id, ttl)
+
+            logger.info(f"Simulation {simulation_id} attached to in-flight simulation {leader_id}")
+            MetricsService.increment('inflight_coalesced_total')
+            return leader_id
+        except Exception as e:
+            logger.error(f"Error joining in-flight registry: {e}")
+            return simulation_id
+
+    @staticmethod
+    def release_inflight(parameters, simulation_id):
+        """Remove the leader from the in-flight registry, returning its follower ids"""
+        params_hash = SimulationCacheService.get_params_hash(parameters)
+        try:
+            redis_client = get_redis_client()
+            release = redis_client.register_script(RELEASE_INFLIGHT_SCRIPT)
+            waiters = release(
+                keys=[f"simulation_inflight:{params_hash}", f"simulation_waiters:{params_hash}"],
+                args=[simulation_id],
+            )
+            return sorted(int(waiter) for waiter in waiters)
+        except Exception as e:
+            logger.error(f"Error releasing in-flight registry: {e}")
+            return []
+
+    @staticmethod
+    def leave_inflight(parameters, simulation_id):
+        """Detach a follower from the run it is waiting for, True if it was waiting"""
+        params_hash = SimulationCacheService.get_params_hash(parameters)
+        try:
+            redis_client = get_redis_client()
+            return bool(redis_client.srem(f"simulation_waiters:{params_hash}", simulation_id))
+        except Exception as e:
+            logger.error(f"Error leaving in-flight registry: {e}")
+            return False
@@ -1,83 +1,510 @@
 import os
+import json
+import shutil
 import logging
 from django.utils import timezone
 from django.db import transaction
+from django.conf import settings
 from .mapdl_handler import MAPDLHandler
+from .simulation_cache_service import SimulationCacheService
+from .queue_router import QueueRouter
+from .status_cache_service import IMAGE_FIELDS, StatusCacheService
+from .event_service import SimulationEventService
+from .metrics_service import MetricsService
+from ..constants import ASYNC_RENDERING_ENABLED, SCALED_REUSE_ENABLED
 from ..models import Simulation, SimulationResult
+from ..utils.field_export import get_export_dir
+from ..utils.field_store import SimulationFields, get_fields_path, get_result_fields_path
+from ..utils.image_capture import ImageCapture
+from ..utils.image_variants import save_all_image_variants
 from ..utils.result_processor import ResultProcessor
+from ..utils.redis_client import get_redis_client, set_many
+from ..utils.timing import merge_timings, start_timer, timed
 
 logger = logging.getLogger(__name__)
 
 
 class SimulationService:
     @staticmethod
-    def queue_simulation(simulation_id):
-        """Queue a simulation using Celery"""
+    def queue_simulation(simulation_id, queue_name=None):
+        """Queue a simulation using Celery on the queue chosen from its cost estimate"""
         # Import the task inside the method to avoid circular imports
         from ..tasks.simulation_task import run_simulation_task_with_redis
 
-        # Directly dispatch the task
-        task = run_simulation_task_with_redis.delay(simulation_id)
+        if queue_name is None:
+            simulation = Simulation.objects.get(id=simulation_id)
+            queue_name = simulation.queue or QueueRouter.select_queue(simulation.cost_estimate)
+            if simulation.queue != queue_name:
+                Simulation.objects.filter(id=simulation_id).update(queue=queue_name)
+
+        # Before enqueueing, a fast worker could otherwise mark it RUNNING first
+        if Simulation.transition_many([simulation_id], 'QUEUED', queued_at=timezone.now()):
+            StatusCacheService.publish_many([simulation_id])
+
+        task = run_simulation_task_with_redis.apply_async(
+            args=[simulation_id], **QueueRouter.get_task_options(queue_name))
 
         # Store the task ID in Redis for later use (like cancellation)
-        from redis import Redis
-        from django.conf import settings
+        get_redis_client().set(f"simulation_task_id:{simulation_id}", task.id, ex=86400)  # 24 hours expiry
+
+        return task.id
+
+    @staticmethod
+    def submit_simulation(simulation, queue_name=None):
+        """
+        Queue a simulation unless an identical one is already in flight
+
+        Returns ``(task_id, leader_id)``. Followers get no task of their own,
+        they are completed when the leader's task finishes.
+        """
+        leader_id = SimulationCacheService.join_inflight(simulation.parameters, simulation.id)
+        if leader_id != simulation.id:
+            leader_queue = Simulation.objects.filter(id=leader_id).values_list('queue', flat=True).first()
+            Simulation.objects.filter(id=simulation.id).update(queue=leader_queue or '')
+            return None, leader_id
+
+        return SimulationService.queue_simulation(simulation.id, queue_name), simulation.id
+
+    @staticmethod
+    def complete_followers(leader_id, follower_ids):
+        """
+        Finish the simulations that waited for ``leader_id`` in one bulk update
+
+        Followers share the leader's result files, or are marked FAILED when
+        the leader failed. Canceled followers are skipped. Returns
+        ``(completed_ids, status)``.
+        """
+        leader = Simulation.objects.select_related('result').get(id=leader_id)
+        waiting = Simulation.objects.filter(id__in=follower_ids, status__in=Simulation.ACTIVE_STATUSES)
+
+        with transaction.atomic():
+            ids = list(waiting.select_for_update().values_list('id', flat=True))
+            if not ids:
+                return [], leader.status
+
+            if leader.status == 'COMPLETED' and hasattr(leader, 'result'):
+                result = leader.result
+                SimulationResult.objects.filter(simulation_id__in=ids).delete()
+                SimulationResult.objects.bulk_create([
+                    SimulationResult(
+                        simulation_id=simulation_id,
+                        result_file=result.result_file.name,
+                        field_data=result.field_data.name,
+                        mesh_image=result.mesh_image.name,
+                        stress_image=result.stress_image.name,
+                        deformation_image=result.deformation_image.name,
+                        image_variants=result.image_variants,
+                        summary=result.summary,
+                    )
+                    for simulation_id in ids
+                ])
+                status = 'COMPLETED'
+                ids = Simulation.transition_many(
+                    ids, status, started_at=leader.started_at, completed_at=timezone.now())
+            else:
+                status = 'FAILED'
+                ids = Simulation.transition_many(ids, status)
+
+        StatusCacheService.publish_many(ids)
+        logger.info(f"Marked {len(ids)} follower(s) of simulation {leader_id} as {status}")
+        return ids, status
+
+    @staticmethod
+    def resubmit_followers(follower_ids):
+        """Queue the followers of a canceled leader again, the first one becomes the new leader"""
+        for simulation in Simulation.objects.filter(id__in=follower_ids, status='PENDING').order_by('id'):
+            SimulationService.submit_simulation(simulation)
+
+    @staticmethod
+    def run_simulation(simulation_id, render_async=ASYNC_RENDERING_ENABLED):
+        """
+        Run a simulation with the given ID, updating its status and saving results
+
+        Every status change (RUNNING, POSTPROCESSING, COMPLETED or FAILED) is a
+        short transaction of its own; the solve runs outside any transaction.
+        The result is COMPLETED without images, they are rendered from the stored
+        fields on the render queue (or right after, when ``render_async`` is off).
+        Returns None when the simulation was canceled meanwhile. Seconds per
+        stage are stored in ``SimulationResult.timings``.
+        """
+        with start_timer() as timer:
+            simulation = Simulation.objects.get(id=simulation_id)
+            if not simulation.transition_to('RUNNING', started_at=timezone.now()):
+                logger.warning(f"Simulation {simulation_id} is {simulation.status}, not running it")
+                return None
+            StatusCacheService.publish(simulation)
+            if simulation.queued_at:
+                timer.add('queue_wait', (simulation.started_at - simulation.queued_at).total_seconds())
+
+            parameters = dict(simulation.parameters)
+            parameters['id'] = simulation_id
 
-        redis_client = Redis.from_url(settings.CELERY_BROKER_URL)
-        redis_client.set(f"simulation_task_id:{simulation_id}", task.id, ex=86400)  # 24 hours expiry
+            try:
+                logger.info(f"Starting simulation {simulation_id} with parameters: {parameters}")
+
+                reference = None
+                if SCALED_REUSE_ENABLED:
+                    reference = SimulationCacheService.get_reference_simulation(
+                        simulation.parameters, exclude_id=simulation_id)
+
+                result = None
+                if reference is None:
+                    # The handler reports the mesh, solve and post phases itself
+                    mapdl_handler = MAPDLHandler()
+                    result = mapdl_handler.run_simulation(parameters)
+
+                if not SimulationService.start_postprocessing(simulation):
+                    return None
+
+                if reference is not None:
+                    SimulationEventService.publish(simulation_id, 'progress', {
+                        'phase': 'post', 'message': f"Scaling result of simulation {reference.id}"})
+                    processed_result = SimulationService.scale_reference_result(reference, simulation_id, parameters)
+                else:
+                    processor = ResultProcessor()
+                    processed_result = processor.process_result(
+                        result, simulation_id, extra_summary={'images_pending': True})
+
+                with transaction.atomic():
+                    with timed('db_save'):
+                        # Create or update the simulation result
+                        simulation_result, _ = SimulationResult.objects.update_or_create(
+                            simulation=simulation,
+                            defaults={
+                                'result_file': processed_result['result_file'],
+                                'field_data': processed_result['field_data'],
+                                'mesh_image': processed_result['mesh_image'],
+                                'stress_image': processed_result['stress_image'],
+                                'deformation_image': processed_result['deformation_image'],
+                                'summary': processed_result['summary']
+                            }
+                        )
+                        completed = simulation.transition_to('COMPLETED', completed_at=timezone.now())
+                    if not completed:
+                        # Canceled while the result was being written
+                        transaction.set_rollback(True)
+                        logger.warning(f"Simulation {simulation_id} is {simulation.status}, discarding its result")
+                        return None
+                    simulation_result.timings = timer.as_dict()
+                    simulation_result.save(update_fields=['timings'])
+                StatusCacheService.publish(simulation)
+                MetricsService.observe_timings(simulation_result.timings)
+
+                logger.info(f"Simulation {simulation_id} completed successfully")
+
+                SimulationService.queue_render(
+                    [simulation_id], mesh_image=SimulationService.get_mesh_image(reference), render_async=render_async)
+                if not render_async:
+                    simulation_result.refresh_from_db()
+                return simulation_result
+
+            except Exception as e:
+                logger.error(f"Simulation {simulation_id} failed: {str(e)}", exc_info=True)
+                if simulation.transition_to('FAILED'):
+                    StatusCacheService.publish(simulation)
+                raise e
+
+    @staticmethod
+    def start_postprocessing(simulation):
+        """Enter POSTPROCESSING after the solve, False if the simulation was canceled meanwhile"""
+        if not simulation.transition_to('POSTPROCESSING'):
+            logger.warning(f"Simulation {simulation.id} is {simulation.status}, skipping post-processing")
+            return False
+        StatusCacheService.publish(simulation)
+        return True
+
+    @staticmethod
+    def queue_sweep(simulation_ids, queue_name=None):
+        """Queue a pressure sweep that is solved as one multi-load-step MAPDL run"""
+        from ..tasks.simulation_task import run_sweep_task_with_redis
+
+        if queue_name is None:
+            simulation = Simulation.objects.get(id=simulation_ids[0])
+            queue_name = QueueRouter.select_queue(simulation.cost_estimate, cases=len(simulation_ids))
+            Simulation.objects.filter(id__in=simulation_ids).update(queue=queue_name)
+
+        queued_ids = Simulation.transition_many(simulation_ids, 'QUEUED', queued_at=timezone.now())
+        StatusCacheService.publish_many(queued_ids)
+
+        task = run_sweep_task_with_redis.apply_async(
+            args=[list(simulation_ids)], **QueueRouter.get_task_options(queue_name))
+
+        mapping = {f"simulation_task_id:{simulation_id}": task.id for simulation_id in simulation_ids}
+        # Cases share the task, canceling one of them must not kill the others
+        mapping[f"simulation_sweep:{task.id}"] = json.dumps(list(simulation_ids))
+        set_many(mapping, ex=86400)
 
         return task.id
 
     @staticmethod
-    @transaction.atomic
-    def run_simulation(simulation_id):
-        """Run a simulation with the given ID, updating its status and saving results."""
-        simulation = Simulation.objects.get(id=simulation_id)
-        simulation.status = 'RUNNING'
-        simulation.save()
+    def get_sweep_ids(task_id):
+        """Simulations solved by sweep task ``task_id``, empty for the task of a single simulation"""
+        cached = get_redis_client().get(f"simulation_sweep:{task_id}")
+        return json.loads(cached) if cached else []
+
+    @staticmethod
+    def run_sweep(simulation_ids, render_async=ASYNC_RENDERING_ENABLED):
+        """
+        Run simulations that differ only in pressure as load steps of one solve
+
+        Each load step is split back into the SimulationResult of its own
+        simulation; the images of all cases are rendered by one render task.
+        """
+        by_id = Simulation.objects.in_bulk(simulation_ids)
+        simulations = [by_id[simulation_id] for simulation_id in simulation_ids]
 
-        parameters = dict(simulation.parameters)
-        parameters['id'] = simulation_id
+        base_parameters = dict(simulations[0].parameters)
+        base_key = {k: v for k, v in base_parameters.items() if k != 'pressure'}
+        for simulation in simulations[1:]:
+            if {k: v for k, v in simulation.parameters.items() if k != 'pressure'} != base_key:
+                raise ValueError(f"Simulation {simulation.id} differs from the sweep in more than pressure")
+
+        running_ids = Simulation.transition_many(simulation_ids, 'RUNNING', started_at=timezone.now())
+        StatusCacheService.publish_many(running_ids)
+        if not running_ids:
+            logger.warning(f"No simulation of sweep {simulation_ids} can run, skipping it")
+            return []
+
+        base_parameters['id'] = simulations[0].id
+        base_parameters['sweep_ids'] = list(simulation_ids)  # Solver progress is reported for every case
+        pressures = [simulation.parameters.get('pressure', 1000) for simulation in simulations]
 
-        mapdl_handler = None
         try:
-            logger.info(f"Starting simulation {simulation_id} with parameters: {parameters}")
+            logger.info(f"Starting sweep of {len(simulations)} load steps for simulations {simulation_ids}")
 
             mapdl_handler = MAPDLHandler()
-            result = mapdl_handler.run_simulation(parameters)
-
-            processor = ResultProcessor()
-            processed_result = processor.process_result(result, simulation_id)
-
-            # Create or update the simulation result
-            SimulationResult.objects.update_or_create(
-                simulation=simulation,
-                defaults={
-                    'result_file': processed_result['result_file'],
-                    'mesh_image': processed_result['mesh_image'],
-                    'stress_image': processed_result['stress_image'],
-                    'deformation_image': processed_result['deformation_image'],
-                    'summary': processed_result['summary']
-                }
-            )
+            with start_timer() as sweep_timer:
+                if simulations[0].queued_at:
+                    sweep_timer.add('queue_wait', (timezone.now() - simulations[0].queued_at).total_seconds())
+                result = mapdl_handler.run_sweep(base_parameters, pressures)
+            # Every case is charged the full shared solve
+            shared_timings = sweep_timer.as_dict()
+
+            # Cases canceled during the solve stay FAILED and are not post-processed
+            postprocessing_ids = set(Simulation.transition_many(running_ids, 'POSTPROCESSING'))
+            StatusCacheService.publish_many(sorted(postprocessing_ids))
+
+            results = []
+            for rnum, simulation in enumerate(simulations):
+                if simulation.id not in postprocessing_ids:
+                    continue
+                with start_timer() as case_timer:
+                    fields = mapdl_handler.extract_fields(result, base_parameters, rnum=rnum)
+                    with timed('fields_save'):
+                        fields.save(get_fields_path(simulation.id))
 
-            simulation.status = 'COMPLETED'
-            simulation.completed_at = timezone.now()
-            simulation.save()
+                    processed_result = ResultProcessor.process_fields(
+                        fields,
+                        simulation.id,
+                        solution_output_path=result._solution_output_path,
+                        extra_summary={'sweep_step': rnum + 1, 'sweep_size': len(simulations),
+                                       'images_pending': True},
+                    )
 
-            logger.info(f"Simulation {simulation_id} completed successfully")
+                    with transaction.atomic():
+                        with timed('db_save'):
+                            simulation_result, _ = SimulationResult.objects.update_or_create(
+                                simulation=simulation,
+                                defaults={
+                                    'result_file': processed_result['result_file'],
+                                    'field_data': processed_result['field_data'],
+                                    'mesh_image': processed_result['mesh_image'],
+                                    'stress_image': processed_result['stress_image'],
+                                    'deformation_image': processed_result['deformation_image'],
+                                    'summary': processed_result['summary']
+                                }
+                            )
+                            completed = simulation.transition_to('COMPLETED', completed_at=timezone.now())
+                        if not completed:
+                            transaction.set_rollback(True)
+                            continue
+                        simulation_result.timings = merge_timings(shared_timings, case_timer.as_dict())
+                        simulation_result.save(update_fields=['timings'])
+                StatusCacheService.publish(simulation)
+                MetricsService.observe_timings(simulation_result.timings)
+                results.append(simulation_result)
 
-            return simulation.result
+            logger.info(f"Sweep for simulations {simulation_ids} completed successfully")
+
+            if results:
+                SimulationService.queue_render(
+                    [simulation_result.simulation_id for simulation_result in results], render_async=render_async)
+                if not render_async:
+                    for simulation_result in results:
+                        simulation_result.refresh_from_db()
+            return results
 
         except Exception as e:
-            logger.error(f"Simulation {simulation_id} failed: {str(e)}", exc_info=True)
-            simulation.status = 'FAILED'
-            simulation.save()
+            logger.error(f"Sweep for simulations {simulation_ids} failed: {str(e)}", exc_info=True)
+            StatusCacheService.publish_many(Simulation.transition_many(simulation_ids, 'FAILED'))
             raise e
-        finally:
-            if mapdl_handler:
-                mapdl_handler.close_mapdl()
-                logger.info("MAPDL session closed")
+
+    @staticmethod
+    def scale_reference_result(reference, simulation_id, parameters):
+        """
+        Build a result by scaling the stored fields of a linear-elastic reference
+
+        Valid when the reference differs only in pressure and/or Young's modulus:
+        stress scales with pressure, displacement with pressure / E.
+        """
+        reference_pressure = float(reference.parameters.get('pressure', 1000))
+        reference_e = float(reference.parameters.get('e', 2e11))
+        stress_factor = float(parameters.get('pressure', 1000)) / reference_pressure
+        displacement_factor = stress_factor * reference_e / float(parameters.get('e', 2e11))
+
+        logger.info(f"Scaling result of simulation {reference.id} for simulation {simulation_id} "
+                    f"(stress x{stress_factor:g}, displacement x{displacement_factor:g})")
+
+        with timed('scale'):
+            fields = SimulationFields.load(get_result_fields_path(reference.result)).scaled(stress_factor, displacement_factor)
+        with timed('fields_save'):
+            fields.save(get_fields_path(simulation_id))
+
+        return ResultProcessor.process_fields(
+            fields,
+            simulation_id,
+            extra_summary={'scaled_from': reference.id, 'images_pending': True},
+        )
+
+    @staticmethod
+    def complete_from_reference(simulation, reference, render_async=ASYNC_RENDERING_ENABLED):
+        """
+        Complete a PENDING simulation from the scaled fields of ``reference`` without queuing it
+
+        Runs at submit time, so scalable submissions never wait for a solver
+        worker; only the images are rendered on the render queue. Returns the
+        SimulationResult, None when the simulation is no longer PENDING.
+        """
+        with start_timer() as timer:
+            processed_result = SimulationService.scale_reference_result(
+                reference, simulation.id, dict(simulation.parameters, id=simulation.id))
+
+            with transaction.atomic():
+                with timed('db_save'):
+                    simulation_result, _ = SimulationResult.objects.update_or_create(
+                        simulation=simulation,
+                        defaults={
+                            'result_file': processed_result['result_file'],
+                            'field_data': processed_result['field_data'],
+                            'mesh_image': processed_result['mesh_image'],
+                            'stress_image': processed_result['stress_image'],
+                            'deformation_image': processed_result['deformation_image'],
+                            'summary': processed_result['summary']
+                        }
+                    )
+                    now = timezone.now()
+                    completed = simulation.transition_to('COMPLETED', started_at=now, completed_at=now)
+                if not completed:
+                    transaction.set_rollback(True)
+                    logger.warning(f"Simulation {simulation.id} is {simulation.status}, discarding its scaled result")
+                    return None
+                simulation_result.timings = timer.as_dict()
+                simulation_result.save(update_fields=['timings'])
+        StatusCacheService.publish(simulation)
+        MetricsService.observe_timings(simulation_result.timings)
+        SimulationCacheService.cache_simulation(simulation.id, simulation.parameters)
+
+        SimulationService.queue_render(
+            [simulation.id], mesh_image=SimulationService.get_mesh_image(reference), render_async=render_async)
+        if not render_async:
+            simulation_result.refresh_from_db()
+        return simulation_result
+
+    @staticmethod
+    def get_mesh_image(simulation):
+        """Stored mesh image name of a simulation, None if it has none (yet)"""
+        if simulation is None or not hasattr(simulation, 'result') or not simulation.result.mesh_image:
+            return None
+        return simulation.result.mesh_image.name
+
+    @staticmethod
+    def queue_render(simulation_ids, mesh_image=None, render_async=ASYNC_RENDERING_ENABLED):
+        """
+        Render the images of completed simulations on the render queue
+
+        Renders in the calling process instead when ``render_async`` is off.
+        A failure to queue leaves the images pending, the results themselves
+        are already stored. Returns the task ID, None when not queued.
+        """
+        if not render_async:
+            SimulationService.render_images(simulation_ids, mesh_image=mesh_image)
+            return None
+
+        from ..tasks.simulation_task import render_images_task
+
+        try:
+            task = render_images_task.apply_async(
+                args=[list(simulation_ids), mesh_image], **QueueRouter.get_render_task_options())
+            return task.id
+        except Exception as e:
+            logger.error(f"Failed to queue rendering of simulations {simulation_ids}: {e}")
+            return None
+
+    @staticmethod
+    def render_images(simulation_ids, mesh_image=None):
+        """
+        Render mesh, stress and deformation images from the stored nodal fields
+
+        The simulations share one mesh (a single run or the cases of a sweep),
+        so it is rendered once, or copied from ``mesh_image`` (a name relative
+        to MEDIA_ROOT). The images are set on every result sharing the result
+        file, i.e. also on identical submissions completed from the same run,
+        and the render stages are added to each simulation's own timings.
+        """
+        for simulation_id in simulation_ids:
+            result = SimulationResult.objects.filter(simulation_id=simulation_id).first()
+            if result is None:
+                logger.warning(f"Simulation {simulation_id} has no result anymore, not rendering it")
+                continue
+
+            simulation_dir = os.path.join(settings.MEDIA_ROOT, 'simulation_results', str(simulation_id))
+            os.makedirs(simulation_dir, exist_ok=True)
+            with start_timer() as timer:
+                try:
+                    fields = SimulationFields.load(get_result_fields_path(result))
+                    image_paths = ImageCapture.save_field_images(
+                        fields, simulation_dir,
+                        mesh_image=os.path.join(settings.MEDIA_ROOT, mesh_image) if mesh_image else None)
+                except Exception as e:
+                    # Clients stop waiting for images that cannot be rendered
+                    logger.error(f"Rendering simulation {simulation_id} failed: {str(e)}", exc_info=True)
+                    image_paths = {}
+                with timed('render_variants'):
+                    variant_paths = save_all_image_variants(image_paths)
+            render_timings = timer.as_dict()
+            render_timings['render_total'] = render_timings.pop('total')
+
+            images = {name: os.path.relpath(path, settings.MEDIA_ROOT) for name, path in image_paths.items()}
+            image_variants = {
+                name: {
+                    size: {key: value if key == 'width' else os.path.relpath(value, settings.MEDIA_ROOT)
+                           for key, value in variant.items()}
+                    for size, variant in sizes.items()
+                }
+                for name, sizes in variant_paths.items()
+            }
+            # All cases share the mesh, render it once
+            mesh_image = mesh_image or images.get('mesh_image')
+
+            with transaction.atomic():
+                shared = SimulationResult.objects.select_for_update().filter(pk=result.pk)
+                if result.result_file:
+                    shared = SimulationResult.objects.select_for_update().filter(result_file=result.result_file.name)
+                shared = list(shared)
+                for shared_result in shared:
+                    for name, path in images.items():
+                        setattr(shared_result, name, path)
+                    shared_result.image_variants = image_variants
+                    shared_result.summary = dict(
+                        shared_result.summary or {}, images_pending=False,
+                        **{f'has_{name}': name in images for name in IMAGE_FIELDS})
+                    if shared_result.pk == result.pk:
+                        shared_result.timings = dict(shared_result.timings or {}, **render_timings)
+                SimulationResult.objects.bulk_update(shared, [*IMAGE_FIELDS, 'image_variants', 'summary', 'timings'])
+
+            StatusCacheService.publish_many([shared_result.simulation_id for shared_result in shared])
+            MetricsService.observe('simulation_render_seconds', render_timings['render_total'])
+            logger.info(f"Rendered {len(images)} image(s) of simulation {simulation_id}")
 
     @staticmethod
     def copy_simulation_result(source_id, target_id):
@@ -95,16 +522,44 @@ class SimulationService:
             simulation=target,
             defaults={
                 'result_file': source_result.result_file,
+                'field_data': source_result.field_data,
                 'mesh_image': source_result.mesh_image,
                 'stress_image': source_result.stress_image,
                 'deformation_image': source_result.deformation_image,
+                'image_variants': source_result.image_variants,
                 'summary': source_result.summary
             }
         )
 
-        target.status = 'COMPLETED'
-        target.completed_at = timezone.now()
-        target.save()
+        if target.transition_to('COMPLETED', completed_at=timezone.now()):
+            StatusCacheService.publish(target)
 
         logger.info(f"Copied simulation result from {source_id} to {target_id}")
-        return target.result
\ No newline at end of file
+        return target.result
+
+    @staticmethod
+    def delete_result_files(result):
+        """Remove the files of a result from disk unless another result still shares them"""
+        for field_name in ['mesh_image', 'stress_image', 'deformation_image', 'result_file', 'field_data']:
+            file_field = getattr(result, field_name, None)
+            if not file_field:
+                continue
+            # Results copied from a cached simulation reference the same files
+            shared = SimulationResult.objects.filter(
+                **{field_name: file_field.name}).exclude(pk=result.pk).exists()
+            if shared:
+                continue
+            paths = {file_field.path}
+            if field_name == 'field_data':
+                # Downloads converted from the fields go with them
+                shutil.rmtree(get_export_dir(file_field.path), ignore_errors=True)
+            # Resized copies go with their image
+            for variant in (result.image_variants or {}).get(field_name, {}).values():
+                paths.update(os.path.join(settings.MEDIA_ROOT, name)
+                             for key, name in variant.items() if key != 'width')
+            for path in paths:
+                try:
+                    if os.path.exists(path):
+                        os.remove(path)
+                except OSError as e:
+                    logger.error(f"Failed to delete file {path}: {e}")
\ No newline at end of file
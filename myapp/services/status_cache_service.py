@@ -0,0 +1,129 @@
+import json
+import logging
+from django.core.files.storage import default_storage
+from rest_framework.fields import DateTimeField
+from ..constants import REDIS_KEY_EXPIRY
+from ..utils.redis_client import get_redis_client, get_many, set_many
+from .event_service import SimulationEventService
+
+logger = logging.getLogger(__name__)
+
+IMAGE_FIELDS = ('mesh_image', 'stress_image', 'deformation_image')
+
+
+class StatusCacheService:
+    """
+    Read-through cache of the status endpoint payload
+
+    ``simulation_status:{id}`` holds a compact JSON blob with status,
+    timestamps, summary and relative image URLs (also of the resized
+    image variants). It is rewritten on every
+    state transition, so polling clients are served without touching the
+    database. Every write is also pushed to subscribers as a ``status`` event.
+    """
+
+    @staticmethod
+    def get_key(simulation_id):
+        return f"simulation_status:{simulation_id}"
+
+    @staticmethod
+    def build_payload(simulation):
+        """Status payload of a simulation, image URLs relative to the site root"""
+        to_representation = DateTimeField().to_representation
+        payload = {
+            'id': simulation.id,
+            'user_id': simulation.user_id,
+            'title': simulation.title,
+            'status': simulation.status,
+            'queue': simulation.queue,
+            'created_at': to_representation(simulation.created_at) if simulation.created_at else None,
+            'started_at': to_representation(simulation.started_at) if simulation.started_at else None,
+            'completed_at': to_representation(simulation.completed_at) if simulation.completed_at else None,
+            'parameters': simulation.parameters,
+        }
+
+        if simulation.status == 'COMPLETED' and hasattr(simulation, 'result'):
+            payload['result_summary'] = simulation.result.summary
+            for field_name in IMAGE_FIELDS:
+                image = getattr(simulation.result, field_name)
+                payload[f'{field_name}_url'] = image.url if image else None
+            payload['image_variants'] = {
+                field_name: {
+                    size: {key: value if key == 'width' else default_storage.url(value)
+                           for key, value in variant.items()}
+                    for size, variant in sizes.items()
+                }
+                for field_name, sizes in (simulation.result.image_variants or {}).items()
+            }
+        return payload
+
+    @staticmethod
+    def public_payload(payload):
+        """Payload as shown to clients, without the owner id used for access checks"""
+        return {key: value for key, value in payload.items() if key != 'user_id'}
+
+    @staticmethod
+    def publish(simulation):
+        """Write the current state of a simulation to the status cache"""
+        try:
+            payload = StatusCacheService.build_payload(simulation)
+            get_redis_client().set(
+                StatusCacheService.get_key(simulation.id),
+                json.dumps(payload, separators=(',', ':')),
+                ex=REDIS_KEY_EXPIRY,
+            )
+            SimulationEventService.publish(simulation.id, 'status', StatusCacheService.public_payload(payload))
+            return payload
+        except Exception as e:
+            logger.error(f"Error publishing status of simulation {simulation.id}: {e}")
+            return None
+
+    @staticmethod
+    def publish_many(simulation_ids):
+        """Refresh the cached status of several simulations in one round trip"""
+        from ..models import Simulation
+
+        try:
+            simulations = Simulation.objects.filter(id__in=simulation_ids).select_related('result')
+            payloads = {simulation.id: StatusCacheService.build_payload(simulation) for simulation in simulations}
+            set_many({
+                StatusCacheService.get_key(simulation_id): json.dumps(payload, separators=(',', ':'))
+                for simulation_id, payload in payloads.items()
+            }, ex=REDIS_KEY_EXPIRY)
+            SimulationEventService.publish_many([
+                (simulation_id, 'status', StatusCacheService.public_payload(payload))
+                for simulation_id, payload in payloads.items()
+            ])
+        except Exception as e:
+            logger.error(f"Error publishing status of simulations {simulation_ids}: {e}")
+
+    @staticmethod
+    def get(simulation_id):
+        """Cached status payload, with solver progress while solving, or None on a miss"""
+        from .progress_service import SolverProgressReporter
+
+        try:
+            cached, progress = get_many([
+                StatusCacheService.get_key(simulation_id),
+                SolverProgressReporter.get_key(simulation_id),
+            ])
+            if cached:
+                payload = json.loads(cached)
+                if progress and payload.get('status') in ('RUNNING', 'POSTPROCESSING'):
+                    payload['progress'] = json.loads(progress)
+                return payload
+        except (ValueError, TypeError):
+            # Plain status strings written before the payload format
+            return None
+        except Exception as e:
+            logger.error(f"Error reading status of simulation {simulation_id}: {e}")
+        return None
+
+    @staticmethod
+    def invalidate(*simulation_ids):
+        if not simulation_ids:
+            return
+        try:
+            get_redis_client().delete(*[StatusCacheService.get_key(i) for i in simulation_ids])
+        except Exception as e:
+            logger.error(f"Error invalidating status of simulations {simulation_ids}: {e}")
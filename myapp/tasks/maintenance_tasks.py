@@ -5,9 +5,8 @@ from datetime import timedelta
 from ..models import Simulation
 from ..services.simulation_cache_service import SimulationCacheService
 from ..constants import OLD_SIMULATION_THRESHOLD_DAYS
-from redis import Redis
+from ..utils.redis_client import get_redis_client
 import json
-from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +23,7 @@ def clean_old_simulations():
         count = old_simulations.count()
         if count > 0:
             # Get their hashes before deleting
-            redis_client = Redis.from_url(settings.CELERY_BROKER_URL)
+            redis_client = get_redis_client()
             for simulation in old_simulations:
                 try:
                     if simulation.parameters_hash:
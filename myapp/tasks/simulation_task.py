@@ -1,11 +1,5 @@
 import logging
-import json
-import os
 from celery import shared_task
-from redis import Redis
-from django.conf import settings
-from django.db import transaction
-from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
@@ -15,28 +9,29 @@ def run_simulation_task_with_redis(self, simulation_id):
     """Run a simulation as a Celery task with Redis status tracking"""
     logger.info(f"Starting simulation task for simulation ID: {simulation_id}")
 
-    # Connect to Redis
-    redis_client = Redis.from_url(settings.CELERY_BROKER_URL)
-    status_key = f"simulation_status:{simulation_id}"
-
     try:
         # Import here to avoid circular imports
         from myapp.models import Simulation
         from myapp.services.simulation_service import SimulationService
         from myapp.services.simulation_cache_service import SimulationCacheService
 
+        from myapp.services.event_service import SimulationEventService
+
         # Get simulation
         simulation = Simulation.objects.get(id=simulation_id)
+        SimulationEventService.publish(simulation_id, 'progress', {
+            'phase': 'start', 'message': f"Picked up by worker {self.request.hostname}"})
 
-        # Update Redis status
-        redis_client.set(status_key, "RUNNING", ex=86400)
-
-        # Run the simulation through service layer
+        # Run the simulation through service layer (it publishes every status change)
         result = SimulationService.run_simulation(simulation_id)
 
         # Cache this result for future use only if successful
+        simulation.refresh_from_db()
         if result and simulation.status == 'COMPLETED':
             SimulationCacheService.cache_simulation(simulation_id, simulation.parameters)
+            SimulationCacheService.cache_reference(simulation_id, simulation.parameters)
+
+        finish_followers(simulation)
 
         return {"status": "success", "simulation_id": simulation_id}
 
@@ -47,15 +42,83 @@ def run_simulation_task_with_redis(self, simulation_id):
             # Import here to avoid circular imports
             from myapp.models import Simulation
 
-            # Update simulation status in the database
+            # Update simulation status in the database, unless it already finished
             simulation = Simulation.objects.get(id=simulation_id)
-            simulation.status = 'FAILED'
-            simulation.save()
+            if simulation.transition_to('FAILED'):
+                # Update Redis status
+                from myapp.services.status_cache_service import StatusCacheService
+                StatusCacheService.publish(simulation)
 
-            # Update Redis status
-            redis_client.set(status_key, "FAILED", ex=86400)
+            finish_followers(simulation)
 
         except Exception as db_error:
             logger.error(f"Failed to update simulation status: {str(db_error)}", exc_info=True)
 
-        return {"status": "error", "error": str(e)}
\ No newline at end of file
+        return {"status": "error", "error": str(e)}
+
+
+def finish_followers(simulation):
+    """Release the in-flight entry of a leader and complete or fail the simulations waiting on it"""
+    from myapp.services.simulation_service import SimulationService
+    from myapp.services.simulation_cache_service import SimulationCacheService
+
+    try:
+        follower_ids = SimulationCacheService.release_inflight(simulation.parameters, simulation.id)
+        if not follower_ids:
+            return
+
+        # Followers' cached status is refreshed by complete_followers
+        SimulationService.complete_followers(simulation.id, follower_ids)
+    except Exception as e:
+        logger.error(f"Failed to finish followers of simulation {simulation.id}: {str(e)}", exc_info=True)
+
+
+@shared_task(bind=True)
+def run_sweep_task_with_redis(self, simulation_ids):
+    """Run a pressure sweep as a single Celery task with Redis status tracking"""
+    logger.info(f"Starting sweep task for simulation IDs: {simulation_ids}")
+
+    try:
+        from myapp.models import Simulation
+        from myapp.services.simulation_service import SimulationService
+        from myapp.services.simulation_cache_service import SimulationCacheService
+
+        # run_sweep publishes the status of every case
+        SimulationService.run_sweep(simulation_ids)
+
+        for simulation in Simulation.objects.filter(id__in=simulation_ids, status='COMPLETED'):
+            SimulationCacheService.cache_simulation(simulation.id, simulation.parameters)
+            SimulationCacheService.cache_reference(simulation.id, simulation.parameters)
+
+        return {"status": "success", "simulation_ids": simulation_ids}
+
+    except Exception as e:
+        logger.error(f"Error in sweep task: {str(e)}", exc_info=True)
+
+        try:
+            from myapp.models import Simulation
+            from myapp.services.status_cache_service import StatusCacheService
+
+            StatusCacheService.publish_many(Simulation.transition_many(simulation_ids, 'FAILED'))
+
+        except Exception as db_error:
+            logger.error(f"Failed to update sweep status: {str(db_error)}", exc_info=True)
+
+        return {"status": "error", "error": str(e)}
+
+
+@shared_task(bind=True)
+def render_images_task(self, simulation_ids, mesh_image=None):
+    """Render the result images of completed simulations, on the render queue away from MAPDL"""
+    logger.info(f"Starting render task for simulation IDs: {simulation_ids}")
+
+    try:
+        from myapp.services.simulation_service import SimulationService
+
+        SimulationService.render_images(simulation_ids, mesh_image=mesh_image)
+
+        return {"status": "success", "simulation_ids": simulation_ids}
+
+    except Exception as e:
+        logger.error(f"Error in render task: {str(e)}", exc_info=True)
+        return {"status": "error", "error": str(e)}
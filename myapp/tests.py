@@ -1,19 +1,59 @@
+import io
+import gzip
+import json
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+import numpy as np
+import pyarrow as pa
+from PIL import Image
 from django.conf import settings
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.test import AsyncClient, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
 from myapp.services.mapdl_handler import MAPDLHandler
-from myapp.models import Simulation
+from myapp.services.mapdl_pool import MAPDLSessionPool
+from myapp.services.mesh_cache_service import MeshCacheService
+from myapp.services.simulation_cache_service import SimulationCacheService
+from myapp.services.simulation_service import SimulationService
+from myapp.services.cost_estimator import CostEstimator
+from myapp.services.queue_router import QueueRouter
+from myapp.services.status_cache_service import StatusCacheService
+from myapp.services.event_service import SimulationEventService
+from myapp.services.progress_service import SolverProgressReporter
+from myapp.services.metrics_service import CELERY_QUEUES, MetricsService
+from myapp.tasks.simulation_task import finish_followers
+from myapp.constants import (
+    SIMULATION_QUEUES, PARAMETER_HASH_VERSION, REDIS_MAX_CONNECTIONS, REDIS_HEALTH_CHECK_INTERVAL
+)
+from myapp.api.serializers import SimulationSerializer
+from myapp.models import Simulation, SimulationResult
+from myapp.utils.fake_mapdl import FakeMapdl, build_beam_mesh
+from myapp.utils.field_renderer import face_polygons
+from myapp.utils.field_statistics import summarize_field
+from myapp.utils.field_store import SimulationFields, get_fields_path
+from myapp.utils.image_capture import ImageCapture
+from myapp.utils.image_variants import save_image_variants
+from myapp.utils.parameter_hash import hash_parameters
+from myapp.utils.result_processor import ResultProcessor
+from myapp.utils.solver_progress import SolverOutputMonitor, SolverProgressParser
+from myapp.utils.timing import start_timer, summarize_timings, timed
+from myapp.utils.redis_client import get_redis_client, reset_redis_client, set_many
+from myapp.management.commands.benchmark import run_benchmark
+from myapp.management.commands.rehash_parameters import rehash_simulations
 
 
 class MAPDLHandlerTests(TestCase):
     def setUp(self):
-        # Create test directory
-        self.test_dir = os.path.join(settings.MEDIA_ROOT, 'test_simulation')
-        os.makedirs(self.test_dir, exist_ok=True)
-
         # Sample parameters for simulation
         self.test_parameters = {
             'id': 'test123',
@@ -28,27 +68,34 @@ class MAPDLHandlerTests(TestCase):
             'pressure': 1000
         }
 
-    @patch('myapp.services.mapdl_handler.launch_mapdl')
-    def test_get_mapdl(self, mock_launch_mapdl):
-        # Setup mock
-        mock_mapdl = MagicMock()
-        mock_launch_mapdl.return_value = mock_mapdl
+        # Every test starts with a fresh session pool
+        MAPDLHandler()._pool = None
 
-        # Test getting MAPDL instance
-        handler = MAPDLHandler()
-        mapdl = handler.get_mapdl()
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.redis_patch = patch('myapp.services.mesh_cache_service.get_redis_client')
+        self.redis_patch.start()
 
-        # Assertions
-        self.assertEqual(mapdl, mock_mapdl)
-        mock_launch_mapdl.assert_called_once()
+    def tearDown(self):
+        self.redis_patch.stop()
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    @patch('myapp.services.mapdl_pool.launch_mapdl')
+    def test_get_pool(self, mock_launch_mapdl):
+        handler = MAPDLHandler()
+        pool = handler.get_pool()
 
-        # Test singleton behavior
-        mapdl2 = handler.get_mapdl()
-        self.assertEqual(mapdl, mapdl2)
-        mock_launch_mapdl.assert_called_once()  # Should not be called again
+        # Singleton behavior
+        self.assertIs(pool, MAPDLHandler().get_pool())
+        # Sessions are launched lazily
+        mock_launch_mapdl.assert_not_called()
 
-    @patch('myapp.services.mapdl_handler.launch_mapdl')
-    def test_run_simulation(self, mock_launch_mapdl):
+    @patch('myapp.services.mapdl_handler.SYMMETRY_MODEL_ENABLED', False)
+    @patch('myapp.services.mapdl_handler.SimulationFields')
+    @patch('myapp.services.mapdl_pool.launch_mapdl')
+    def test_run_simulation(self, mock_launch_mapdl, mock_fields):
         # Setup mocks
         mock_mapdl = MagicMock()
         mock_result = MagicMock()
@@ -67,42 +114,208 @@ class MAPDLHandlerTests(TestCase):
         # Mock principal_nodal_stress to return stress data
         mock_result.principal_nodal_stress.return_value = (None, stress_array)
 
-        # Set up image capture mock
-        with patch('myapp.services.mapdl_handler.ImageCapture.save_simulation_images') as mock_save_images:
-            mock_save_images.return_value = {
-                'mesh_image': '/path/to/mesh.png',
-                'stress_image': '/path/to/stress.png',
-                'deformation_image': '/path/to/deform.png'
-            }
-
-            # Run test
-            handler = MAPDLHandler()
-            result = handler.run_simulation(self.test_parameters)
-
-            # Assertions
-            self.assertEqual(result, mock_result)
-            mock_mapdl.clear.assert_called_once()
-            mock_mapdl.prep7.assert_called_once()
-            mock_mapdl.solve.assert_called_once()
-            mock_save_images.assert_called_once()
-
-            # Check that von Mises stress values were accessed
-            mock_result.principal_nodal_stress.assert_called_once()
-
-    @patch('myapp.services.mapdl_handler.launch_mapdl')
+        # Run test
+        handler = MAPDLHandler()
+        result = handler.run_simulation(self.test_parameters)
+
+        # Assertions
+        self.assertEqual(result, mock_result)
+        mock_mapdl.clear.assert_called_once()
+        mock_mapdl.prep7.assert_called_once()
+        mock_mapdl.solve.assert_called_once()
+        # Fields are read before the session is released, images are left to the render stage
+        mock_fields.from_result.assert_called_once_with(mock_result, rnum=0)
+        self.assertEqual(result._fields, mock_fields.from_result.return_value)
+        mock_mapdl.eplot.assert_not_called()
+
+        # The session is reset and kept warm for the next job
+        mock_mapdl.exit.assert_not_called()
+        self.assertEqual(handler.get_pool().stats()['idle'], 1)
+
+    @patch('myapp.services.mapdl_handler.SYMMETRY_MODEL_ENABLED', False)
+    @patch('myapp.services.mapdl_handler.SimulationFields')
+    @patch('myapp.services.mapdl_pool.launch_mapdl')
+    def test_cached_mesh_reused(self, mock_launch_mapdl, mock_fields):
+        mock_mapdl = MagicMock()
+        mock_mapdl.directory = self.media_root
+        # MAPDL writes the archive into its working directory on SAVE
+        mock_mapdl.save.side_effect = lambda name, ext: open(
+            os.path.join(self.media_root, f"{name}.{ext}"), 'w').close()
+        mock_launch_mapdl.return_value = mock_mapdl
+
+        handler = MAPDLHandler()
+        handler.run_simulation(self.test_parameters)
+        mock_mapdl.vmesh.assert_called_once()
+
+        handler.run_simulation(dict(self.test_parameters, pressure=5000))
+        mock_mapdl.vmesh.assert_called_once()  # Not meshed again
+        mock_mapdl.resume.assert_called_once_with('mesh_cache', 'db')
+
+    @patch('myapp.services.mapdl_handler.SYMMETRY_MODEL_ENABLED', False)
+    @patch('myapp.services.mapdl_handler.SimulationFields')
+    @patch('myapp.services.mapdl_pool.launch_mapdl')
+    def test_plane_stress_model(self, mock_launch_mapdl, mock_fields):
+        mock_mapdl = MagicMock()
+        mock_launch_mapdl.return_value = mock_mapdl
+
+        MAPDLHandler().run_simulation(dict(self.test_parameters, model_type='plane_stress'))
+
+        mock_mapdl.et.assert_called_once_with(1, 'PLANE183')
+        mock_mapdl.r.assert_called_once_with(1, self.test_parameters['depth'])
+        mock_mapdl.amesh.assert_called_once_with('ALL')
+        mock_mapdl.vmesh.assert_not_called()
+
+    @patch('myapp.services.mapdl_handler.SYMMETRY_MODEL_ENABLED', True)
+    @patch('myapp.services.mapdl_handler.SimulationFields')
+    @patch('myapp.services.mapdl_pool.launch_mapdl')
+    def test_symmetric_half_model(self, mock_launch_mapdl, mock_fields):
+        mock_mapdl = MagicMock()
+        mock_launch_mapdl.return_value = mock_mapdl
+
+        result = MAPDLHandler().run_simulation(self.test_parameters)
+
+        width = self.test_parameters['width']
+        mock_mapdl.block.assert_called_once_with(0, 5, 0, width / 2, 0, 0.1)
+        mock_mapdl.nsel.assert_any_call('S', 'LOC', 'Y', width / 2)
+        mock_mapdl.d.assert_any_call('ALL', 'UY', 0)
+        # Images are rendered later from the mirrored full-model fields
+        mock_fields.from_result.return_value.mirrored.assert_called_once_with(axis=1, plane=width / 2)
+        self.assertEqual(result._fields, mock_fields.from_result.return_value.mirrored.return_value)
+
+    def test_model_type_in_geometry_hash(self):
+        self.assertEqual(
+            MeshCacheService.get_geometry_hash(self.test_parameters),
+            MeshCacheService.get_geometry_hash(dict(self.test_parameters, model_type='3d_solid')),
+        )
+        self.assertNotEqual(
+            MeshCacheService.get_geometry_hash(self.test_parameters),
+            MeshCacheService.get_geometry_hash(dict(self.test_parameters, model_type='plane_stress')),
+        )
+
+    @patch('myapp.services.mapdl_pool.launch_mapdl')
     def test_close_mapdl(self, mock_launch_mapdl):
         # Setup mock
         mock_mapdl = MagicMock()
         mock_launch_mapdl.return_value = mock_mapdl
 
-        # Get MAPDL and then close it
+        # Start the pool and then close it
         handler = MAPDLHandler()
-        handler.get_mapdl()
+        handler.get_pool().start()
         handler.close_mapdl()
 
         # Assertions
         mock_mapdl.exit.assert_called_once()
-        self.assertIsNone(handler._mapdl)
+        self.assertEqual(handler.get_pool().stats()['sessions'], 0)
+
+
+class MAPDLSessionPoolTests(TestCase):
+    def setUp(self):
+        # Sessions get their run directories under MEDIA_ROOT
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.report_patch = patch('myapp.services.mapdl_pool.MetricsService.report_pool')
+        self.report_pool = self.report_patch.start()
+
+    def tearDown(self):
+        self.report_patch.stop()
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    @staticmethod
+    def _mock_mapdl():
+        return MagicMock(exited=False, is_alive=True)
+
+    @patch('myapp.services.mapdl_pool.METRICS_POOL_REPORT_SECONDS', 0.01)
+    def test_occupancy_reported_periodically_until_shutdown(self):
+        pool = MAPDLSessionPool(size=1, launcher=MagicMock(side_effect=lambda **kwargs: self._mock_mapdl()))
+        pool.start()
+        time.sleep(0.1)
+        pool.shutdown()
+
+        reports = self.report_pool.call_count
+        self.assertGreater(reports, 2)
+        time.sleep(0.05)
+        self.assertEqual(self.report_pool.call_count, reports)
+
+    @patch('myapp.services.mapdl_pool.launch_mapdl')
+    def test_session_reused_between_jobs(self, mock_launch_mapdl):
+        mock_mapdl = self._mock_mapdl()
+        mock_launch_mapdl.return_value = mock_mapdl
+        pool = MAPDLSessionPool(size=1, max_jobs=10)
+
+        for _ in range(3):
+            with pool.session() as mapdl:
+                self.assertIs(mapdl, mock_mapdl)
+
+        mock_launch_mapdl.assert_called_once()
+        self.assertEqual(mock_mapdl.clear.call_count, 3)
+
+    @patch('myapp.services.mapdl_pool.launch_mapdl')
+    def test_session_recycled_after_max_jobs(self, mock_launch_mapdl):
+        first, second = self._mock_mapdl(), self._mock_mapdl()
+        mock_launch_mapdl.side_effect = [first, second]
+        pool = MAPDLSessionPool(size=1, max_jobs=2)
+
+        for _ in range(2):
+            with pool.session():
+                pass
+
+        first.exit.assert_called_once()
+        # The replacement is launched by the next job, not by the one that finished
+        self.assertEqual(mock_launch_mapdl.call_count, 1)
+        with pool.session() as mapdl:
+            self.assertIs(mapdl, second)
+        self.assertEqual(pool.stats()['recycled'], 1)
+
+    def test_concurrent_acquire_stays_within_size(self):
+        def slow_launch(**kwargs):
+            time.sleep(0.1)
+            return self._mock_mapdl()
+
+        pool = MAPDLSessionPool(size=1, max_jobs=10, launcher=MagicMock(side_effect=slow_launch))
+        sessions = []
+
+        def job():
+            session = pool.acquire(timeout=5)
+            sessions.append(session)
+            pool.release(session)
+
+        threads = [threading.Thread(target=job) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(pool.launcher.call_count, 1)
+        self.assertIs(sessions[0], sessions[1])
+        self.assertEqual(pool.stats()['sessions'], 1)
+
+    @patch('myapp.services.mapdl_pool.launch_mapdl')
+    def test_failed_job_discards_session(self, mock_launch_mapdl):
+        broken, fresh = self._mock_mapdl(), self._mock_mapdl()
+        mock_launch_mapdl.side_effect = [broken, fresh]
+        pool = MAPDLSessionPool(size=1, max_jobs=10)
+
+        with self.assertRaises(RuntimeError):
+            with pool.session():
+                raise RuntimeError("solver crashed")
+
+        broken.exit.assert_called_once()
+        broken.clear.assert_not_called()
+        with pool.session() as mapdl:
+            self.assertIs(mapdl, fresh)
+
+    @patch('myapp.services.mapdl_pool.launch_mapdl')
+    def test_unhealthy_session_replaced_on_acquire(self, mock_launch_mapdl):
+        dead, fresh = self._mock_mapdl(), self._mock_mapdl()
+        mock_launch_mapdl.side_effect = [dead, fresh]
+        pool = MAPDLSessionPool(size=1, max_jobs=10)
+        pool.start()
+
+        dead.exited = True
+        with pool.session() as mapdl:
+            self.assertIs(mapdl, fresh)
 
 
 class SimulationModelTests(TestCase):
@@ -128,5 +341,1377 @@ class SimulationModelTests(TestCase):
         self.assertEqual(simulation.parameters_hash, simulation2.parameters_hash)
 
 
+
+def make_fields(stress_scale=1.0):
+    """Small synthetic field set: a row of nodes along the beam"""
+    count = 6
+    points = np.column_stack([np.linspace(0, 5, count), np.zeros(count), np.zeros(count)])
+    displacement = np.column_stack([np.linspace(0, 1e-4, count), np.zeros(count), np.zeros(count)])
+    principal = np.column_stack([
+        np.linspace(1, 6, count), np.zeros(count), -np.linspace(0.5, 3, count),
+        np.linspace(1.5, 9, count), np.linspace(2, 12, count),
+    ]) * stress_scale
+    return SimulationFields(
+        node_ids=np.arange(1, count + 1),
+        points=points,
+        cells=np.array([2, 0, 1]),
+        celltypes=np.array([3]),
+        displacement=displacement,
+        principal_stress=principal,
+        element_count=1,
+    )
+
+
+class SimulationFieldsTests(TestCase):
+    def test_scaled_fields(self):
+        fields = make_fields()
+        scaled = fields.scaled(stress_factor=2.0, displacement_factor=0.5)
+
+        np.testing.assert_allclose(scaled.von_mises, fields.von_mises * 2)
+        np.testing.assert_allclose(scaled.displacement_norm, fields.displacement_norm * 0.5)
+
+    def test_negative_load_swaps_principal_order(self):
+        fields = make_fields()
+        scaled = fields.scaled(stress_factor=-1.0, displacement_factor=-1.0)
+
+        # S1 >= S2 >= S3 still holds and von Mises stays positive
+        self.assertTrue(np.all(scaled.principal_stress[:, 0] >= scaled.principal_stress[:, 2]))
+        np.testing.assert_allclose(scaled.principal_stress[:, 0], -fields.principal_stress[:, 2])
+        np.testing.assert_allclose(scaled.von_mises, fields.von_mises)
+
+    def test_mirrored_half_model(self):
+        # Two triangles in the half y <= 1 with two nodes on the symmetry plane y = 1
+        fields = SimulationFields(
+            node_ids=np.array([1, 2, 3, 4]),
+            points=np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [1, 1, 0]], dtype=float),
+            cells=np.array([3, 0, 1, 2, 3, 1, 3, 2]),
+            celltypes=np.array([5, 5]),
+            displacement=np.array([[0, 0.1, 0], [0, 0.2, 0], [0, 0, 0], [0, 0, 0]], dtype=float),
+            principal_stress=np.arange(20, dtype=float).reshape(4, 5),
+            element_count=2,
+        )
+
+        full = fields.mirrored(axis=1, plane=1.0)
+
+        self.assertEqual(len(full.node_ids), 6)
+        self.assertEqual(full.element_count, 4)
+        np.testing.assert_allclose(full.points[4:, 1], [2, 2])
+        np.testing.assert_allclose(full.displacement[4:, 1], [-0.1, -0.2])
+        np.testing.assert_allclose(full.principal_stress[4:], fields.principal_stress[:2])
+        # Mirrored triangles reference mirrored nodes, share the nodes on the plane and keep their winding
+        np.testing.assert_array_equal(full.cells[8:], [3, 4, 2, 5, 3, 5, 2, 3])
+
+    def test_mirrored_cells_keep_orientation(self):
+        # A tetrahedron and a triangle below the plane z = 1, mixed cell types
+        points = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 0.5], [1, 1, 0]], dtype=float)
+        fields = SimulationFields(
+            node_ids=np.arange(1, 6),
+            points=points,
+            cells=np.array([4, 0, 1, 2, 3, 3, 1, 4, 2]),
+            celltypes=np.array([10, 5]),
+            displacement=np.zeros((5, 3)),
+            principal_stress=np.zeros((5, 5)),
+            element_count=2,
+        )
+
+        full = fields.mirrored(axis=2, plane=1.0)
+
+        def signed_volume(ids):
+            p = full.points[ids]
+            return np.linalg.det(np.array([p[1] - p[0], p[2] - p[0], p[3] - p[0]]))
+
+        self.assertGreater(signed_volume(full.cells[1:5]), 0)
+        self.assertGreater(signed_volume(full.cells[10:14]), 0)
+        np.testing.assert_array_equal(full.cells[14:], [3, 6, 7, 9])
+
+        fields.celltypes = np.array([42, 5])
+        with self.assertRaises(ValueError):
+            fields.mirrored(axis=2, plane=1.0)
+
+    def test_save_and_load_roundtrip(self):
+        fields = make_fields()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = fields.save(os.path.join(tmp, 'fields.npz'))
+            loaded = SimulationFields.load(path)
+
+        np.testing.assert_array_equal(loaded.node_ids, fields.node_ids)
+        np.testing.assert_allclose(loaded.principal_stress, fields.principal_stress)
+        self.assertEqual(loaded.element_count, 1)
+
+    def test_saved_as_float32_and_memory_mapped(self):
+        fields = make_fields()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = fields.save(os.path.join(tmp, 'fields.npz'))
+            loaded = SimulationFields.load(path)
+            compressed = SimulationFields.load(fields.save(os.path.join(tmp, 'packed.npz'), compressed=True))
+
+            self.assertEqual(loaded.principal_stress.dtype, np.float32)
+            self.assertEqual(loaded.points.dtype, np.float64)
+            self.assertEqual(loaded.cells.dtype, np.int32)
+            self.assertIsInstance(loaded.displacement.base, np.memmap)
+            self.assertFalse(loaded.displacement.flags.writeable)
+            np.testing.assert_allclose(loaded.von_mises, fields.von_mises, rtol=1e-6)
+            np.testing.assert_array_equal(compressed.principal_stress, loaded.principal_stress)
+            # No temporary files are left behind
+            self.assertEqual(sorted(os.listdir(tmp)), ['fields.npz', 'packed.npz'])
+
+    def test_summarize_field_skips_nan_and_locates_peak(self):
+        values = np.array([1.0, np.nan, 5.0, 3.0, np.inf])
+        points = np.arange(15, dtype=float).reshape(5, 3)
+
+        stats = summarize_field(values, node_ids=np.array([10, 11, 12, 13, 14]), points=points)
+
+        self.assertEqual((stats['count'], stats['nan_count']), (3, 2))
+        self.assertEqual((stats['min'], stats['max'], stats['mean']), (1.0, 5.0, 3.0))
+        self.assertEqual(stats['peak'], {'node_id': 12, 'location': [6.0, 7.0, 8.0]})
+        self.assertEqual(stats['percentiles']['p50'], 3.0)
+        self.assertEqual(sum(stats['histogram']['counts']), 3)
+        self.assertEqual(summarize_field([np.nan], [1], [[0, 0, 0]]), {'count': 0, 'nan_count': 1})
+
+    def test_summary_contains_field_statistics(self):
+        fields = make_fields()
+        fields.displacement[0] = np.nan
+        with tempfile.TemporaryDirectory() as tmp, override_settings(MEDIA_ROOT=tmp):
+            summary = ResultProcessor.process_fields(fields, simulation_id=1)['summary']
+
+        self.assertEqual(summary['displacement_statistics']['nan_count'], 1)
+        self.assertEqual(summary['max_stress'], summary['stress_statistics']['max'])
+        self.assertIn(summary['stress_statistics']['peak']['node_id'], fields.node_ids.tolist())
+
+
+class ScaledReuseTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.base_parameters = {
+            'e': 2e11, 'nu': 0.3, 'length': 5, 'width': 2.5, 'depth': 0.1,
+            'radius': 0.5, 'num': 3, 'element_size': 0.125, 'pressure': 1000,
+        }
+        self.reference = Simulation.objects.create(
+            title='Reference', parameters=self.base_parameters, status='COMPLETED')
+        make_fields().save(get_fields_path(self.reference.id))
+        SimulationResult.objects.create(
+            simulation=self.reference, field_data=f'simulation_results/{self.reference.id}/fields.npz', summary={})
+        self.redis_patch = patch('myapp.services.simulation_cache_service.get_redis_client')
+        self.redis_patch.start().return_value.get.return_value = None
+
+    def tearDown(self):
+        self.redis_patch.stop()
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_reference_found_for_load_and_material_change(self):
+        parameters = dict(self.base_parameters, pressure=3000, e=1e11)
+        reference = SimulationCacheService.get_reference_simulation(parameters)
+        self.assertEqual(reference, self.reference)
+
+    def test_no_reference_for_geometry_change(self):
+        parameters = dict(self.base_parameters, radius=0.4)
+        self.assertIsNone(SimulationCacheService.get_reference_simulation(parameters))
+
+    def test_reference_matched_on_canonical_scaling_key(self):
+        # Same geometry written differently: defaults left out, ints as floats
+        parameters = {'e': 1e11, 'nu': 0.3, 'length': 5.0, 'num': 3.0, 'pressure': 500}
+        self.assertEqual(SimulationCacheService.get_reference_simulation(parameters), self.reference)
+
+    @patch('myapp.services.simulation_service.SimulationService.queue_render')
+    @patch('myapp.services.simulation_service.MAPDLHandler')
+    def test_run_simulation_scales_without_solving(self, mock_handler, mock_render):
+        simulation = Simulation.objects.create(
+            title='Scaled', parameters=dict(self.base_parameters, pressure=3000, e=1e11))
+
+        result = SimulationService.run_simulation(simulation.id)
+
+        mock_handler.assert_not_called()
+        reference = make_fields()
+        self.assertAlmostEqual(result.summary['max_stress'], reference.von_mises.max() * 3)
+        self.assertAlmostEqual(result.summary['max_displacement'], reference.displacement_norm.max() * 6)
+        self.assertEqual(result.summary['scaled_from'], self.reference.id)
+        self.assertTrue(result.summary['images_pending'])
+        simulation.refresh_from_db()
+        self.assertEqual(simulation.status, 'COMPLETED')
+        mock_render.assert_called_once_with([simulation.id], mesh_image=None, render_async=True)
+
+    @patch('myapp.api.views.SimulationService.submit_simulation')
+    @patch('myapp.services.simulation_service.SimulationService.queue_render')
+    def test_scalable_submission_completed_without_queuing(self, mock_render, mock_submit):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='scaler', password='pass'))
+
+        response = client.post('/myapp/simulations/', {
+            'title': 'Scaled', 'parameters': dict(self.base_parameters, pressure=2000)
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['scaled_from'], self.reference.id)
+        mock_submit.assert_not_called()
+        simulation = Simulation.objects.get(id=response.data['id'])
+        self.assertEqual(simulation.status, 'COMPLETED')
+        self.assertEqual(simulation.result.summary['scaled_from'], self.reference.id)
+        mock_render.assert_called_once_with([simulation.id], mesh_image=None, render_async=True)
+
+
+
+class MeshCacheServiceTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.redis_patch = patch('myapp.services.mesh_cache_service.get_redis_client')
+        self.redis_client = self.redis_patch.start().return_value
+
+    def tearDown(self):
+        self.redis_patch.stop()
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def _write_archive(self, name, size):
+        path = os.path.join(self.media_root, name)
+        with open(path, 'wb') as f:
+            f.write(b'\0' * size)
+        return path
+
+    def test_geometry_hash_ignores_material_and_load(self):
+        base = {'length': 5, 'width': 2.5, 'depth': 0.1, 'radius': 0.5, 'num': 3, 'element_size': 0.125}
+        self.assertEqual(
+            MeshCacheService.get_geometry_hash(dict(base, e=2e11, pressure=1000)),
+            MeshCacheService.get_geometry_hash(dict(base, e=7e10, pressure=50)),
+        )
+        self.assertNotEqual(
+            MeshCacheService.get_geometry_hash(base),
+            MeshCacheService.get_geometry_hash(dict(base, element_size=0.1)),
+        )
+
+    def test_lookup_counts_hits_and_misses(self):
+        self.assertIsNone(MeshCacheService.lookup('abc'))
+        MeshCacheService.store('abc', self._write_archive('source.db', 10))
+        self.assertIsNotNone(MeshCacheService.lookup('abc'))
+
+        self.redis_client.incr.assert_any_call('mesh_cache:misses')
+        self.redis_client.incr.assert_any_call('mesh_cache:hits')
+
+    def test_least_recently_used_archive_evicted(self):
+        MeshCacheService.store('old', self._write_archive('a.db', 100))
+        MeshCacheService.store('new', self._write_archive('b.db', 100))
+        os.utime(MeshCacheService.get_archive_path('old'), (1, 1))
+        os.utime(MeshCacheService.get_archive_path('new'), (2, 2))
+
+        MeshCacheService.evict(max_bytes=150)
+
+        self.assertFalse(os.path.exists(MeshCacheService.get_archive_path('old')))
+        self.assertTrue(os.path.exists(MeshCacheService.get_archive_path('new')))
+
+
+
+class FakeResult:
+    """Stand-in for a MAPDL result with one result set per pressure"""
+
+    def __init__(self, pressures):
+        self.fields = make_fields()
+        self.pressures = pressures
+        self.grid = MagicMock(
+            points=self.fields.points,
+            cells=self.fields.cells,
+            celltypes=self.fields.celltypes,
+            point_data={'ansys_node_num': self.fields.node_ids},
+        )
+        self.mesh = MagicMock(nnum=self.fields.node_ids, enum=np.arange(1, 2))
+        self._solution_output_path = None
+
+    def nodal_displacement(self, rnum):
+        return self.fields.node_ids, self.fields.displacement * self.pressures[rnum]
+
+    def principal_nodal_stress(self, rnum):
+        return self.fields.node_ids, self.fields.principal_stress * self.pressures[rnum]
+
+
+class SimulationSweepTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = User.objects.create_user(username='sweeper', password='password123')
+        self.base_parameters = {
+            'e': 2e11, 'nu': 0.3, 'length': 5, 'width': 2.5, 'depth': 0.1,
+            'radius': 0.5, 'num': 3, 'element_size': 0.125,
+        }
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    @patch('myapp.api.views.SimulationService.queue_sweep', return_value='task-1')
+    def test_sweep_endpoint_creates_one_simulation_per_pressure(self, mock_queue_sweep):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.post('/myapp/simulations/sweep/', {
+            'title': 'Sweep',
+            'parameters': self.base_parameters,
+            'pressures': [1000, 2000, 3000],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(len(response.data['simulation_ids']), 3)
+        mock_queue_sweep.assert_called_once_with(response.data['simulation_ids'], 'standard')
+        pressures = [Simulation.objects.get(id=i).parameters['pressure'] for i in response.data['simulation_ids']]
+        self.assertEqual(pressures, [1000, 2000, 3000])
+
+    @patch('myapp.services.simulation_service.SimulationService.queue_render')
+    @patch('myapp.services.simulation_service.MAPDLHandler')
+    def test_run_sweep_splits_load_steps(self, mock_handler, mock_render):
+        simulations = [
+            Simulation.objects.create(parameters=dict(self.base_parameters, pressure=pressure))
+            for pressure in (1, 2)
+        ]
+        mock_handler.return_value.run_sweep.return_value = FakeResult([1, 2])
+        mock_handler.return_value.extract_fields.side_effect = (
+            lambda result, parameters, rnum=0: SimulationFields.from_result(result, rnum=rnum))
+
+        results = SimulationService.run_sweep([simulation.id for simulation in simulations])
+
+        mock_handler.return_value.run_sweep.assert_called_once()
+        self.assertAlmostEqual(results[1].summary['max_stress'], 2 * results[0].summary['max_stress'])
+        self.assertEqual(results[1].summary['sweep_step'], 2)
+        for simulation in simulations:
+            simulation.refresh_from_db()
+            self.assertEqual(simulation.status, 'COMPLETED')
+        # One render task for all cases, they share the mesh
+        mock_render.assert_called_once_with([simulation.id for simulation in simulations], render_async=True)
+
+
+
+class SimulationSerializerTests(TestCase):
+    def setUp(self):
+        self.parameters = {
+            'e': 2e11, 'nu': 0.3, 'length': 5, 'width': 2.5, 'depth': 0.1,
+            'radius': 0.5, 'num': 3, 'element_size': 0.125, 'pressure': 1000,
+        }
+
+    def test_model_type_validation(self):
+        serializer = SimulationSerializer()
+        self.assertEqual(
+            serializer.validate_parameters(dict(self.parameters, model_type='plane_stress'))['model_type'],
+            'plane_stress',
+        )
+        with self.assertRaises(ValidationError):
+            serializer.validate_parameters(dict(self.parameters, model_type='shell'))
+
+
+
+class CostEstimatorTests(TestCase):
+    def setUp(self):
+        self.parameters = {
+            'e': 2.1e11, 'nu': 0.3, 'length': 5, 'width': 2.5, 'depth': 0.1,
+            'radius': 0.5, 'num': 3, 'element_size': 0.125, 'pressure': 1000
+        }
+        CostEstimator._calibration = None
+        self.user = User.objects.create_user(username='costuser', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_closed_form_grows_with_refinement(self):
+        coarse = CostEstimator.closed_form(self.parameters)
+        fine = CostEstimator.closed_form(dict(self.parameters, element_size=0.0625))
+        self.assertGreater(fine['element_count'], 3 * coarse['element_count'])
+
+        plane = CostEstimator.closed_form(dict(self.parameters, model_type='plane_stress'))
+        self.assertLess(plane['dof'], coarse['dof'])
+
+    def test_estimate_uses_closed_form_without_samples(self):
+        estimate = CostEstimator.estimate(self.parameters)
+        self.assertEqual(estimate['method'], 'closed_form')
+        self.assertEqual(estimate['samples'], 0)
+        self.assertGreater(estimate['memory_mb'], 0)
+        self.assertGreater(estimate['wall_time_seconds'], 0)
+
+    @patch('myapp.api.views.SimulationService.queue_simulation', return_value='task-1')
+    def test_estimate_returned_on_create(self, mock_queue):
+        response = self.client.post('/myapp/simulations/', {
+            'title': 'Estimated', 'parameters': self.parameters
+        }, format='json')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertIn('element_count', response.data['cost_estimate'])
+        self.assertIsNotNone(Simulation.objects.get(id=response.data['id']).cost_estimate)
+
+    @patch('myapp.api.views.SimulationService.queue_simulation')
+    def test_oversized_mesh_rejected(self, mock_queue):
+        response = self.client.post('/myapp/simulations/', {
+            'title': 'Too fine', 'parameters': dict(self.parameters, element_size=0.001)
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        mock_queue.assert_not_called()
+        self.assertFalse(Simulation.objects.exists())
+
+
+
+class QueueRoutingTests(TestCase):
+    def test_select_queue_by_estimated_wall_time(self):
+        self.assertEqual(QueueRouter.select_queue({'wall_time_seconds': 20}), 'interactive')
+        self.assertEqual(QueueRouter.select_queue({'wall_time_seconds': 300}), 'standard')
+        self.assertEqual(QueueRouter.select_queue({'wall_time_seconds': 5000}), 'heavy')
+        self.assertEqual(QueueRouter.select_queue({'wall_time_seconds': 20}, cases=10), 'standard')
+        self.assertEqual(QueueRouter.select_queue(None), 'standard')
+
+    @patch('myapp.services.simulation_service.get_redis_client')
+    @patch('myapp.tasks.simulation_task.run_simulation_task_with_redis.apply_async')
+    def test_queue_simulation_routes_with_queue_limits(self, mock_apply_async, mock_redis):
+        mock_apply_async.return_value.id = 'task-1'
+        simulation = Simulation.objects.create(
+            title='Routed', parameters={'length': 5}, cost_estimate={'wall_time_seconds': 5000})
+
+        task_id = SimulationService.queue_simulation(simulation.id)
+
+        self.assertEqual(task_id, 'task-1')
+        kwargs = mock_apply_async.call_args.kwargs
+        self.assertEqual(kwargs['queue'], 'heavy')
+        self.assertEqual(kwargs['time_limit'], SIMULATION_QUEUES['heavy']['time_limit'])
+        simulation.refresh_from_db()
+        self.assertEqual(simulation.queue, 'heavy')
+
+    def test_queue_in_status_response(self):
+        user = User.objects.create_user(username='queueuser', password='pass')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        simulation = Simulation.objects.create(
+            title='Routed', user=user, parameters={'length': 5}, queue='interactive')
+
+        response = client.get(f'/myapp/simulations/{simulation.id}/status/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['queue'], 'interactive')
+
+    @patch.dict(os.environ, {'SIMULATION_WORKER_QUEUE': 'heavy'})
+    @patch('myapp.services.mapdl_pool.launch_mapdl')
+    def test_worker_queue_sets_mapdl_nproc(self, mock_launch_mapdl):
+        with override_settings(MEDIA_ROOT=tempfile.mkdtemp()):
+            MAPDLSessionPool(size=1).acquire()
+        self.assertEqual(mock_launch_mapdl.call_args.kwargs['nproc'], SIMULATION_QUEUES['heavy']['nproc'])
+
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class SubmitDeduplicationTests(TestCase):
+    def setUp(self):
+        self.parameters = {
+            'e': 2.1e11, 'nu': 0.3, 'length': 5, 'width': 2.5, 'depth': 0.1,
+            'radius': 0.5, 'num': 3, 'element_size': 0.125, 'pressure': 1000
+        }
+        self.user = User.objects.create_user(username='dedupuser', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.source = Simulation.objects.create(
+            title='Source', user=self.user, parameters=self.parameters, status='COMPLETED')
+        result_dir = os.path.join(settings.MEDIA_ROOT, 'simulation_results', str(self.source.id))
+        os.makedirs(result_dir, exist_ok=True)
+        with open(os.path.join(result_dir, 'result.txt'), 'w') as f:
+            f.write('results')
+        SimulationResult.objects.create(
+            simulation=self.source,
+            result_file=f'simulation_results/{self.source.id}/result.txt',
+            summary={'max_stress': 1.0},
+        )
+
+        self.redis_patch = patch('myapp.services.simulation_cache_service.get_redis_client')
+        self.mock_redis = self.redis_patch.start()
+        self.mock_redis.return_value.get.return_value = None
+
+    def tearDown(self):
+        self.redis_patch.stop()
+
+    @patch('myapp.api.views.SimulationService.queue_simulation')
+    def test_identical_submission_reuses_result(self, mock_queue):
+        response = self.client.post('/myapp/simulations/', {
+            'title': 'Duplicate', 'parameters': self.parameters
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['cache_hit'])
+        self.assertEqual(response.data['status'], 'COMPLETED')
+        mock_queue.assert_not_called()
+
+        duplicate = Simulation.objects.get(id=response.data['id'])
+        self.assertEqual(duplicate.status, 'COMPLETED')
+        self.assertEqual(duplicate.result.summary, {'max_stress': 1.0})
+        # DB fallback hit is written back to the Redis cache
+        self.mock_redis.return_value.set.assert_called()
+
+    @patch('myapp.api.views.SimulationService.queue_simulation', return_value='task-1')
+    def test_different_parameters_are_queued(self, mock_queue):
+        response = self.client.post('/myapp/simulations/', {
+            'title': 'New', 'parameters': dict(self.parameters, length=6)
+        }, format='json')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(response.data['cache_hit'])
+        mock_queue.assert_called_once()
+
+    def test_deleting_copy_keeps_shared_files(self):
+        copy = Simulation.objects.create(title='Copy', user=self.user, parameters=self.parameters)
+        SimulationService.copy_simulation_result(self.source.id, copy.id)
+
+        response = self.client.delete(f'/myapp/simulations/{copy.id}/delete/')
+
+        self.assertEqual(response.status_code, 204)
+        self.assertTrue(os.path.exists(self.source.result.result_file.path))
+
+
+
+class InflightCoalescingTests(TestCase):
+    def setUp(self):
+        self.parameters = {'length': 5, 'width': 2.5, 'pressure': 1000}
+        self.leader = Simulation.objects.create(
+            title='Leader', parameters=self.parameters, status='RUNNING', queue='standard')
+        self.followers = [
+            Simulation.objects.create(title=f'Follower {i}', parameters=self.parameters)
+            for i in range(3)
+        ]
+
+    @patch('myapp.services.simulation_service.SimulationService.queue_simulation')
+    @patch('myapp.services.simulation_service.SimulationCacheService.join_inflight')
+    def test_follower_attaches_instead_of_queuing(self, mock_join, mock_queue):
+        mock_join.return_value = self.leader.id
+
+        task_id, leader_id = SimulationService.submit_simulation(self.followers[0])
+
+        self.assertIsNone(task_id)
+        self.assertEqual(leader_id, self.leader.id)
+        mock_queue.assert_not_called()
+        self.followers[0].refresh_from_db()
+        self.assertEqual(self.followers[0].queue, 'standard')
+
+    def test_followers_completed_with_leader_result(self):
+        self.leader.status = 'COMPLETED'
+        self.leader.save()
+        SimulationResult.objects.create(
+            simulation=self.leader, result_file='simulation_results/1/result.txt',
+            field_data='simulation_results/1/fields.npz', summary={'max_stress': 2.0})
+        canceled = self.followers[2]
+        canceled.status = 'FAILED'
+        canceled.save()
+
+        ids, status = SimulationService.complete_followers(self.leader.id, [f.id for f in self.followers])
+
+        self.assertEqual(status, 'COMPLETED')
+        self.assertEqual(ids, [self.followers[0].id, self.followers[1].id])
+        for follower in self.followers[:2]:
+            follower.refresh_from_db()
+            self.assertEqual(follower.status, 'COMPLETED')
+            self.assertEqual(follower.result.summary, {'max_stress': 2.0})
+            self.assertEqual(follower.result.result_file.name, 'simulation_results/1/result.txt')
+            self.assertEqual(follower.result.field_data.name, 'simulation_results/1/fields.npz')
+        canceled.refresh_from_db()
+        self.assertEqual(canceled.status, 'FAILED')
+
+    @patch('myapp.services.status_cache_service.set_many')
+    @patch('myapp.services.simulation_cache_service.SimulationCacheService.release_inflight')
+    def test_failed_leader_fails_followers(self, mock_release, mock_set_many):
+        mock_release.return_value = [f.id for f in self.followers]
+        self.leader.status = 'FAILED'
+        self.leader.save()
+
+        finish_followers(self.leader)
+
+        self.assertEqual(Simulation.objects.filter(status='FAILED').count(), 4)
+        statuses = {key: json.loads(value)['status'] for key, value in mock_set_many.call_args.args[0].items()}
+        self.assertEqual(set(statuses.values()), {'FAILED'})
+        self.assertEqual(len(statuses), 3)
+
+
+
+class ParameterHashTests(TestCase):
+    def setUp(self):
+        self.parameters = {
+            'e': 2.1e11, 'nu': 0.3, 'length': 5, 'width': 2.5, 'depth': 0.1,
+            'radius': 0.5, 'num': 3, 'element_size': 0.125, 'pressure': 1000
+        }
+
+    def test_equivalent_parameters_hash_equal(self):
+        variant = dict(self.parameters, e=210000000000.0, num=3.0, length=5.0, id=42,
+                       nu=0.30000000000000004, model_type='3d_solid')
+        self.assertEqual(hash_parameters(self.parameters), hash_parameters(variant))
+        self.assertNotEqual(hash_parameters(self.parameters), hash_parameters(dict(self.parameters, nu=0.31)))
+
+    def test_invalid_length_hashed_without_element_size(self):
+        parameters = {key: value for key, value in self.parameters.items() if key != 'element_size'}
+        self.assertTrue(hash_parameters(dict(parameters, length='long')).startswith('v'))
+
+    def test_defaults_applied_and_version_prefixed(self):
+        explicit = dict(self.parameters, element_size=5 / 40)
+        implicit = {key: value for key, value in self.parameters.items() if key != 'element_size'}
+        self.assertEqual(hash_parameters(explicit), hash_parameters(implicit))
+        self.assertTrue(hash_parameters(self.parameters).startswith(f'v{PARAMETER_HASH_VERSION}:'))
+
+    def test_model_and_cache_service_share_hash(self):
+        simulation = Simulation.objects.create(parameters=dict(self.parameters, id=7))
+        self.assertEqual(simulation.parameters_hash, SimulationCacheService.get_params_hash(self.parameters))
+
+    def test_rehash_updates_outdated_rows(self):
+        simulation = Simulation.objects.create(parameters=self.parameters)
+        Simulation.objects.filter(id=simulation.id).update(parameters_hash='legacy', scaling_key=None)
+
+        self.assertEqual(rehash_simulations(Simulation.objects.all()), 1)
+        simulation.refresh_from_db()
+        self.assertEqual(simulation.parameters_hash, hash_parameters(self.parameters))
+        self.assertEqual(simulation.scaling_key, SimulationCacheService.get_scaling_key(self.parameters))
+
+
+
+class RedisClientTests(TestCase):
+    def tearDown(self):
+        reset_redis_client()
+
+    def test_client_shared_and_pooled(self):
+        client = get_redis_client()
+
+        self.assertIs(client, get_redis_client())
+        pool = client.connection_pool
+        self.assertEqual(pool.max_connections, REDIS_MAX_CONNECTIONS)
+        self.assertEqual(pool.connection_kwargs['health_check_interval'], REDIS_HEALTH_CHECK_INTERVAL)
+
+    @patch('myapp.utils.redis_client.get_redis_client')
+    def test_set_many_uses_one_pipeline(self, mock_client):
+        set_many({'a': 1, 'b': 2}, ex=10)
+
+        pipe = mock_client.return_value.pipeline.return_value
+        self.assertEqual(pipe.set.call_count, 2)
+        pipe.execute.assert_called_once()
+
+    @patch('myapp.api.views.SimulationService.queue_simulation', return_value='task-7')
+    @patch('myapp.api.views.get_redis_client')
+    def test_create_returns_task_id_without_redis_roundtrip(self, mock_client, mock_queue):
+        client = APIClient()
+        client.force_authenticate(user=User.objects.create_user(username='redisuser', password='pass'))
+        parameters = {
+            'e': 2.1e11, 'nu': 0.3, 'length': 5.5, 'width': 2.5, 'depth': 0.1,
+            'radius': 0.5, 'num': 3, 'element_size': 0.125, 'pressure': 1000
+        }
+
+        with patch('myapp.services.simulation_cache_service.get_redis_client') as mock_cache_client:
+            mock_cache_client.return_value.get.return_value = None
+            mock_cache_client.return_value.register_script.return_value = lambda keys, args: args[0]
+            response = client.post('/myapp/simulations/', {'title': 'Pooled', 'parameters': parameters},
+                                   format='json')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['task_id'], 'task-7')
+        mock_client.assert_not_called()
+
+
+
+class StatusCacheTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='statususer', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.simulation = Simulation.objects.create(
+            title='Cached', user=self.user, parameters={'length': 5}, status='COMPLETED', queue='interactive')
+        SimulationResult.objects.create(
+            simulation=self.simulation, mesh_image='simulation_results/1/mesh.png', summary={'max_stress': 3.0})
+
+        self.redis_client = MagicMock()
+        self.store = {}
+        self.redis_client.get.side_effect = self.store.get
+        self.redis_client.mget.side_effect = lambda keys: [self.store.get(key) for key in keys]
+        self.redis_client.set.side_effect = lambda key, value, ex=None: self.store.__setitem__(key, value)
+        self.redis_patches = [
+            patch('myapp.services.status_cache_service.get_redis_client', return_value=self.redis_client),
+            patch('myapp.utils.redis_client.get_redis_client', return_value=self.redis_client),
+        ]
+        for redis_patch in self.redis_patches:
+            redis_patch.start()
+
+    def tearDown(self):
+        for redis_patch in self.redis_patches:
+            redis_patch.stop()
+
+    def test_miss_reads_database_and_populates_cache(self):
+        response = self.client.get(f'/myapp/simulations/{self.simulation.id}/status/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['result_summary'], {'max_stress': 3.0})
+        self.assertTrue(response.data['has_mesh_image'])
+        self.assertFalse(response.data['has_stress_image'])
+        self.assertTrue(response.data['mesh_image_url'].startswith('http://testserver/'))
+        self.assertIn(f'simulation_status:{self.simulation.id}', self.store)
+
+    def test_hit_served_with_owner_lookup_only(self):
+        StatusCacheService.publish(Simulation.objects.select_related('result').get(id=self.simulation.id))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/myapp/simulations/{self.simulation.id}/status/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'COMPLETED')
+        self.assertEqual(response.data['queue'], 'interactive')
+        self.assertNotIn('user_id', response.data)
+
+    def test_running_status_includes_solver_progress(self):
+        self.simulation.status = 'RUNNING'
+        StatusCacheService.publish(self.simulation)
+        self.store[f'simulation_progress:{self.simulation.id}'] = json.dumps({'phase': 'solve', 'equations': 10})
+
+        response = self.client.get(f'/myapp/simulations/{self.simulation.id}/status/')
+
+        self.assertEqual(response.data['progress'], {'phase': 'solve', 'equations': 10})
+
+    def test_cached_status_of_other_user_not_found(self):
+        StatusCacheService.publish(self.simulation)
+        other = APIClient()
+        other.force_authenticate(user=User.objects.create_user(username='other', password='pass'))
+
+        response = other.get(f'/myapp/simulations/{self.simulation.id}/status/')
+
+        self.assertEqual(response.status_code, 404)
+
+    @patch('myapp.api.views.StatusCacheService.get')
+    def test_anonymous_denied_before_cache_read(self, mock_get):
+        StatusCacheService.publish(self.simulation)
+
+        response = APIClient().get(f'/myapp/simulations/{self.simulation.id}/status/')
+
+        self.assertEqual(response.status_code, 403)
+        mock_get.assert_not_called()
+
+
+
+class SimulationEventStreamTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='streamuser', password='pass')
+        self.token = str(AccessToken.for_user(self.user))
+        self.simulation = Simulation.objects.create(
+            title='Streamed', user=self.user, parameters={'length': 5}, status='RUNNING')
+
+        self.redis = MagicMock()
+        self.redis.get = AsyncMock(return_value=json.dumps(
+            {'id': self.simulation.id, 'user_id': self.user.id, 'status': 'RUNNING'}))
+        self.pubsub = MagicMock()
+        self.pubsub.subscribe = AsyncMock()
+        self.pubsub.unsubscribe = AsyncMock()
+        self.pubsub.aclose = AsyncMock()
+        self.pubsub.get_message = AsyncMock(side_effect=[
+            {'data': SimulationEventService.encode('progress', {'phase': 'solve'})},
+            None,
+            {'data': SimulationEventService.encode('status', {'status': 'COMPLETED', 'result_summary': {}})},
+        ])
+        self.redis.pubsub.return_value = self.pubsub
+        self.redis_patch = patch('myapp.api.events.get_async_redis_client', return_value=self.redis)
+        self.redis_patch.start()
+
+    def tearDown(self):
+        self.redis_patch.stop()
+
+    async def read_stream(self, response):
+        return ''.join([chunk.decode() async for chunk in response.streaming_content])
+
+    async def test_stream_pushes_events_until_terminal_status(self):
+        response = await AsyncClient().get(
+            f'/myapp/simulations/{self.simulation.id}/events/', {'token': self.token})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = await self.read_stream(response)
+
+        events = [block.split('\n')[0] for block in body.strip().split('\n\n')]
+        self.assertEqual(events, ['event: status', 'event: progress', ': keepalive', 'event: status'])
+        self.assertNotIn('user_id', body)
+        self.pubsub.subscribe.assert_awaited_once_with(f'simulation_events:{self.simulation.id}')
+        self.pubsub.aclose.assert_awaited_once()
+
+    async def test_stream_waits_for_pending_images(self):
+        self.pubsub.get_message.side_effect = [
+            {'data': SimulationEventService.encode(
+                'status', {'status': 'COMPLETED', 'result_summary': {'images_pending': True}})},
+            {'data': SimulationEventService.encode(
+                'status', {'status': 'COMPLETED', 'result_summary': {'images_pending': False}})},
+        ]
+        response = await AsyncClient().get(
+            f'/myapp/simulations/{self.simulation.id}/events/', {'token': self.token})
+        body = await self.read_stream(response)
+
+        self.assertEqual(body.count('event: status'), 3)
+        self.assertEqual(self.pubsub.get_message.await_count, 2)
+
+    async def test_stream_requires_owner(self):
+        response = await AsyncClient().get(f'/myapp/simulations/{self.simulation.id}/events/')
+        self.assertEqual(response.status_code, 403)
+
+        response = await AsyncClient().get(
+            f'/myapp/simulations/{self.simulation.id}/events/', {'token': 'invalid'})
+        self.assertEqual(response.status_code, 401)
+
+
+
+SOLVER_OUTPUT_SAMPLE = """
+ *****  MAPDL SOLVE    COMMAND  *****
+                      S O L U T I O N   O P T I O N S
+   number of equations                     =          26895
+   Memory allocated for solver              =    123.456 MB
+   Memory required for in-core solution     =     98.100 MB
+    FORCE CONVERGENCE VALUE   =  0.1234E-01  CRITERION=  0.5678E-02
+    EQUIL ITER   2 COMPLETED.  NEW TRIANG MATRIX.  MAX DOF INC=  0.1234E-04
+ *** LOAD STEP     1   SUBSTEP     1  COMPLETED.    CUM ITER =      2
+ CP Time      (sec) =          1.234       Time  =  10:11:12
+ Elapsed Time (sec) =          2.000       Date  =  01/01/2024
+"""
+
+
+class SolverProgressTests(TestCase):
+    def test_parser_extracts_progress(self):
+        parser = SolverProgressParser()
+        progress = parser.feed_text(SOLVER_OUTPUT_SAMPLE)
+
+        self.assertEqual(progress['equations'], 26895)
+        self.assertEqual(progress['memory_mb'], 123.456)
+        self.assertEqual(progress['convergence'], {'quantity': 'FORCE', 'value': 0.01234, 'criterion': 0.005678})
+        self.assertEqual(progress['iteration'], 2)
+        self.assertEqual((progress['load_step'], progress['substep'], progress['cumulative_iterations']), (1, 1, 2))
+        self.assertEqual(progress['cpu_seconds'], 1.234)
+        self.assertEqual(progress['elapsed_seconds'], 2.0)
+        self.assertEqual(progress['solver_state'], 'running')
+
+    def test_monitor_reads_appended_lines(self):
+        updates = []
+        path = os.path.join(tempfile.mkdtemp(), 'solve_progress.out')
+        monitor = SolverOutputMonitor(path, updates.append)
+
+        monitor.poll()  # No file yet
+        with open(path, 'w') as f:
+            f.write("   number of equations = 100\n CP Time (sec) = 0.5")
+        monitor.poll()
+        self.assertEqual(updates[-1]['equations'], 100)
+        self.assertNotIn('cpu_seconds', updates[-1])  # Incomplete line is held back
+
+        monitor.stop()
+        self.assertEqual(updates[-1]['cpu_seconds'], 0.5)
+        self.assertEqual(updates[-1]['output_lines'], 2)
+
+    @patch('myapp.services.progress_service.SimulationEventService.publish_many')
+    @patch('myapp.services.progress_service.set_many')
+    def test_reporter_throttles_updates(self, mock_set_many, mock_publish):
+        reporter = SolverProgressReporter([5], interval=60)
+
+        reporter.set_phase('solve')
+        reporter.update({'equations': 10})
+        reporter.update({'equations': 20})
+
+        self.assertEqual(mock_set_many.call_count, 1)  # Only the phase change
+        reporter.publish()
+        stored = json.loads(mock_set_many.call_args.args[0]['simulation_progress:5'])
+        self.assertEqual((stored['phase'], stored['equations']), ('solve', 20))
+
+
+
+class SimulationStateMachineTests(TestCase):
+    def setUp(self):
+        self.simulation = Simulation.objects.create(title='States', parameters={'length': 5})
+        self.publish_patch = patch('myapp.services.simulation_service.StatusCacheService')
+        self.publish_patch.start()
+
+    def tearDown(self):
+        self.publish_patch.stop()
+
+    def test_transition_writes_only_status_fields(self):
+        Simulation.objects.filter(id=self.simulation.id).update(title='Renamed')
+
+        self.assertTrue(self.simulation.transition_to('QUEUED'))
+        self.assertFalse(self.simulation.transition_to('COMPLETED'))
+
+        self.simulation.refresh_from_db()
+        self.assertEqual((self.simulation.status, self.simulation.title), ('QUEUED', 'Renamed'))
+
+    def test_transition_does_not_overwrite_concurrent_cancel(self):
+        stale = Simulation.objects.get(id=self.simulation.id)
+        Simulation.objects.filter(id=self.simulation.id).update(status='FAILED')
+
+        self.assertFalse(stale.transition_to('RUNNING'))
+        self.assertEqual(stale.status, 'FAILED')
+
+    @patch('myapp.services.simulation_service.ResultProcessor')
+    @patch('myapp.services.simulation_service.MAPDLHandler')
+    def test_cancel_during_solve_discards_result(self, mock_handler, mock_processor):
+        statuses = []
+
+        def solve(parameters):
+            statuses.append(Simulation.objects.get(id=self.simulation.id).status)
+            Simulation.objects.filter(id=self.simulation.id).update(status='FAILED')  # Canceled meanwhile
+        mock_handler.return_value.run_simulation.side_effect = solve
+
+        self.assertIsNone(SimulationService.run_simulation(self.simulation.id))
+
+        self.assertEqual(statuses, ['RUNNING'])
+        mock_processor.assert_not_called()
+        self.simulation.refresh_from_db()
+        self.assertEqual(self.simulation.status, 'FAILED')
+        self.assertFalse(SimulationResult.objects.filter(simulation=self.simulation).exists())
+
+    @patch('myapp.services.simulation_service.get_redis_client')
+    @patch('myapp.tasks.simulation_task.run_simulation_task_with_redis.apply_async')
+    def test_queued_before_task_is_sent(self, mock_apply_async, mock_redis):
+        mock_apply_async.side_effect = lambda *args, **kwargs: MagicMock(
+            id=Simulation.objects.get(id=self.simulation.id).status)
+
+        self.assertEqual(SimulationService.queue_simulation(self.simulation.id, 'standard'), 'QUEUED')
+
+    def test_only_finished_simulation_can_be_resumed(self):
+        user = User.objects.create_user(username='stateuser', password='pass')
+        self.simulation.user = user
+        self.simulation.status = 'RUNNING'
+        self.simulation.save()
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        response = client.post(f'/myapp/simulations/{self.simulation.id}/resume/')
+
+        self.assertEqual(response.status_code, 400)
+
+
+
+class StageTimingTests(TestCase):
+    def test_stages_accumulate_only_inside_a_timer(self):
+        with timed('solve'):
+            pass  # No active timer, nothing recorded
+
+        with start_timer() as timer:
+            for _ in range(3):
+                with timed('render'):
+                    pass
+        self.assertEqual(list(timer.stages), ['render'])
+        self.assertIn('total', timer.as_dict())
+
+    def test_summarize_percentiles_per_stage(self):
+        timings = [{'solve': float(seconds), 'render': 1.0} for seconds in range(1, 101)]
+        timings.append({'mapdl_launch': 30.0})
+
+        summary = summarize_timings(timings)
+
+        self.assertEqual(summary['solve']['count'], 100)
+        self.assertAlmostEqual(summary['solve']['p50'], 50.5)
+        self.assertAlmostEqual(summary['solve']['p99'], 99.01)
+        self.assertEqual(summary['solve']['max'], 100.0)
+        self.assertEqual(summary['mapdl_launch']['count'], 1)
+
+    @patch('myapp.services.simulation_service.SimulationService.queue_render')
+    @patch('myapp.services.simulation_service.StatusCacheService')
+    @patch('myapp.services.simulation_service.ResultProcessor')
+    @patch('myapp.services.simulation_service.MAPDLHandler')
+    def test_timings_stored_with_result(self, mock_handler, mock_processor, mock_status, mock_render):
+        def solve(parameters):
+            with timed('solve'):
+                pass
+        mock_handler.return_value.run_simulation.side_effect = solve
+        mock_processor.return_value.process_result.return_value = {
+            'result_file': 'simulation_results/1/result.txt', 'field_data': 'simulation_results/1/fields.npz',
+            'mesh_image': None, 'stress_image': None, 'deformation_image': None, 'summary': {'max_stress': 1.0},
+        }
+        user = User.objects.create_user(username='timinguser', password='pass')
+        simulation = Simulation.objects.create(
+            title='Timed', user=user, parameters={'length': 5}, status='QUEUED',
+            queued_at=timezone.now() - timedelta(seconds=5))
+
+        result = SimulationService.run_simulation(simulation.id)
+
+        self.assertGreaterEqual(result.timings['queue_wait'], 5)
+        self.assertTrue({'solve', 'db_save', 'total'} <= set(result.timings))
+
+        client = APIClient()
+        client.force_authenticate(user=user)
+        response = client.get('/myapp/statistics/')
+        self.assertEqual(response.data['stage_timings_seconds']['solve']['count'], 1)
+
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        MetricsService._disk_usage = None
+        self.redis_patch = patch('myapp.services.metrics_service.get_redis_client')
+        self.redis_client = self.redis_patch.start().return_value
+        self.pipe = self.redis_client.pipeline.return_value
+
+    def tearDown(self):
+        self.redis_patch.stop()
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_observe_fills_cumulative_buckets(self):
+        MetricsService.observe('simulation_run_seconds', 20, buckets=(5, 30, 60))
+
+        fields = [call.args[1] for call in self.pipe.hincrby.call_args_list]
+        self.assertEqual(fields, ['simulation_run_seconds:30', 'simulation_run_seconds:60',
+                                  'simulation_run_seconds:+Inf'])
+        self.pipe.hincrbyfloat.assert_called_once_with('metrics:histograms', 'simulation_run_seconds:sum', 20)
+
+    def test_metrics_endpoint_renders_prometheus_text(self):
+        queue_lengths = [0] * (len(CELERY_QUEUES) * 4)
+        queue_lengths[CELERY_QUEUES.index('heavy') * 4] = 7
+        self.pipe.execute.return_value = queue_lengths + [
+            {b'simulation_cache_hits_total': b'3'},
+            {b'simulation_run_seconds:+Inf': b'2', b'simulation_run_seconds:sum': b'41.5'},
+            {b'worker-1:42': json.dumps({'size': 2, 'idle': 1, 'busy': 1, 'launched': 2, 'recycled': 0,
+                                         'updated_at': time.time()}),
+             b'dead-worker:7': json.dumps({'size': 1, 'idle': 1, 'updated_at': time.time() - 3600})},
+            [b'5', None],
+        ]
+        Simulation.objects.create(title='Queued', parameters={'length': 5}, status='QUEUED')
+        os.makedirs(os.path.join(self.media_root, 'simulation_results', '1'))
+        with open(os.path.join(self.media_root, 'simulation_results', '1', 'result.txt'), 'w') as f:
+            f.write('x' * 10)
+
+        response = self.client.get('/myapp/metrics/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        for line in [
+            'celery_queue_length{queue="heavy"} 7',
+            'simulation_jobs{status="QUEUED"} 1',
+            'simulation_cache_hits_total 3.0',
+            'mesh_cache_hits_total 5',
+            'simulation_run_seconds_count 2',
+            'simulation_run_seconds_sum 41.5',
+            'mapdl_pool_sessions{worker="worker-1:42",state="busy"} 1',
+            'simulation_results_disk_bytes 10',
+            'metrics_collector_up{collector="redis"} 1',
+        ]:
+            self.assertIn(line, body.splitlines())
+        self.assertNotIn('dead-worker:7', body)
+        self.redis_client.hdel.assert_called_once_with(
+            'metrics:mapdl_pool', 'dead-worker:7')
+
+    def test_unavailable_redis_reported_not_raised(self):
+        self.pipe.execute.side_effect = ConnectionError('down')
+
+        response = self.client.get('/myapp/metrics/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('metrics_collector_up{collector="redis"} 0', response.content.decode())
+        self.assertIn('metrics_collector_up{collector="database"} 1', response.content.decode())
+
+
+
+class BenchmarkTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.redis_patches = [
+            patch(f'myapp.services.{module}.get_redis_client')
+            for module in ('status_cache_service', 'metrics_service', 'event_service',
+                           'simulation_cache_service', 'mesh_cache_service')
+        ]
+        for redis_patch in self.redis_patches:
+            redis_patch.start().return_value.get.return_value = None
+
+    def tearDown(self):
+        for redis_patch in self.redis_patches:
+            redis_patch.stop()
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_fake_mapdl_mesh_follows_element_size(self):
+        counts = []
+        for element_size in (0.5, 0.25):
+            mapdl = FakeMapdl(run_location=self.media_root)
+            mapdl.et(1, 'PLANE183')
+            mapdl.rectng(0, 5, 0, 2.5)
+            mapdl.cyl4(2.5, 1.25, 0.5)
+            mapdl.esize(element_size)
+            mapdl.amesh('ALL')
+            mapdl.sf('ALL', 'PRES', 1000)
+            mapdl.solve()
+            nnum, stress = mapdl.result.principal_nodal_stress(0)
+            self.assertEqual(stress.shape, (len(nnum), 5))
+            counts.append(len(mapdl.result.mesh.enum))
+        self.assertGreater(counts[1], counts[0])
+
+    def test_run_benchmark_reports_stages_and_cleans_up(self):
+        pool = MAPDLHandler()._pool
+
+        report = run_benchmark(element_sizes=[0.5], repeat=2, model_type='plane_stress')
+
+        self.assertEqual(report['jobs'], 2)
+        self.assertGreater(report['throughput_jobs_per_minute'], 0)
+        self.assertTrue({'solve', 'render_stress', 'db_save', 'total'} <= set(report['stage_timings_seconds']))
+        self.assertGreater(report['runs'][0]['nodes'], 0)
+        self.assertGreater(report['peak_rss_mb'], 0)
+        self.assertIs(MAPDLHandler()._pool, pool)
+        self.assertFalse(Simulation.objects.filter(title='Benchmark').exists())
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'simulation_results')), [])
+
+    def test_run_benchmark_leaves_deployment_untouched(self):
+        with patch('myapp.services.metrics_service.get_redis_client') as metrics_redis, \
+                patch('myapp.services.status_cache_service.get_redis_client') as status_redis, \
+                patch('myapp.services.event_service.get_redis_client') as event_redis:
+            run_benchmark(element_sizes=[0.5], repeat=1, model_type='plane_stress')
+
+        metrics_redis.assert_not_called()
+        status_redis.assert_not_called()
+        event_redis.assert_not_called()
+        # The services write again after the benchmark
+        self.assertEqual(MetricsService.observe.__name__, 'observe')
+
+
+
+class RenderStageTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.leader = Simulation.objects.create(title='Leader', parameters={'length': 5}, status='COMPLETED')
+        self.follower = Simulation.objects.create(title='Follower', parameters={'length': 5}, status='COMPLETED')
+        for simulation in (self.leader, self.follower):
+            SimulationResult.objects.create(
+                simulation=simulation, result_file=f'simulation_results/{self.leader.id}/result.txt',
+                summary={'max_stress': 1.0, 'images_pending': True}, timings={'solve': 2.0})
+        make_fields().save(get_fields_path(self.leader.id))
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    @patch('myapp.services.simulation_service.MetricsService')
+    @patch('myapp.services.simulation_service.StatusCacheService')
+    @patch('myapp.services.simulation_service.ImageCapture.save_field_images')
+    def test_images_set_on_every_result_sharing_the_files(self, mock_images, mock_status, mock_metrics):
+        simulation_dir = os.path.join(self.media_root, 'simulation_results', str(self.leader.id))
+        mock_images.return_value = {
+            'mesh_image': os.path.join(simulation_dir, 'mesh.png'),
+            'stress_image': os.path.join(simulation_dir, 'stress.png'),
+        }
+
+        SimulationService.render_images([self.leader.id])
+
+        for simulation in (self.leader, self.follower):
+            result = SimulationResult.objects.get(simulation=simulation)
+            self.assertEqual(result.stress_image.name, f'simulation_results/{self.leader.id}/stress.png')
+            self.assertFalse(result.deformation_image)
+            self.assertFalse(result.summary['images_pending'])
+            self.assertFalse(result.summary['has_deformation_image'])
+        leader_timings = SimulationResult.objects.get(simulation=self.leader).timings
+        self.assertEqual(leader_timings['solve'], 2.0)
+        self.assertIn('render_total', leader_timings)
+        self.assertNotIn('render_total', SimulationResult.objects.get(simulation=self.follower).timings)
+        mock_status.publish_many.assert_called_once_with([self.leader.id, self.follower.id])
+
+    @patch('myapp.tasks.simulation_task.render_images_task.apply_async')
+    def test_render_queued_on_render_queue(self, mock_apply):
+        mock_apply.return_value.id = 'render-1'
+
+        task_id = SimulationService.queue_render([self.leader.id], mesh_image='simulation_results/1/mesh.png')
+
+        self.assertEqual(task_id, 'render-1')
+        mock_apply.assert_called_once_with(
+            args=[[self.leader.id], 'simulation_results/1/mesh.png'], **QueueRouter.get_render_task_options())
+        self.assertEqual(mock_apply.call_args.kwargs['queue'], 'render')
+
+
+
+class FieldRendererTests(TestCase):
+    def setUp(self):
+        points, cells, celltypes = build_beam_mesh(5, 2.5, 0.1, 0.25, holes=[(2.5, 1.25, 0.5)])
+        count = len(points)
+        self.fields = SimulationFields(
+            node_ids=np.arange(1, count + 1), points=points, cells=cells, celltypes=celltypes,
+            displacement=np.column_stack([points[:, 0] * 1e-6, np.zeros(count), np.zeros(count)]),
+            principal_stress=np.tile(points[:, :1], 5), element_count=len(celltypes),
+        )
+
+    def test_face_polygons_keep_holes_open(self):
+        polygons = face_polygons(self.fields.points, self.fields.cells)
+
+        self.assertEqual([nodes.shape[1] for nodes in polygons], [4])
+        self.assertEqual(len(polygons[0]), self.fields.element_count)
+        # Only nodes of the z = depth face are used
+        self.assertTrue(np.allclose(self.fields.points[polygons[0], 2], 0.1))
+
+    def test_matplotlib_images_with_same_file_names(self):
+        self.fields.principal_stress[0] = np.nan
+        with tempfile.TemporaryDirectory() as tmp:
+            images = ImageCapture.save_field_images(self.fields, tmp, renderer='matplotlib')
+            self.assertEqual(
+                {name: os.path.basename(path) for name, path in images.items()},
+                {'mesh_image': 'mesh.png', 'stress_image': 'stress.png', 'deformation_image': 'deform.png'})
+            with open(images['stress_image'], 'rb') as f:
+                self.assertEqual(f.read(8), b'\x89PNG\r\n\x1a\n')
+
+        with self.assertRaises(ValueError):
+            ImageCapture.get_field_renderer(self.fields, 'povray')
+
+
+
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.image_path = os.path.join(self.media_root, 'stress.png')
+        Image.new('RGBA', (1920, 1080), 'white').save(self.image_path)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_resolution_ladder_in_webp_and_png(self):
+        variants = save_image_variants(self.image_path, widths={'thumbnail': 320, 'medium': 960, 'huge': 4000})
+
+        self.assertEqual(list(variants), ['thumbnail', 'medium', 'full'])
+        self.assertEqual(variants['full']['png'], self.image_path)
+        with Image.open(variants['thumbnail']['webp']) as thumbnail:
+            self.assertEqual((thumbnail.format, thumbnail.size), ('WEBP', (320, 180)))
+        with Image.open(variants['medium']['png']) as medium:
+            self.assertEqual((medium.format, medium.size), ('PNG', (960, 540)))
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, 'stress.webp')))
+
+    def test_srcset_exposed_by_serializer_and_status(self):
+        user = User.objects.create_user(username='srcsetuser', password='pass')
+        simulation = Simulation.objects.create(title='Srcset', user=user, parameters={}, status='COMPLETED')
+        SimulationResult.objects.create(simulation=simulation, stress_image='stress.png', summary={}, image_variants={
+            'stress_image': {
+                'full': {'width': 1920, 'webp': 'stress.webp', 'png': 'stress.png'},
+                'thumbnail': {'width': 320, 'webp': 'stress_thumbnail.webp', 'png': 'stress_thumbnail.png'},
+            },
+        })
+        simulation = Simulation.objects.select_related('result').get(id=simulation.id)
+
+        srcset = SimulationSerializer(simulation).data['image_srcset']
+        self.assertEqual(srcset['stress_image']['webp'],
+                         f'{settings.MEDIA_URL}stress_thumbnail.webp 320w, {settings.MEDIA_URL}stress.webp 1920w')
+
+        client = APIClient()
+        client.force_authenticate(user=user)
+        with patch('myapp.services.status_cache_service.get_redis_client', return_value=MagicMock(get=lambda key: None)):
+            response = client.get(f'/myapp/simulations/{simulation.id}/status/')
+        self.assertNotIn('image_variants', response.data)
+        self.assertTrue(response.data['image_srcset']['stress_image']['png'].startswith(
+            f'http://testserver{settings.MEDIA_URL}stress_thumbnail.png 320w, '))
+
+
+
+class FieldDownloadTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = User.objects.create_user(username='fielduser', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.simulation = Simulation.objects.create(
+            title='Fields', user=self.user, parameters={'length': 5}, status='COMPLETED')
+        make_fields().save(get_fields_path(self.simulation.id))
+        SimulationResult.objects.create(
+            simulation=self.simulation, field_data=f'simulation_results/{self.simulation.id}/fields.npz', summary={})
+        self.url = f'/myapp/simulations/{self.simulation.id}/download/'
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_npz_filtered_by_fields_with_conditional_get(self):
+        response = self.client.get(self.url + 'npz/', {'fields': 'seqv,ux'})
+
+        self.assertEqual(response.status_code, 200)
+        with np.load(io.BytesIO(b''.join(response.streaming_content))) as data:
+            self.assertEqual(sorted(data.files), ['node_id', 'seqv', 'ux'])
+            np.testing.assert_allclose(data['seqv'], make_fields().von_mises, rtol=1e-6)
+
+        cached = self.client.get(self.url + 'npz/', {'fields': 'seqv,ux'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(self.client.get(self.url + 'npz/', {'fields': 'sxy'}).status_code, 400)
+
+    def test_byte_ranges(self):
+        full = b''.join(self.client.get(self.url + 'npz/').streaming_content)
+
+        response = self.client.get(self.url + 'npz/', HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(full)}')
+        self.assertEqual(b''.join(response.streaming_content), full[10:20])
+
+        suffix = self.client.get(self.url + 'npz/', HTTP_RANGE='bytes=-5')
+        self.assertEqual(b''.join(suffix.streaming_content), full[-5:])
+        past_end = self.client.get(self.url + 'npz/', HTTP_RANGE=f'bytes={len(full)}-')
+        self.assertEqual(past_end.status_code, 416)
+        stale = self.client.get(self.url + 'npz/', HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='"outdated"')
+        self.assertEqual(stale.status_code, 200)
+
+    def test_gzip_and_vtu(self):
+        plain = b''.join(self.client.get(self.url + 'vtu/', {'fields': 'seqv'}).streaming_content)
+        response = self.client.get(self.url + 'vtu/', {'fields': 'seqv'}, HTTP_ACCEPT_ENCODING='gzip, br')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), plain)
+        self.assertIn(b'UnstructuredGrid', plain)
+        self.assertIn(b'Name="seqv"', plain)
+
+    def test_arrow_columns(self):
+        response = self.client.get(self.url + 'arrow/', {'fields': 'displacement,seqv'})
+
+        self.assertEqual(response['Content-Type'], 'application/vnd.apache.arrow.file')
+        table = pa.ipc.open_file(pa.BufferReader(b''.join(response.streaming_content))).read_all()
+        self.assertEqual(table.column_names, ['node_id', 'ux', 'uy', 'uz', 'seqv'])
+        np.testing.assert_array_equal(table['node_id'].to_numpy(), make_fields().node_ids)
+        np.testing.assert_allclose(table['ux'].to_numpy(), make_fields().displacement[:, 0], rtol=1e-6)
+
+    def test_rewritten_fields_are_exported_again(self):
+        first = self.client.get(self.url + 'npz/', {'fields': 'seqv'})
+        b''.join(first.streaming_content)
+
+        # A resume writes new fields for the same simulation
+        make_fields(stress_scale=2.0).save(get_fields_path(self.simulation.id))
+        second = self.client.get(self.url + 'npz/', {'fields': 'seqv'}, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(second.status_code, 200)
+        with np.load(io.BytesIO(b''.join(second.streaming_content))) as data:
+            np.testing.assert_allclose(data['seqv'], make_fields(stress_scale=2.0).von_mises, rtol=1e-6)
+
+
+
+class SweepCancelTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='sweepcancel', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.cases = [
+            Simulation.objects.create(title=f'Case {i}', user=self.user, parameters={'pressure': i + 1},
+                                      status='QUEUED')
+            for i in range(2)
+        ]
+        self.store = {f'simulation_task_id:{case.id}': b'sweep-1' for case in self.cases}
+        self.store['simulation_sweep:sweep-1'] = json.dumps([case.id for case in self.cases])
+        self.patches = [
+            patch('myapp.api.views.get_redis_client', return_value=MagicMock(get=self.store.get)),
+            patch('myapp.services.simulation_service.get_redis_client', return_value=MagicMock(get=self.store.get)),
+            patch('myapp.api.views.SimulationCacheService.leave_inflight', return_value=False),
+            patch('myapp.api.views.SimulationCacheService.release_inflight', return_value=[]),
+            patch('myapp.api.views.StatusCacheService'),
+        ]
+        for active_patch in self.patches:
+            active_patch.start()
+
+    def tearDown(self):
+        for active_patch in self.patches:
+            active_patch.stop()
+
+    @patch('celery.current_app.control.revoke')
+    def test_canceling_one_case_keeps_the_sweep_running(self, mock_revoke):
+        response = self.client.post(f'/myapp/simulations/{self.cases[0].id}/cancel/')
+
+        self.assertEqual(response.status_code, 200)
+        mock_revoke.assert_not_called()
+        self.cases[0].refresh_from_db()
+        self.cases[1].refresh_from_db()
+        self.assertEqual((self.cases[0].status, self.cases[1].status), ('FAILED', 'QUEUED'))
+
+        # The last active case takes the task down with it
+        self.client.post(f'/myapp/simulations/{self.cases[1].id}/cancel/')
+        mock_revoke.assert_called_once_with('sweep-1', terminate=True, signal='SIGKILL')
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,223 @@
+import os
+import json
+import math
+import numpy as np
+
+# VTK cell types of the generated meshes
+VTK_QUAD = 9
+VTK_HEXAHEDRON = 12
+
+# Element types that make the stand-in mesh two-dimensional
+PLANE_ELEMENT_TYPES = ('PLANE182', 'PLANE183')
+
+
+def build_beam_mesh(length, height, depth, element_size, holes, plane=False):
+    """
+    Structured mesh of a beam block with cylindrical holes removed
+
+    Returns ``(points, cells, celltypes)`` in VTK layout. Cells whose center
+    lies inside a hole ``(x, y, radius)`` are dropped, unused points removed.
+    """
+    nx = max(1, math.ceil(length / element_size))
+    ny = max(1, math.ceil(height / element_size))
+    nz = 0 if plane else max(1, math.ceil(depth / element_size))
+
+    xs = np.linspace(0, length, nx + 1)
+    ys = np.linspace(0, height, ny + 1)
+    zs = np.linspace(0, depth, nz + 1) if nz else np.zeros(1)
+    z, y, x = np.meshgrid(zs, ys, xs, indexing='ij')
+    points = np.column_stack([x.ravel(), y.ravel(), z.ravel()])
+
+    def node(i, j, k):
+        return i + (nx + 1) * (j + (ny + 1) * k)
+
+    k, j, i = np.meshgrid(np.arange(max(nz, 1)), np.arange(ny), np.arange(nx), indexing='ij')
+    i, j, k = i.ravel(), j.ravel(), k.ravel()
+    corners = [node(i, j, k), node(i + 1, j, k), node(i + 1, j + 1, k), node(i, j + 1, k)]
+    if not plane:
+        corners += [node(i, j, k + 1), node(i + 1, j, k + 1), node(i + 1, j + 1, k + 1), node(i, j + 1, k + 1)]
+    connectivity = np.column_stack(corners)
+
+    centers_x = (xs[i] + xs[i + 1]) / 2
+    centers_y = (ys[j] + ys[j + 1]) / 2
+    keep = np.ones(len(connectivity), dtype=bool)
+    for hole_x, hole_y, radius in holes:
+        keep &= (centers_x - hole_x) ** 2 + (centers_y - hole_y) ** 2 > radius ** 2
+    connectivity = connectivity[keep]
+
+    used, connectivity = np.unique(connectivity, return_inverse=True)
+    connectivity = connectivity.reshape(-1, len(corners))
+    points = points[used]
+
+    cells = np.hstack([np.full((len(connectivity), 1), len(corners)), connectivity]).ravel()
+    celltypes = np.full(len(connectivity), VTK_QUAD if plane else VTK_HEXAHEDRON, dtype=np.uint8)
+    return points, cells, celltypes
+
+
+class FakeMesh:
+    def __init__(self, nnum, enum):
+        self.nnum = nnum
+        self.enum = enum
+
+
+class FakeResult:
+    """
+    Result of a stand-in solve with the interface the result pipeline reads
+
+    Fields are closed-form: the axial pressure load gives a uniform stress
+    raised around the holes (Kirsch concentration) and a linear axial
+    displacement, scaled per load step.
+    """
+
+    def __init__(self, points, cells, celltypes, holes, young, poisson, pressures, plane=False):
+        import pyvista as pv
+
+        self.nnum = np.arange(1, len(points) + 1)
+        self.mesh = FakeMesh(self.nnum, np.arange(1, len(celltypes) + 1))
+        self.grid = pv.UnstructuredGrid(cells, celltypes, points)
+        self.grid.point_data['ansys_node_num'] = self.nnum
+        self.points = points
+        self.young = young
+        self.poisson = poisson
+        self.pressures = pressures
+        self.plane = plane
+
+        concentration = np.ones(len(points))
+        for hole_x, hole_y, radius in holes:
+            distance_sq = np.maximum((points[:, 0] - hole_x) ** 2 + (points[:, 1] - hole_y) ** 2, radius ** 2)
+            concentration += 2 * radius ** 2 / distance_sq
+        self.concentration = concentration
+
+    def nodal_displacement(self, rnum):
+        strain = -self.pressures[rnum] / self.young
+        displacement = np.column_stack([
+            strain * self.points[:, 0],
+            -self.poisson * strain * self.points[:, 1],
+            -self.poisson * strain * self.points[:, 2],
+        ])
+        return self.nnum, displacement[:, :2] if self.plane else displacement
+
+    def principal_nodal_stress(self, rnum):
+        stress = -self.pressures[rnum] * self.concentration
+        zeros = np.zeros_like(stress)
+        # S1, S2, S3, SINT, SEQV of uniaxial compression
+        return self.nnum, np.column_stack([zeros, zeros, stress, np.abs(stress), np.abs(stress)])
+
+
+class FakeMapdl:
+    """
+    Deterministic stand-in for a MAPDL session, for benchmarks without a license
+
+    Accepts the commands ``MAPDLHandler`` sends. Geometry, element size,
+    material and pressure commands are recorded, ``vmesh``/``amesh`` build a
+    structured mesh of that geometry and ``solve``/``lssolve`` produce
+    closed-form fields, writing solver-style output to the ``/OUTPUT`` file.
+    Every other command is accepted and ignored.
+    """
+
+    def __init__(self, run_location=None, nproc=None, **kwargs):
+        self.directory = run_location or os.getcwd()
+        os.makedirs(self.directory, exist_ok=True)
+        self.exited = False
+        self.is_alive = True
+        self.clear()
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return lambda *args, **kwargs: None
+
+    def clear(self, *args, **kwargs):
+        self._geometry = {'block': None, 'holes': [], 'element_size': None, 'plane': False}
+        self._mesh = None
+        self._materials = {}
+        self._pressure = 0.0
+        self._load_steps = []
+        self._output_path = None
+        self._result = None
+
+    def exit(self):
+        self.exited = True
+        self.is_alive = False
+
+    def et(self, itype, ename, *args, **kwargs):
+        self._geometry['plane'] = str(ename).upper() in PLANE_ELEMENT_TYPES
+
+    def mp(self, lab, mat, c0, *args, **kwargs):
+        self._materials[lab] = float(c0)
+
+    def block(self, x1, x2, y1, y2, z1, z2, *args, **kwargs):
+        self._geometry['block'] = [x2 - x1, y2 - y1, z2 - z1]
+
+    def rectng(self, x1, x2, y1, y2, *args, **kwargs):
+        self._geometry['block'] = [x2 - x1, y2 - y1, 0.0]
+
+    def cyl4(self, xcenter, ycenter, rad1, *args, **kwargs):
+        self._geometry['holes'].append([xcenter, ycenter, rad1])
+
+    def esize(self, size, *args, **kwargs):
+        self._geometry['element_size'] = float(size)
+
+    def vmesh(self, *args, **kwargs):
+        self._build_mesh()
+
+    def amesh(self, *args, **kwargs):
+        self._build_mesh()
+
+    def _build_mesh(self):
+        length, height, depth = self._geometry['block']
+        self._mesh = build_beam_mesh(length, height, depth, self._geometry['element_size'],
+                                     self._geometry['holes'], plane=self._geometry['plane'])
+
+    def save(self, fname, ext, *args, **kwargs):
+        with open(os.path.join(self.directory, f"{fname}.{ext}"), 'w') as f:
+            json.dump(self._geometry, f)
+
+    def resume(self, fname, ext, *args, **kwargs):
+        with open(os.path.join(self.directory, f"{fname}.{ext}")) as f:
+            self._geometry = json.load(f)
+        self._build_mesh()
+
+    def sf(self, nlist, lab, value, *args, **kwargs):
+        self._pressure = float(value)
+
+    def lswrite(self, step, *args, **kwargs):
+        self._load_steps.append(self._pressure)
+
+    def run(self, command, *args, **kwargs):
+        parts = [part.strip() for part in command.split(',')]
+        if parts[0].upper() == '/OUTPUT':
+            self._output_path = os.path.join(self.directory, f"{parts[1]}.{parts[2] or 'out'}") if len(parts) > 1 else None
+
+    def solve(self, *args, **kwargs):
+        return self._solve([self._pressure])
+
+    def lssolve(self, lsmin, lsmax, *args, **kwargs):
+        return self._solve(self._load_steps[int(lsmin) - 1:int(lsmax)])
+
+    def _solve(self, pressures):
+        points, cells, celltypes = self._mesh
+        dof_per_node = 2 if self._geometry['plane'] else 3
+        lines = [
+            " *****  MAPDL SOLVE    COMMAND  *****",
+            f"   number of equations                     = {len(points) * dof_per_node:14d}",
+            f"   Memory allocated for solver              = {len(points) * 0.01:10.3f} MB",
+        ]
+        for step in range(1, len(pressures) + 1):
+            lines.append(f" *** LOAD STEP {step:5d}   SUBSTEP     1  COMPLETED.    CUM ITER = {step:6d}")
+        lines.append(" CP Time      (sec) =          0.000       Time  =  00:00:00")
+        text = '\n'.join(lines) + '\n'
+        if self._output_path:
+            with open(self._output_path, 'w') as f:
+                f.write(text)
+
+        self._result = FakeResult(
+            points, cells, celltypes, self._geometry['holes'],
+            young=self._materials.get('EX', 2e11), poisson=self._materials.get('NUXY', 0.27),
+            pressures=pressures, plane=self._geometry['plane'],
+        )
+        return '' if self._output_path else text
+
+    @property
+    def result(self):
+        return self._result
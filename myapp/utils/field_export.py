@@ -0,0 +1,138 @@
+import os
+import gzip
+import shutil
+import numpy as np
+from ..constants import FIELD_EXPORT_GROUPS
+
+EXPORTS_DIRNAME = 'exports'
+
+# Every exported column in file order, node_id first
+FIELD_EXPORT_COLUMNS = ('node_id',) + tuple(
+    column for columns in FIELD_EXPORT_GROUPS.values() for column in columns)
+
+
+class ExportUnavailable(Exception):
+    """The export format needs a library that is not installed"""
+
+
+def get_export_dir(fields_path):
+    """Directory of the exports made from a fields file, shared by every result using the file"""
+    return os.path.join(os.path.dirname(fields_path), EXPORTS_DIRNAME)
+
+
+def select_columns(names=None):
+    """
+    Columns of a ``?fields=`` selection, in file order
+
+    ``names`` holds group names of FIELD_EXPORT_GROUPS and/or single column
+    names; None or empty selects everything. Raises ValueError for unknown
+    names.
+    """
+    if not names:
+        return FIELD_EXPORT_COLUMNS
+
+    selected = {'node_id'}
+    for name in names:
+        name = name.strip().lower()
+        if name in FIELD_EXPORT_GROUPS:
+            selected.update(FIELD_EXPORT_GROUPS[name])
+        elif name in FIELD_EXPORT_COLUMNS:
+            selected.add(name)
+        else:
+            raise ValueError(f"Unknown field '{name}', expected one of "
+                             f"{', '.join([*FIELD_EXPORT_GROUPS, *FIELD_EXPORT_COLUMNS])}")
+    return tuple(column for column in FIELD_EXPORT_COLUMNS if column in selected)
+
+
+def get_column(fields, column):
+    """One nodal column of ``fields`` as a 1D array"""
+    if column == 'node_id':
+        return fields.node_ids
+    if column == 'usum':
+        return fields.displacement_norm
+    if column in ('x', 'y', 'z'):
+        return fields.points[:, 'xyz'.index(column)]
+    if column in ('ux', 'uy', 'uz'):
+        return fields.displacement[:, 'xyz'.index(column[1])]
+    return fields.principal_stress[:, ('s1', 's2', 's3', 'sint', 'seqv').index(column)]
+
+
+def write_npz(fields, columns, path):
+    with open(path, 'wb') as f:
+        np.savez(f, **{column: get_column(fields, column) for column in columns})
+
+
+def write_arrow(fields, columns, path):
+    """Arrow IPC file (Feather v2), readable by pyarrow, pandas and polars"""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ExportUnavailable("Arrow downloads need pyarrow, install it on the web server")
+
+    table = pa.table({column: np.ascontiguousarray(get_column(fields, column)) for column in columns})
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def write_vtu(fields, columns, path):
+    """VTK unstructured grid with the selected columns as point data, for ParaView"""
+    try:
+        import pyvista as pv
+    except ImportError:
+        raise ExportUnavailable("VTU downloads need pyvista, install it on the web server")
+
+    grid = pv.UnstructuredGrid(fields.cells, fields.celltypes, fields.points)
+    for column in columns:
+        # The grid carries the coordinates itself
+        if column not in ('x', 'y', 'z'):
+            grid.point_data[column] = np.ascontiguousarray(get_column(fields, column))
+    grid.save(path, binary=True)
+
+
+# file_type: (extension, content type, writer)
+FIELD_EXPORT_FORMATS = {
+    'npz': ('npz', 'application/octet-stream', write_npz),
+    'arrow': ('arrow', 'application/vnd.apache.arrow.file', write_arrow),
+    'vtu': ('vtu', 'application/xml', write_vtu),
+}
+
+
+def get_field_export(fields_path, export_format, columns, load_fields):
+    """
+    Path of the ``export_format`` file of ``columns``, written on first request
+
+    Each format and column selection is converted once and then served
+    from disk. The name carries the modification time and size of the
+    fields file, so fields rewritten by a resume or re-run get new exports
+    instead of stale ones. ``load_fields`` is called only when the file has
+    to be written.
+    """
+    extension, _, writer = FIELD_EXPORT_FORMATS[export_format]
+    selection = 'all' if tuple(columns) == FIELD_EXPORT_COLUMNS else '-'.join(columns)
+    source = os.stat(fields_path)
+    version = f'{source.st_mtime_ns:x}-{source.st_size:x}'
+    path = os.path.join(get_export_dir(fields_path), f'fields_{selection}_{version}.{extension}')
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Writers that pick the format by extension need it on the temporary name too
+    temporary_path = f'{path}.{os.getpid()}.tmp.{extension}'
+    try:
+        writer(load_fields(), columns, temporary_path)
+        os.replace(temporary_path, path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+    return path
+
+
+def get_gzip_copy(path):
+    """Path of a gzip-compressed copy of ``path``, written on first request"""
+    gzip_path = f'{path}.gz'
+    if not os.path.exists(gzip_path):
+        temporary_path = f'{gzip_path}.{os.getpid()}.tmp'
+        with open(path, 'rb') as source, gzip.open(temporary_path, 'wb', compresslevel=6) as target:
+            shutil.copyfileobj(source, target)
+        os.replace(temporary_path, gzip_path)
+    return gzip_path
@@ -0,0 +1,130 @@
+import logging
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
+from matplotlib.tri import Triangulation
+from ..constants import IMAGE_WINDOW_SIZE, IMAGE_CONTOUR_LEVELS
+
+logger = logging.getLogger(__name__)
+
+# Figure resolution; the figure size is IMAGE_WINDOW_SIZE / IMAGE_DPI inches
+IMAGE_DPI = 100
+
+
+def split_cells(cells):
+    """Connectivity of a VTK cell array as ``{nodes per cell: (cells, nodes) array}``"""
+    cells = np.asarray(cells)
+    if len(cells):
+        # Single element type: one reshape instead of walking the array
+        size = int(cells[0]) + 1
+        if len(cells) % size == 0:
+            rows = cells.reshape(-1, size)
+            if np.all(rows[:, 0] == size - 1):
+                return {size - 1: rows[:, 1:]}
+
+    groups = {}
+    position = 0
+    while position < len(cells):
+        count = int(cells[position])
+        groups.setdefault(count, []).append(cells[position + 1:position + 1 + count])
+        position += count + 1
+    return {count: np.array(rows) for count, rows in groups.items()}
+
+
+def face_polygons(points, cells, axis=2):
+    """
+    Element faces lying on the ``points[:, axis] == max`` face of the model
+
+    Returns a list of ``(faces, nodes)`` point index arrays, one per node
+    count, with the nodes of every face ordered around its center. Cells
+    touching the face only with an edge are dropped.
+    """
+    coordinate = points[:, axis]
+    scale = max(float(np.ptp(points)), 1.0) if len(points) else 1.0
+    on_face = np.isclose(coordinate, coordinate.max(), rtol=0, atol=1e-8 * scale)
+    plane_axes = [index for index in range(3) if index != axis]
+
+    polygons = []
+    for connectivity in split_cells(cells).values():
+        face_mask = on_face[connectivity]
+        counts = face_mask.sum(axis=1)
+        for count in np.unique(counts[counts >= 3]):
+            selected = counts == count
+            # Face nodes first, then ordered by angle around the face center
+            order = np.argsort(~face_mask[selected], axis=1, kind='stable')[:, :count]
+            nodes = np.take_along_axis(connectivity[selected], order, axis=1)
+            xy = points[nodes][:, :, plane_axes]
+            offset = xy - xy.mean(axis=1, keepdims=True)
+            angle = np.arctan2(offset[..., 1], offset[..., 0])
+            nodes = np.take_along_axis(nodes, np.argsort(angle, axis=1), axis=1)
+
+            # Shoelace area, zero for the nodes of a single edge
+            xy = points[nodes][:, :, plane_axes]
+            area = 0.5 * np.abs(np.sum(
+                xy[:, :, 0] * np.roll(xy[:, :, 1], -1, axis=1) - np.roll(xy[:, :, 0], -1, axis=1) * xy[:, :, 1],
+                axis=1))
+            nodes = nodes[area > 1e-12 * scale ** 2]
+            if len(nodes):
+                polygons.append(nodes)
+    return polygons
+
+
+class FaceContourRenderer:
+    """
+    Headless 2D rendering of the beam face with Matplotlib
+
+    Draws the z = depth face of a solid model (the model plane of a 2D one):
+    element faces on it are fan-triangulated, so the holes stay open, and
+    nodal fields are drawn as filled contours over those triangles. Needs
+    neither VTK nor OpenGL.
+    """
+
+    def __init__(self, fields, window_size=IMAGE_WINDOW_SIZE, axis=2):
+        self.window_size = window_size
+        self.fields = {'SEQV': fields.von_mises, 'USUM': fields.displacement_norm}
+        self.xy = fields.points[:, [index for index in range(3) if index != axis]]
+        self.polygons = face_polygons(fields.points, fields.cells, axis=axis)
+
+        triangles = [
+            np.column_stack([nodes[:, 0], nodes[:, corner], nodes[:, corner + 1]])
+            for nodes in self.polygons
+            for corner in range(1, nodes.shape[1] - 1)
+        ]
+        self.triangles = np.vstack(triangles) if triangles else np.empty((0, 3), dtype=int)
+
+    def render(self, save_path, scalars=None, title=''):
+        """Save the face colored by field ``scalars`` ('SEQV' or 'USUM'), or the bare mesh"""
+        try:
+            figure = Figure(figsize=(self.window_size[0] / IMAGE_DPI, self.window_size[1] / IMAGE_DPI),
+                            dpi=IMAGE_DPI)
+            FigureCanvasAgg(figure)
+            ax = figure.add_subplot()
+
+            if scalars is None:
+                for nodes in self.polygons:
+                    ax.add_collection(PolyCollection(
+                        self.xy[nodes], facecolors='lightblue', edgecolors='k', linewidths=0.3))
+                ax.autoscale_view()
+            else:
+                values = self.fields[scalars]
+                triangulation = Triangulation(self.xy[:, 0], self.xy[:, 1], self.triangles)
+                # Triangles touching a node without a result are left blank
+                missing = ~np.isfinite(values)
+                triangulation.set_mask(missing[self.triangles].any(axis=1))
+                values = np.where(missing, 0.0, values)
+
+                low, high = float(values[~missing].min()), float(values[~missing].max())
+                levels = np.linspace(low, high, IMAGE_CONTOUR_LEVELS + 1) if high > low else [low - 1, low + 1]
+                contour = ax.tricontourf(triangulation, values, levels=levels, cmap='jet')
+                figure.colorbar(contour, ax=ax, label=title)
+
+            ax.set_aspect('equal')
+            ax.set_title(title)
+            ax.set_xlabel('x (m)')
+            ax.set_ylabel('y (m)')
+            figure.savefig(save_path)
+            return save_path
+        except Exception as e:
+            logger.error(f"Failed to create {title or 'mesh'} image: {e}")
+            return None
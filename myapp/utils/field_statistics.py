@@ -0,0 +1,35 @@
+import numpy as np
+from ..constants import SUMMARY_PERCENTILES, SUMMARY_HISTOGRAM_BINS
+
+
+def summarize_field(values, node_ids, points, percentiles=SUMMARY_PERCENTILES, bins=SUMMARY_HISTOGRAM_BINS):
+    """
+    Statistics of a nodal scalar field, NaN and infinite values excluded
+
+    Returns count, NaN count, min, max, mean, standard deviation,
+    percentiles, a histogram and the node id and coordinates of the maximum
+    (the hotspot). A field without finite values only reports the counts.
+    """
+    values = np.asarray(values, dtype=float)
+    finite = np.isfinite(values)
+    valid = values[finite]
+    stats = {'count': int(valid.size), 'nan_count': int(values.size - valid.size)}
+    if not valid.size:
+        return stats
+
+    peak_index = np.argmax(valid)
+    peak = np.flatnonzero(finite)[peak_index]
+    counts, edges = np.histogram(valid, bins=bins)
+    stats.update({
+        'min': float(valid.min()),
+        'max': float(valid[peak_index]),
+        'mean': float(valid.mean()),
+        'std': float(valid.std()),
+        'percentiles': {
+            f'p{percentile}': float(value)
+            for percentile, value in zip(percentiles, np.percentile(valid, percentiles))
+        },
+        'histogram': {'edges': edges.tolist(), 'counts': counts.tolist()},
+        'peak': {'node_id': int(node_ids[peak]), 'location': [float(x) for x in points[peak]]},
+    })
+    return stats
@@ -0,0 +1,300 @@
+import os
+import shutil
+import struct
+import zipfile
+import numpy as np
+from django.conf import settings
+from ..constants import FIELD_STORE_FLOAT_DTYPE, FIELD_STORE_COMPRESSED
+from .field_export import get_export_dir
+
+FIELDS_FILENAME = 'fields.npz'
+
+# Size of a ZIP local file header before its variable-length name and extra field
+ZIP_LOCAL_HEADER_SIZE = 30
+
+# Node order of the mirror image of each VTK cell type, restoring the orientation
+# a reflection inverts (corners in reverse winding, edge midsides following them)
+MIRROR_NODE_ORDER = {
+    1: [0],  # VTK_VERTEX
+    3: [0, 1],  # VTK_LINE
+    5: [0, 2, 1],  # VTK_TRIANGLE
+    9: [0, 3, 2, 1],  # VTK_QUAD
+    10: [0, 2, 1, 3],  # VTK_TETRA
+    12: [0, 3, 2, 1, 4, 7, 6, 5],  # VTK_HEXAHEDRON
+    13: [0, 2, 1, 3, 5, 4],  # VTK_WEDGE
+    14: [0, 3, 2, 1, 4],  # VTK_PYRAMID
+    21: [0, 1, 2],  # VTK_QUADRATIC_EDGE
+    22: [0, 2, 1, 5, 4, 3],  # VTK_QUADRATIC_TRIANGLE (PLANE183)
+    23: [0, 3, 2, 1, 7, 6, 5, 4],  # VTK_QUADRATIC_QUAD (PLANE183)
+    24: [0, 2, 1, 3, 6, 5, 4, 7, 9, 8],  # VTK_QUADRATIC_TETRA (SOLID186/187)
+    25: [0, 3, 2, 1, 4, 7, 6, 5, 11, 10, 9, 8, 15, 14, 13, 12, 16, 19, 18, 17],  # VTK_QUADRATIC_HEXAHEDRON
+    26: [0, 2, 1, 3, 5, 4, 8, 7, 6, 11, 10, 9, 12, 14, 13],  # VTK_QUADRATIC_WEDGE
+    27: [0, 3, 2, 1, 4, 8, 7, 6, 5, 9, 12, 11, 10],  # VTK_QUADRATIC_PYRAMID
+}
+
+
+def get_fields_path(simulation_id):
+    """Location of the stored nodal fields of a simulation"""
+    return os.path.join(settings.MEDIA_ROOT, 'simulation_results', str(simulation_id), FIELDS_FILENAME)
+
+
+def get_result_fields_path(result):
+    """Fields file of a SimulationResult, shared with the run that produced it"""
+    if result.field_data:
+        return result.field_data.path
+    # Results stored before field_data was recorded
+    return get_fields_path(result.simulation_id)
+
+
+def _smallest_int(values):
+    """``values`` as int32 when they fit, the ids and connectivity of any realistic mesh do"""
+    values = np.asarray(values)
+    if values.size and (values.min() < np.iinfo(np.int32).min or values.max() > np.iinfo(np.int32).max):
+        return values
+    return values.astype(np.int32)
+
+
+def _map_member(path, info):
+    """Read-only memory map of an uncompressed ``.npy`` member of an ``.npz`` archive"""
+    with open(path, 'rb') as f:
+        f.seek(info.header_offset)
+        header = f.read(ZIP_LOCAL_HEADER_SIZE)
+        name_length, extra_length = struct.unpack('<HH', header[26:30])
+        f.seek(info.header_offset + ZIP_LOCAL_HEADER_SIZE + name_length + extra_length)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    return np.asarray(np.memmap(path, dtype=dtype, mode='r', shape=shape,
+                                order='F' if fortran_order else 'C', offset=offset))
+
+
+def _align(node_ids, nnum, values):
+    """Reorder ``values`` (given for nodes ``nnum``) to follow ``node_ids``, NaN where missing"""
+    nnum = np.asarray(nnum)
+    values = np.asarray(values, dtype=float)
+    aligned = np.full((len(node_ids),) + values.shape[1:], np.nan)
+    order = np.argsort(nnum)
+    positions = np.searchsorted(nnum, node_ids, sorter=order)
+    positions = np.clip(positions, 0, len(nnum) - 1)
+    found = nnum[order[positions]] == node_ids
+    aligned[found] = values[order[positions[found]]]
+    return aligned
+
+
+def mirror_cells(cells, celltypes, mapping):
+    """
+    VTK cell array of the mirror images of ``cells``
+
+    Point indices are replaced through ``mapping`` and every cell's nodes
+    reordered per ``MIRROR_NODE_ORDER``. The offsets of the cells follow from
+    their types, so the array is rewritten without walking it cell by cell.
+    """
+    cells = np.asarray(cells)
+    celltypes = np.asarray(celltypes)
+    unknown = set(np.unique(celltypes).tolist()) - set(MIRROR_NODE_ORDER)
+    if unknown:
+        raise ValueError(f"Cannot mirror VTK cell type(s) {sorted(unknown)}")
+
+    node_counts = np.zeros(max(MIRROR_NODE_ORDER) + 1, dtype=np.int64)
+    for celltype, order in MIRROR_NODE_ORDER.items():
+        node_counts[celltype] = len(order)
+    sizes = node_counts[celltypes]
+    starts = np.cumsum(sizes + 1) - (sizes + 1)
+    if sizes.sum() + len(sizes) != len(cells) or not np.array_equal(cells[starts], sizes):
+        raise ValueError("Cell array does not match the cell types")
+
+    mirrored = cells.copy()
+    for celltype in np.unique(celltypes):
+        order = np.asarray(MIRROR_NODE_ORDER[int(celltype)])
+        first = starts[celltypes == celltype][:, None] + 1
+        mirrored[first + np.arange(len(order))] = mapping[cells[first + order]]
+    return mirrored
+
+
+class SimulationFields:
+    """
+    Nodal result fields of a solved simulation
+
+    Holds the mesh (node coordinates and VTK cell connectivity) together with
+    nodal displacement vectors and principal stresses (S1, S2, S3, SINT, SEQV),
+    so results can be summarized and rendered without a MAPDL session.
+    """
+
+    def __init__(self, node_ids, points, cells, celltypes, displacement, principal_stress, element_count):
+        self.node_ids = np.asarray(node_ids)
+        self.points = np.asarray(points)
+        self.cells = np.asarray(cells)
+        self.celltypes = np.asarray(celltypes)
+        self.displacement = np.asarray(displacement)
+        self.principal_stress = np.asarray(principal_stress)
+        self.element_count = int(element_count)
+
+    @classmethod
+    def from_result(cls, result, rnum=0):
+        """Extract fields from a MAPDL result for result set ``rnum``"""
+        grid = result.grid
+        points = np.asarray(grid.points)
+        if 'ansys_node_num' in grid.point_data:
+            node_ids = np.asarray(grid.point_data['ansys_node_num'])
+        else:
+            node_ids = np.asarray(result.mesh.nnum)
+
+        displacement = result.nodal_displacement(rnum)
+        if isinstance(displacement, tuple):
+            disp_nnum, displacement = displacement
+        else:
+            disp_nnum = node_ids
+        displacement = np.asarray(displacement, dtype=float)
+        if displacement.ndim == 2 and displacement.shape[1] < 3:
+            # 2D models report UX, UY only; keep vectors three-dimensional
+            padding = np.zeros((displacement.shape[0], 3 - displacement.shape[1]))
+            displacement = np.hstack([displacement, padding])
+        stress_nnum, stress = result.principal_nodal_stress(rnum)
+
+        return cls(
+            node_ids=node_ids,
+            points=points,
+            cells=np.asarray(grid.cells),
+            celltypes=np.asarray(grid.celltypes),
+            displacement=_align(node_ids, disp_nnum, displacement),
+            principal_stress=_align(node_ids, stress_nnum, stress),
+            element_count=len(result.mesh.enum),
+        )
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Read fields written by ``save``
+
+        With ``mmap`` the arrays of an uncompressed file are read-only memory
+        maps, so only the pages a caller touches are read from disk.
+        Compressed members are always read into memory.
+        """
+        arrays = {}
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                name = info.filename[:-len('.npy')]
+                if mmap and info.compress_type == zipfile.ZIP_STORED and info.file_size:
+                    arrays[name] = _map_member(path, info)
+                else:
+                    with archive.open(info) as member:
+                        arrays[name] = np.lib.format.read_array(member)
+
+        return cls(
+            node_ids=arrays['node_ids'],
+            points=arrays['points'],
+            cells=arrays['cells'],
+            celltypes=arrays['celltypes'],
+            displacement=arrays['displacement'],
+            principal_stress=arrays['principal_stress'],
+            element_count=arrays['element_count'],
+        )
+
+    def save(self, path, dtype=FIELD_STORE_FLOAT_DTYPE, compressed=FIELD_STORE_COMPRESSED):
+        """
+        Write the fields to an ``.npz`` container, once per simulation
+
+        Displacement and stresses are stored as ``dtype``; coordinates stay
+        float64 so geometric tolerances (faces, symmetry planes) still hold.
+        Ids and connectivity are stored as int32. The file is written under
+        a temporary name and moved into place, so readers never see half of it,
+        and the downloads exported from the previous file are removed.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        arrays = {
+            'node_ids': _smallest_int(self.node_ids),
+            'points': self.points,
+            'cells': _smallest_int(self.cells),
+            'celltypes': self.celltypes.astype(np.uint8),
+            'displacement': self.displacement.astype(dtype),
+            'principal_stress': self.principal_stress.astype(dtype),
+            'element_count': np.asarray(self.element_count),
+        }
+        temporary_path = f'{path}.{os.getpid()}.tmp'
+        with open(temporary_path, 'wb') as f:
+            (np.savez_compressed if compressed else np.savez)(f, **arrays)
+        os.replace(temporary_path, path)
+        # Downloads converted from the previous fields are outdated
+        shutil.rmtree(get_export_dir(path), ignore_errors=True)
+        return path
+
+    @property
+    def von_mises(self):
+        return self.principal_stress[:, -1]
+
+    @property
+    def displacement_norm(self):
+        return np.linalg.norm(self.displacement, axis=1)
+
+    def scaled(self, stress_factor, displacement_factor):
+        """
+        Fields of the same linear-elastic model under a scaled load/material
+
+        Stress scales with ``stress_factor`` and displacement with
+        ``displacement_factor``. A negative stress factor swaps the order of
+        the principal stresses; SINT and SEQV are magnitudes.
+        """
+        principal = self.principal_stress[:, :3] * stress_factor
+        if stress_factor < 0:
+            principal = principal[:, ::-1]
+        invariants = self.principal_stress[:, 3:] * abs(stress_factor)
+
+        return SimulationFields(
+            node_ids=self.node_ids,
+            points=self.points,
+            cells=self.cells,
+            celltypes=self.celltypes,
+            displacement=self.displacement * displacement_factor,
+            principal_stress=np.hstack([principal, invariants]),
+            element_count=self.element_count,
+        )
+
+    def mirrored(self, axis, plane):
+        """
+        Full-model fields from a half model solved with a symmetry plane
+
+        Nodes off the plane ``points[:, axis] == plane`` are reflected, the
+        displacement component normal to the plane changes sign and principal
+        stresses (invariant under reflection) are copied. Mirrored nodes get
+        ids offset by the largest original node id, mirrored cells list their
+        nodes in ``MIRROR_NODE_ORDER`` so they keep a positive orientation.
+        """
+        count = len(self.points)
+        scale = max(float(np.ptp(self.points[:, axis])), 1.0) if count else 1.0
+        on_plane = np.isclose(self.points[:, axis], plane, rtol=0, atol=1e-8 * scale)
+        mirror = np.flatnonzero(~on_plane)
+
+        points = self.points[mirror].copy()
+        points[:, axis] = 2 * plane - points[:, axis]
+        displacement = self.displacement[mirror].copy()
+        displacement[:, axis] = -displacement[:, axis]
+
+        # Old point index -> index of its mirror image (nodes on the plane are shared)
+        mapping = np.arange(count)
+        mapping[mirror] = count + np.arange(len(mirror))
+
+        mirrored_cells = mirror_cells(self.cells, self.celltypes, mapping)
+
+        offset = int(self.node_ids.max()) if count else 0
+        return SimulationFields(
+            node_ids=np.concatenate([self.node_ids, self.node_ids[mirror] + offset]),
+            points=np.vstack([self.points, points]),
+            cells=np.concatenate([self.cells, mirrored_cells]),
+            celltypes=np.concatenate([self.celltypes, self.celltypes]),
+            displacement=np.vstack([self.displacement, displacement]),
+            principal_stress=np.vstack([self.principal_stress, self.principal_stress[mirror]]),
+            element_count=self.element_count * 2,
+        )
+
+    def to_grid(self):
+        """Build a PyVista grid carrying the nodal fields as point data"""
+        import pyvista as pv
+
+        grid = pv.UnstructuredGrid(self.cells, self.celltypes, self.points)
+        grid.point_data['ansys_node_num'] = self.node_ids
+        grid.point_data['SEQV'] = self.von_mises
+        grid.point_data['USUM'] = self.displacement_norm
+        return grid
@@ -1,92 +1,80 @@
 import os
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
+import shutil
+import logging
+from ..constants import IMAGE_RENDERER, IMAGE_WINDOW_SIZE
+from .field_renderer import FaceContourRenderer
+from .timing import timed
+
+logger = logging.getLogger(__name__)
 
 
 class ImageCapture:
-    """Class for capturing images of simulation results and geometry"""
+    """Renders result images from stored nodal fields"""
 
     @staticmethod
-    def save_simulation_images(mapdl, result, simulation_id, simulation_dir):
-        """Capture and save images of the simulation results and geometry"""
+    def save_field_images(fields, simulation_dir, mesh_image=None, renderer=IMAGE_RENDERER):
+        """
+        Render result images from stored nodal fields, without a MAPDL session
+
+        ``renderer`` is one of IMAGE_RENDERERS: 'matplotlib' draws 2D contour
+        maps of the beam face, 'pyvista' renders the 3D grid off-screen with
+        VTK. Both write the same file names.
+        """
         images = {}
+        with timed('render_setup'):
+            draw = ImageCapture.get_field_renderer(fields, renderer)
 
         mesh_path = os.path.join(simulation_dir, 'mesh.png')
-        if ImageCapture.capture_mesh(mapdl, mesh_path):
-            images['mesh_image'] = mesh_path
+        with timed('render_mesh'):
+            if mesh_image and os.path.exists(mesh_image):
+                # The mesh does not depend on load or material, reuse the existing picture
+                if os.path.abspath(mesh_image) != os.path.abspath(mesh_path):
+                    shutil.copyfile(mesh_image, mesh_path)
+                images['mesh_image'] = mesh_path
+            elif draw(mesh_path, scalars=None, title='Mesh'):
+                images['mesh_image'] = mesh_path
 
         stress_path = os.path.join(simulation_dir, 'stress.png')
-        if ImageCapture.capture_stress(result, stress_path):
-            images['stress_image'] = stress_path
+        with timed('render_stress'):
+            if draw(stress_path, scalars='SEQV', title='Von Mises stress (Pa)'):
+                images['stress_image'] = stress_path
 
         deformation_path = os.path.join(simulation_dir, 'deform.png')
-        if ImageCapture.capture_deformation(result, deformation_path):
-            images['deformation_image'] = deformation_path
+        with timed('render_deformation'):
+            if draw(deformation_path, scalars='USUM', title='Displacement (m)'):
+                images['deformation_image'] = deformation_path
 
         return images
 
     @staticmethod
-    def capture_geometry(mapdl, save_path, window_size=[1920, 1080]):
-        """Generate and save an image of the geometry"""
-        try:
-            # PostProcessing step to ensure the geometry is ready
-            mapdl.prep7()
+    def get_field_renderer(fields, renderer=IMAGE_RENDERER):
+        """``draw(save_path, scalars, title)`` of the chosen backend, set up once for all images"""
+        if renderer == 'matplotlib':
+            return FaceContourRenderer(fields).render
+        if renderer != 'pyvista':
+            raise ValueError(f"Unknown image renderer {renderer}")
 
-            # Создание и сохранение изображения
-            plt.figure(figsize=(window_size[0] / 100, window_size[1] / 100))
-            mapdl.aplot(background='w', show_edges=True, smooth_shading=True,
-                        window_size=[1920, 1080], savefig=save_path,
-                        off_screen=True)
-            plt.close()
-            return save_path
-        except Exception as e:
-            print(f"Failed to create geometry: {e}")
-            return None
+        grid = fields.to_grid()
+        return lambda save_path, scalars=None, title='': ImageCapture.capture_grid(
+            grid, save_path, scalars=scalars, title=title)
 
     @staticmethod
-    def capture_mesh(mapdl, save_path, window_size=[1920, 1080]):
-        """Generate and save an image of the mesh"""
+    def capture_grid(grid, save_path, scalars=None, title='', window_size=IMAGE_WINDOW_SIZE):
+        """Generate and save an image of a PyVista grid, optionally colored by a point field"""
         try:
-            mapdl.prep7()
-            plt.figure(figsize=(window_size[0] / 100, window_size[1] / 100))
-            mapdl.eplot(background='w', show_edges=True, smooth_shading=True,
-                        window_size=[1920, 1080], savefig=save_path,
-                        off_screen=True)
-            plt.close()
-            return save_path
-        except Exception as e:
-            print(f"Failed to create mesh: {e}")
-            return None
+            import pyvista as pv
 
-    @staticmethod
-    def capture_stress(result, save_path, result_type='stress', window_size=[1920, 1080]):
-        """Generate and save an image of the stress results"""
-        try:
-            plt.figure(figsize=(window_size[0] / 100, window_size[1] / 100))
-            result.plot_principal_nodal_stress(0, 'seqv', background='W', show_edges=True, text_color='k',
-                                                   add_text=True,
-                                                   window_size=[1920, 1080], screenshot=save_path,
-                                                   off_screen=True)
-            plt.figure(figsize=(window_size[0] / 100, window_size[1] / 100))
-            plt.close()
+            plotter = pv.Plotter(off_screen=True, window_size=window_size)
+            plotter.set_background('white')
+            if scalars is None:
+                plotter.add_mesh(grid, color='lightblue', show_edges=True)
+            else:
+                plotter.add_mesh(grid, scalars=scalars, show_edges=True, cmap='jet',
+                                 scalar_bar_args={'title': title, 'color': 'k'})
+            plotter.add_text(title, color='k')
+            plotter.screenshot(save_path)
+            plotter.close()
             return save_path
         except Exception as e:
-            print(f"Failed to create stress image: {e}")
+            logger.error(f"Failed to create {title or 'grid'} image: {e}")
             return None
-
-    @staticmethod
-    def capture_deformation(result, save_path, window_size=[1920, 1080]):
-        """Generate and save an image of the deformation results"""
-        try:
-            plt.figure(figsize=(window_size[0] / 100, window_size[1] / 100))
-            result.plot_nodal_displacement(0, 'NORM', background='W', show_edges=True, text_color='k',
-                                               add_text=True,
-                                               window_size=[1920, 1080], screenshot=save_path,
-                                               off_screen=True)
-            plt.figure(figsize=(window_size[0] / 100, window_size[1] / 100))
-            plt.close()
-            return save_path
-        except Exception as e:
-            print(f"Failed to create deformation image: {e}")
-            return None
\ No newline at end of file
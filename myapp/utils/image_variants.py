@@ -0,0 +1,74 @@
+import os
+import logging
+from PIL import Image
+from ..constants import IMAGE_VARIANT_WIDTHS, IMAGE_FORMATS, IMAGE_WEBP_QUALITY
+
+logger = logging.getLogger(__name__)
+
+
+def save_image_variants(image_path, widths=IMAGE_VARIANT_WIDTHS, formats=IMAGE_FORMATS):
+    """
+    Write the resolution ladder of a rendered image next to it
+
+    Every size in ``widths`` (``{name: pixels}``) smaller than the image is
+    saved as ``{stem}_{name}.{format}``, and the full size as
+    ``{stem}.{format}``; the rendered PNG itself is kept. Returns
+    ``{size name: {'width': pixels, format: path}}`` with a 'full' entry,
+    smallest size first.
+    """
+    stem = os.path.splitext(image_path)[0]
+    with Image.open(image_path) as image:
+        image.load()
+    # The renderers write RGBA, neither format needs the alpha channel of an opaque figure
+    image = image.convert('RGB')
+    width, height = image.size
+
+    sizes = sorted((pixels, name) for name, pixels in widths.items() if pixels < width)
+    sizes.append((width, 'full'))
+
+    variants = {}
+    for pixels, name in sizes:
+        resized = image if pixels == width else image.resize(
+            (pixels, max(1, round(height * pixels / width))), Image.LANCZOS)
+        variant = {'width': pixels}
+        for image_format in formats:
+            path = f'{stem}.{image_format}' if name == 'full' else f'{stem}_{name}.{image_format}'
+            if path == image_path:
+                variant[image_format] = path
+                continue
+            if image_format == 'webp':
+                resized.save(path, 'WEBP', quality=IMAGE_WEBP_QUALITY, method=4)
+            else:
+                resized.save(path, image_format.upper(), optimize=True)
+            variant[image_format] = path
+        variants[name] = variant
+    return variants
+
+
+def save_all_image_variants(image_paths, widths=IMAGE_VARIANT_WIDTHS, formats=IMAGE_FORMATS):
+    """``save_image_variants`` of every ``{field name: path}`` image, images that fail are left out"""
+    variants = {}
+    for name, path in image_paths.items():
+        try:
+            variants[name] = save_image_variants(path, widths, formats)
+        except Exception as e:
+            logger.error(f"Failed to create size variants of {path}: {e}")
+    return variants
+
+
+def build_srcset(image_variants, to_url):
+    """
+    ``{field name: {format: srcset}}`` of stored image variants
+
+    ``to_url`` maps a stored name to the URL clients load, each srcset is
+    the HTML ``"url 320w, url 960w, url 1920w"`` form.
+    """
+    srcset = {}
+    for field_name, sizes in (image_variants or {}).items():
+        ordered = sorted(sizes.values(), key=lambda variant: variant['width'])
+        srcset[field_name] = {
+            image_format: ', '.join(f"{to_url(variant[image_format])} {variant['width']}w"
+                                    for variant in ordered if variant.get(image_format))
+            for image_format in IMAGE_FORMATS
+        }
+    return srcset
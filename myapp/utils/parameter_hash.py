@@ -0,0 +1,77 @@
+import hashlib
+import json
+from ..constants import (
+    DEFAULT_MODEL_TYPE,
+    PARAMETER_HASH_VERSION,
+    PARAMETER_HASH_SIGNIFICANT_DIGITS,
+    PARAMETER_HASH_DIGITS,
+)
+
+# Parameters that affect a solve, with their type and the default the solver uses.
+# Keys outside the schema (such as the ``id`` added before solving) are not hashed.
+PARAMETER_SCHEMA = {
+    'e': (float, 2e11),
+    'nu': (float, 0.27),
+    'length': (float, 5.0),
+    'width': (float, 2.5),
+    'depth': (float, 0.1),
+    'radius': (float, 0.5),
+    'num': (int, 3),
+    'element_size': (float, None),  # length / 40
+    'pressure': (float, 1000.0),
+    'model_type': (str, DEFAULT_MODEL_TYPE),
+}
+
+# Parameters a linear-elastic result scales with analytically
+SCALABLE_PARAMETERS = ('e', 'pressure')
+
+
+def quantize(value, digits=PARAMETER_HASH_SIGNIFICANT_DIGITS):
+    """Round ``value`` to ``digits`` significant digits"""
+    value = float(f"{float(value):.{digits}g}")
+    return value + 0.0  # -0.0 -> 0.0
+
+
+def canonicalize_parameters(parameters, keys=None):
+    """
+    Canonical form of simulation parameters
+
+    Missing parameters get the solver defaults, numbers are converted to the
+    schema type and floats quantized to ``PARAMETER_HASH_SIGNIFICANT_DIGITS``,
+    so ``2.1e11``/``210000000000.0`` or ``3``/``3.0`` compare equal. ``keys``
+    restricts the result to a subset of the schema.
+    """
+    canonical = {}
+    for key, (kind, default) in PARAMETER_SCHEMA.items():
+        if keys is not None and key not in keys:
+            continue
+        value = parameters.get(key, default)
+        try:
+            if value is None and key == 'element_size':
+                value = float(parameters.get('length', PARAMETER_SCHEMA['length'][1])) / 40
+            if kind is float:
+                value = quantize(value, PARAMETER_HASH_DIGITS.get(key, PARAMETER_HASH_SIGNIFICANT_DIGITS))
+            elif kind is int:
+                value = int(round(float(value)))
+            else:
+                value = str(value)
+        except (TypeError, ValueError):
+            pass  # Invalid values are hashed as given
+        canonical[key] = value
+    return canonical
+
+
+def hash_canonical(canonical):
+    """Versioned SHA-256 of an already canonical mapping"""
+    encoded = json.dumps(canonical, sort_keys=True, separators=(',', ':'))
+    return f"v{PARAMETER_HASH_VERSION}:{hashlib.sha256(encoded.encode()).hexdigest()}"
+
+
+def hash_parameters(parameters, keys=None):
+    """Versioned hash of the canonical form of ``parameters``"""
+    return hash_canonical(canonicalize_parameters(parameters, keys=keys))
+
+
+def hash_scaling_key(parameters):
+    """Hash of everything except load and Young's modulus (geometry, mesh and nu)"""
+    return hash_parameters(parameters, keys=[key for key in PARAMETER_SCHEMA if key not in SCALABLE_PARAMETERS])
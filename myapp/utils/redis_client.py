@@ -0,0 +1,89 @@
+import threading
+from redis import BlockingConnectionPool, Redis
+from redis import asyncio as redis_asyncio
+from django.conf import settings
+from ..constants import (
+    REDIS_MAX_CONNECTIONS,
+    REDIS_POOL_TIMEOUT,
+    REDIS_SOCKET_TIMEOUT,
+    REDIS_SOCKET_CONNECT_TIMEOUT,
+    REDIS_HEALTH_CHECK_INTERVAL,
+    REDIS_MAX_STREAM_CONNECTIONS,
+)
+
+_client = None
+_async_client = None
+_lock = threading.Lock()
+
+
+def get_redis_client():
+    """
+    Shared Redis client of the current process
+
+    Backed by a blocking connection pool, so connections to the broker host
+    are reused across requests and tasks instead of being opened per call.
+    redis-py resets the pool in forked worker processes.
+    """
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                pool = BlockingConnectionPool.from_url(
+                    settings.CELERY_BROKER_URL,
+                    max_connections=REDIS_MAX_CONNECTIONS,
+                    timeout=REDIS_POOL_TIMEOUT,
+                    socket_timeout=REDIS_SOCKET_TIMEOUT,
+                    socket_connect_timeout=REDIS_SOCKET_CONNECT_TIMEOUT,
+                    socket_keepalive=True,
+                    health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+                    retry_on_timeout=True,
+                )
+                _client = Redis(connection_pool=pool)
+    return _client
+
+
+def get_async_redis_client():
+    """
+    Shared asyncio Redis client for async views of the ASGI process
+
+    Event streams hold one pub/sub connection each, so this pool is sized
+    separately from the synchronous one.
+    """
+    global _async_client
+    if _async_client is None:
+        pool = redis_asyncio.ConnectionPool.from_url(
+            settings.CELERY_BROKER_URL,
+            max_connections=REDIS_MAX_STREAM_CONNECTIONS,
+            socket_connect_timeout=REDIS_SOCKET_CONNECT_TIMEOUT,
+            socket_keepalive=True,
+            health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+        )
+        _async_client = redis_asyncio.Redis(connection_pool=pool)
+    return _async_client
+
+
+def reset_redis_client():
+    """Drop the shared client and close its connections"""
+    global _client
+    with _lock:
+        if _client is not None:
+            _client.connection_pool.disconnect()
+            _client = None
+
+
+def set_many(mapping, ex=None):
+    """Set several keys in one round trip"""
+    if not mapping:
+        return
+    pipe = get_redis_client().pipeline(transaction=False)
+    for key, value in mapping.items():
+        pipe.set(key, value, ex=ex)
+    pipe.execute()
+
+
+def get_many(keys):
+    """Values of several keys in one round trip, None for missing keys"""
+    keys = list(keys)
+    if not keys:
+        return []
+    return get_redis_client().mget(keys)
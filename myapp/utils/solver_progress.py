@@ -0,0 +1,160 @@
+import os
+import re
+import time
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+_NUMBER = r'([-+]?\d*\.?\d+(?:[eEdD][-+]?\d+)?)'
+
+# (field, pattern) pairs matched against every line of MAPDL solver output
+PATTERNS = [
+    ('equations', re.compile(r'number of equations\s*=\s*(\d+)', re.IGNORECASE)),
+    ('memory_mb', re.compile(r'memory (?:allocated for solver|used|required for in-core(?: solution)?)\s*=\s*'
+                             + _NUMBER + r'\s*MB', re.IGNORECASE)),
+    ('cpu_seconds', re.compile(r'CP Time\s*\(sec\)\s*=\s*' + _NUMBER, re.IGNORECASE)),
+    ('elapsed_seconds', re.compile(r'Elapsed Time\s*\(sec\)\s*=\s*' + _NUMBER, re.IGNORECASE)),
+    ('iteration', re.compile(r'EQUIL ITER\s+(\d+)\s+COMPLETED', re.IGNORECASE)),
+    ('convergence', re.compile(r'(FORCE|MOMENT|DISP|ROT|HEAT|FLOW)\s+CONVERGENCE VALUE\s*=\s*' + _NUMBER
+                               + r'\s+CRITERION\s*=\s*' + _NUMBER, re.IGNORECASE)),
+    ('substep', re.compile(r'LOAD STEP\s+(\d+)\s+SUBSTEP\s+(\d+)\s+COMPLETED\.?\s+CUM ITER\s*=\s*(\d+)',
+                           re.IGNORECASE)),
+    ('load_steps', re.compile(r'SOLVE FOR LS\s+(\d+)\s+OF\s+(\d+)', re.IGNORECASE)),
+    ('solve_started', re.compile(r'S O L U T I O N\s+O P T I O N S|SOLVE\s+COMMAND', re.IGNORECASE)),
+    ('solve_done', re.compile(r'SOLUTION IS DONE|FINISH SOLUTION PROCESSING', re.IGNORECASE)),
+]
+
+
+def _float(value):
+    return float(value.replace('D', 'E').replace('d', 'e'))
+
+
+class SolverProgressParser:
+    """
+    Incremental parser of MAPDL solver output
+
+    Lines are fed as they are written and folded into a progress dict with
+    equation count, iteration and convergence figures, load step/substep,
+    solver memory and CPU/elapsed time.
+    """
+
+    def __init__(self):
+        self.progress = {}
+        self.lines = 0
+
+    def feed(self, line):
+        """Parse one output line, returns True if the progress changed"""
+        self.lines += 1
+        changed = False
+        for field, pattern in PATTERNS:
+            match = pattern.search(line)
+            if not match:
+                continue
+            changed = True
+            if field in ('equations', 'iteration'):
+                self.progress[field] = int(match.group(1))
+            elif field in ('memory_mb', 'cpu_seconds', 'elapsed_seconds'):
+                value = _float(match.group(1))
+                if field == 'memory_mb':
+                    value = max(value, self.progress.get('memory_mb', 0.0))
+                self.progress[field] = value
+            elif field == 'convergence':
+                self.progress['convergence'] = {
+                    'quantity': match.group(1).upper(),
+                    'value': _float(match.group(2)),
+                    'criterion': _float(match.group(3)),
+                }
+            elif field == 'substep':
+                self.progress.update({
+                    'load_step': int(match.group(1)),
+                    'substep': int(match.group(2)),
+                    'cumulative_iterations': int(match.group(3)),
+                })
+            elif field == 'load_steps':
+                self.progress['load_step'] = int(match.group(1))
+                self.progress['load_step_count'] = int(match.group(2))
+            elif field == 'solve_started':
+                self.progress.setdefault('solver_state', 'running')
+            elif field == 'solve_done':
+                self.progress['solver_state'] = 'done'
+        return changed
+
+    def feed_text(self, text):
+        for line in text.splitlines():
+            self.feed(line)
+        return self.progress
+
+
+class SolverOutputMonitor:
+    """
+    Tails a solver output file in a background thread while MAPDL is solving
+
+    New complete lines are fed to a SolverProgressParser and ``on_progress``
+    is called with the parsed progress whenever the output grew, so
+    ``output_updated_at`` tells a busy solver from a hung one.
+    """
+
+    def __init__(self, path, on_progress, poll_interval=0.5):
+        self.path = path
+        self.on_progress = on_progress
+        self.poll_interval = poll_interval
+        self.parser = SolverProgressParser()
+        self._position = 0
+        self._buffer = ''
+        self._stop = threading.Event()
+        self._thread = None
+
+    def poll(self):
+        """Read what was appended since the last poll"""
+        try:
+            if not os.path.exists(self.path):
+                return
+            with open(self.path, 'r', errors='replace') as f:
+                f.seek(self._position)
+                chunk = f.read()
+                self._position = f.tell()
+        except OSError as e:
+            logger.debug(f"Cannot read solver output {self.path}: {e}")
+            return
+        if not chunk:
+            return
+
+        lines = (self._buffer + chunk).split('\n')
+        self._buffer = lines.pop()  # Incomplete last line
+        for line in lines:
+            self.parser.feed(line)
+        self.report()
+
+    def report(self):
+        self.on_progress(dict(self.parser.progress, output_lines=self.parser.lines, output_updated_at=time.time()))
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Solver output monitor failed: {e}")
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='solver-output-monitor', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval * 4)
+        self.poll()
+        if self._buffer:
+            # Output ended without a trailing newline
+            self.parser.feed(self._buffer)
+            self._buffer = ''
+            self.report()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
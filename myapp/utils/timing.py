@@ -0,0 +1,93 @@
+import time
+import contextvars
+from contextlib import contextmanager
+import numpy as np
+from ..constants import TIMING_PERCENTILES
+
+# Timer of the job running in the current thread / task, None outside a job
+_active_timer = contextvars.ContextVar('stage_timer', default=None)
+
+
+class StageTimer:
+    """
+    Wall time per named stage of one simulation job
+
+    Stages entered several times (e.g. one render per image) accumulate.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self._started = time.perf_counter()
+
+    def add(self, stage, seconds):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def elapsed(self):
+        return time.perf_counter() - self._started
+
+    def as_dict(self, **extra):
+        """Stage durations in seconds, with ``total`` wall time and any ``extra`` stages"""
+        timings = dict(self.stages, **extra)
+        timings['total'] = self.elapsed()
+        return {stage: round(seconds, 4) for stage, seconds in timings.items()}
+
+
+@contextmanager
+def start_timer():
+    """Make a new StageTimer the active timer for the enclosed block"""
+    timer = StageTimer()
+    token = _active_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _active_timer.reset(token)
+
+
+def get_timer():
+    return _active_timer.get()
+
+
+@contextmanager
+def timed(stage):
+    """Add the duration of the enclosed block to ``stage`` of the active timer, if any"""
+    timer = _active_timer.get()
+    if timer is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(stage, time.perf_counter() - started)
+
+
+def merge_timings(*timings):
+    """Add up several ``{stage: seconds}`` dicts stage by stage"""
+    merged = {}
+    for job in timings:
+        for stage, seconds in job.items():
+            merged[stage] = round(merged.get(stage, 0.0) + seconds, 4)
+    return merged
+
+
+def summarize_timings(timings, percentiles=TIMING_PERCENTILES):
+    """
+    Aggregate per-job stage timings into count, mean, percentiles and max per stage
+
+    ``timings`` is an iterable of ``{stage: seconds}`` dicts; jobs that did not
+    go through a stage (e.g. no launch on a warm session) do not count for it.
+    """
+    by_stage = {}
+    for job in timings:
+        for stage, seconds in (job or {}).items():
+            by_stage.setdefault(stage, []).append(seconds)
+
+    summary = {}
+    for stage, values in sorted(by_stage.items()):
+        values = np.asarray(values, dtype=float)
+        stats = {'count': int(values.size), 'mean': round(float(values.mean()), 4)}
+        for percentile, value in zip(percentiles, np.percentile(values, percentiles)):
+            stats[f'p{percentile}'] = round(float(value), 4)
+        stats['max'] = round(float(values.max()), 4)
+        summary[stage] = stats
+    return summary